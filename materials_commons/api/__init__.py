@@ -1,7 +1,20 @@
 __version__ = '2.1.1'
-from .client import Client, MCAPIError
+from .client import Client, MCAPIError, DeadlineExceededError
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, RetryStats
+from .async_client import AsyncClient
+from .singleflight import SingleFlight
+from .cache import RevalidationCache, ResponseCache
+from .hedging import HedgePolicy
+from .jsonstream import JSONArrayStream
+from .changefeed import ProjectChangeFeed
+from .codec import JSONCodec
+from .transfer import TransferStats
+from .identity import IdentityMap
+from .paging import AdaptivePageSize
+from .table import FileTable
 from .models import Project, Activity, Dataset, Entity, Experiment, File, User, Workflow, GlobusTransfer, GlobusUpload, \
-    GlobusDownload, Paged
+    GlobusDownload, Paged, Record, keep_raw_data
 from .query_params import QueryParams, QueryField
 from .requests import *
 from .query import *
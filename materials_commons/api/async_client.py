@@ -0,0 +1,902 @@
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import aiohttp
+
+from .client import MCAPIError, DeadlineExceededError, _merge_dicts, _set_paging_params, _paged
+from .codec import default_codec
+from .models import Project, Experiment, Dataset, Entity, Activity, User, File, Server, Searchable, Tag
+from .query_params import QueryParams
+from .rate_limit import RateLimiter
+from .requests import *
+from .retry import RetryPolicy, RetryStats
+
+_deadline = contextvars.ContextVar("materials_commons_api_deadline", default=None)
+
+
+async def _iter_items(pages):
+    try:
+        async for page in pages:
+            for item in page.data:
+                yield item
+    finally:
+        await pages.aclose()
+
+
+def _query_args(params):
+    # aiohttp only accepts str, int and float query values, so convert everything else the way requests would.
+    if not params:
+        return None
+    return {k: v if isinstance(v, (str, int, float)) and not isinstance(v, bool) else str(v)
+            for k, v in params.items()}
+
+
+class AsyncClient(object):
+    """
+    An asyncio version of :class:`Client` for projects, experiments, directories, files, entities, activities,
+    datasets, published data, users and MQL. The methods are named after their Client counterparts but are
+    coroutines, and the paged listings are async generators. They don't take the preset and raw arguments,
+    and return models only.
+
+    Only available on Client: communities, Globus transfers, resumable uploads, the stream_* and *_table
+    listings, login(), get_apikey(), set_debug_on() and get_rate_limit_status(), and the options for
+    coalesce_gets, revalidation and response caches, hedging, adaptive page sizes, request compression,
+    transfer_stats, identity maps and keep_raw_data. ::
+
+        async with mcapi.AsyncClient("your-api-token-here") as c:
+            projects = await c.get_all_projects()
+            async for page in c.list_files_changed_since(project_id, "2024-01-01 00:00:00"):
+                ...
+
+    apikey : str
+        The users apikey to use in API calls.
+    base_url : str
+        Optional, defaults to https://materialscommons.org/api. The server to make API calls to.
+    raise_exception: bool
+        Optional, defaults to True. Disable exceptions and instead let user explicitly check status.
+    max_concurrency: int
+        Optional, defaults to 20. The maximum number of requests in flight at once. Further calls wait
+        for a free slot, so thousands of calls can be started with asyncio.gather().
+    retry_policy: RetryPolicy
+        Optional, defaults to RetryPolicy(). Controls retrying requests that fail with a transient error.
+    rate_limiter: RateLimiter
+        Optional, defaults to RateLimiter(). Paces requests to stay under the server's rate limit.
+    connect_timeout: float
+        Optional, defaults to 10. Seconds to wait for a connection to the server. None waits forever.
+    read_timeout: float
+        Optional, defaults to 60. Seconds to wait for the server to send data. None waits forever.
+    page_workers: int
+        Optional, defaults to 4. The number of pages the paged file listings fetch at once after the first
+        page. Pages are still returned in order.
+    json_codec: JSONCodec
+        Optional, defaults to a JSONCodec using orjson or msgspec if installed, otherwise the json module. Encodes
+        the bodies sent to the server and decodes its responses.
+    """
+
+    def __init__(self, apikey, base_url="https://materialscommons.org/api", raise_exception=True,
+                 max_concurrency=20, retry_policy=None, rate_limiter=None, connect_timeout=10.0, read_timeout=60.0,
+                 page_workers=4, json_codec=None):
+        self.apikey = apikey
+        self.base_url = base_url
+        self.log = False
+        self.raise_exception = raise_exception
+        self.headers = {
+            "Authorization": "Bearer " + self.apikey,
+            "Accept": "application/json"
+        }
+        self.max_concurrency = max_concurrency
+        self.page_workers = page_workers
+        self.json_codec = json_codec if json_codec is not None else default_codec
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limit = 0
+        self.rate_limit_remaining = 0
+        tls_cert = os.getenv("MC_VERIFY_TLS_CERT")
+        if tls_cert is None or tls_cert.lower() == "false" or tls_cert.lower() == "no":
+            self._verify_tls_cert = False
+        else:
+            self._verify_tls_cert = True
+        self._session = None
+        self._semaphore = None
+
+    async def close(self):
+        """
+        Closes the connections held by the client.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Limits the time spent by all calls awaited inside the with block, including retries, rate limit waits
+        and fetching further pages. Tasks started inside the block inherit the deadline. A call that would run
+        past the deadline raises DeadlineExceededError.
+
+        :param float seconds: Number of seconds from now until the deadline
+        :raises DeadlineExceededError:
+        """
+        previous = _deadline.get()
+        deadline = time.monotonic() + seconds
+        if previous is not None:
+            deadline = min(previous, deadline)
+        token = _deadline.set(deadline)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    # Server
+    async def get_server_info(self):
+        """See :meth:`Client.get_server_info`."""
+        return Server(await self._get("/server/info"))
+
+    # Projects
+    async def get_all_projects(self, params=None):
+        """See :meth:`Client.get_all_projects`."""
+        return Project.from_list(await self._get("/projects", params))
+
+    def get_all_projects_paged(self, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_projects_paged`. Returns an async generator of Paged."""
+        return self._get_all_paged(Project, "/projects", params, starting_page, page_size)
+
+    def iter_all_projects(self, params=None, page_size=None):
+        """See :meth:`Client.iter_all_projects`. Returns an async generator."""
+        return _iter_items(self._get_all_paged(Project, "/projects", params, None, page_size, read_ahead=1))
+
+    def get_all_project_files_matching(self, match, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_project_files_matching`. Returns an async generator of Paged."""
+        return self._get_files_matching("/projects/files/matching", match, starting_page, page_size)
+
+    def get_project_files_matching(self, project_id, match, starting_page=None, page_size=None):
+        """See :meth:`Client.get_project_files_matching`. Returns an async generator of Paged."""
+        return self._get_files_matching(f"/projects/{project_id}/files/matching", match, starting_page, page_size)
+
+    def iter_all_project_files_matching(self, match, page_size=None):
+        """See :meth:`Client.iter_all_project_files_matching`. Returns an async generator."""
+        return _iter_items(self._get_files_matching("/projects/files/matching", match, None, page_size, 1))
+
+    def iter_project_files_matching(self, project_id, match, page_size=None):
+        """See :meth:`Client.iter_project_files_matching`. Returns an async generator."""
+        return _iter_items(self._get_files_matching(f"/projects/{project_id}/files/matching", match, None, page_size,
+                                                    1))
+
+    async def create_project(self, name, attrs=None):
+        """See :meth:`Client.create_project`."""
+        if not attrs:
+            attrs = CreateProjectRequest()
+        form = _merge_dicts({"name": name}, attrs.to_dict())
+        return Project(await self._post("/projects", form))
+
+    async def get_project(self, project_id, params=None):
+        """See :meth:`Client.get_project`."""
+        return Project(await self._get("/projects/" + str(project_id), params))
+
+    async def delete_project(self, project_id):
+        """See :meth:`Client.delete_project`."""
+        await self._delete("/projects/" + str(project_id))
+
+    async def update_project(self, project_id, attrs):
+        """See :meth:`Client.update_project`."""
+        return Project(await self._put("/projects/" + str(project_id), attrs.to_dict()))
+
+    async def add_user_to_project(self, project_id, user_id):
+        """See :meth:`Client.add_user_to_project`."""
+        return Project(await self._put("/projects/" + str(project_id) + "/add-user/" + str(user_id), {}))
+
+    async def remove_user_from_project(self, project_id, user_id):
+        """See :meth:`Client.remove_user_from_project`."""
+        return Project(await self._put("/projects/" + str(project_id) + "/remove-user/" + str(user_id), {}))
+
+    async def add_admin_to_project(self, project_id, user_id):
+        """See :meth:`Client.add_admin_to_project`."""
+        return Project(await self._put("/projects/" + str(project_id) + "/add-admin/" + str(user_id), {}))
+
+    async def remove_admin_from_project(self, project_id, user_id):
+        """See :meth:`Client.remove_admin_from_project`."""
+        return Project(await self._put("/projects/" + str(project_id) + "/remove-admin/" + str(user_id), {}))
+
+    # Experiments
+    async def get_all_experiments(self, project_id, params=None):
+        """See :meth:`Client.get_all_experiments`."""
+        return Experiment.from_list(await self._get("/projects/" + str(project_id) + "/experiments", params))
+
+    async def get_experiment(self, experiment_id, params=None):
+        """See :meth:`Client.get_experiment`."""
+        return Experiment(await self._get("/experiments/" + str(experiment_id), params))
+
+    async def create_experiment(self, project_id, name, attrs=None):
+        """See :meth:`Client.create_experiment`."""
+        if not attrs:
+            attrs = CreateExperimentRequest()
+        form = _merge_dicts({"project_id": project_id, "name": name}, attrs.to_dict())
+        return Experiment(await self._post("/experiments", form))
+
+    async def update_experiment(self, experiment_id, attrs):
+        """See :meth:`Client.update_experiment`."""
+        form = _merge_dicts({"experiment_id": experiment_id}, attrs.to_dict())
+        return Experiment(await self._put("/experiments/" + str(experiment_id), form))
+
+    async def delete_experiment(self, project_id, experiment_id):
+        """See :meth:`Client.delete_experiment`."""
+        await self._delete("/projects/" + str(project_id) + "/experiments/" + str(experiment_id))
+
+    async def update_experiment_workflows(self, project_id, experiment_id, workflow_id):
+        """See :meth:`Client.update_experiment_workflows`."""
+        form = {"project_id": project_id, "workflow_id": workflow_id}
+        return Experiment(await self._put("/experiments/" + str(experiment_id) + "/workflows/selection", form))
+
+    # Directories
+    async def get_directory(self, project_id, directory_id, params=None):
+        """See :meth:`Client.get_directory`."""
+        return File(await self._get("/projects/" + str(project_id) + "/directories/" + str(directory_id), params))
+
+    async def list_directory(self, project_id, directory_id, params=None):
+        """See :meth:`Client.list_directory`."""
+        return File.from_list(
+            await self._get("/projects/" + str(project_id) + "/directories/" + str(directory_id) + "/list", params))
+
+    async def list_directory_by_path(self, project_id, path, params=None):
+        """See :meth:`Client.list_directory_by_path`."""
+        path_param = {"path": path.replace('\\', '/')}
+        return File.from_list(
+            await self._get("/projects/" + str(project_id) + "/directories_by_path", params, path_param))
+
+    async def create_directory(self, project_id, name, parent_id, attrs=None):
+        """See :meth:`Client.create_directory`."""
+        if not attrs:
+            attrs = CreateDirectoryRequest()
+        form = {"name": name, "directory_id": parent_id, "project_id": project_id}
+        form = _merge_dicts(form, attrs.to_dict())
+        return File(await self._post("/directories", form))
+
+    async def move_directory(self, project_id, directory_id, to_directory_id):
+        """See :meth:`Client.move_directory`."""
+        form = {"to_directory_id": to_directory_id, "project_id": project_id}
+        return File(await self._post("/directories/" + str(directory_id) + "/move", form))
+
+    async def rename_directory(self, project_id, directory_id, name):
+        """See :meth:`Client.rename_directory`."""
+        form = {"name": name, "project_id": project_id}
+        return File(await self._post("/directories/" + str(directory_id) + "/rename", form))
+
+    async def delete_directory(self, project_id, directory_id):
+        """See :meth:`Client.delete_directory`."""
+        await self._delete("/projects/" + str(project_id) + "/directories/" + str(directory_id))
+
+    async def update_directory(self, project_id, directory_id, attrs):
+        """See :meth:`Client.update_directory`."""
+        form = _merge_dicts({"project_id": project_id}, attrs.to_dict())
+        return File(await self._put("/directories/" + str(directory_id), form))
+
+    # Files
+    async def get_file(self, project_id, file_id, params=None):
+        """See :meth:`Client.get_file`."""
+        return File(await self._get("/projects/" + str(project_id) + "/files/" + str(file_id), params))
+
+    async def get_file_versions(self, project_id, file_id, params=None):
+        """See :meth:`Client.get_file_versions`."""
+        return File.from_list(
+            await self._get("/projects/" + str(project_id) + "/files/" + str(file_id) + "/versions", params))
+
+    async def set_as_active_file(self, project_id, file_id):
+        """See :meth:`Client.set_as_active_file`."""
+        return File(await self._put("/projects/" + str(project_id) + "/files/" + str(file_id) + "/make_active", {}))
+
+    async def get_file_by_path(self, project_id, file_path):
+        """See :meth:`Client.get_file_by_path`."""
+        form = {"path": file_path.replace('\\', '/'), "project_id": project_id}
+        return File(await self._post("/files/by_path", form))
+
+    async def update_file(self, project_id, file_id, attrs):
+        """See :meth:`Client.update_file`."""
+        form = _merge_dicts({"project_id": project_id}, attrs.to_dict())
+        return File(await self._put("/files/" + str(file_id), form))
+
+    async def delete_file(self, project_id, file_id, force=False):
+        """See :meth:`Client.delete_file`."""
+        params = None
+        if force:
+            params = {"force": True}
+        await self._delete("/projects/" + str(project_id) + "/files/" + str(file_id), params=params)
+
+    async def move_file(self, project_id, file_id, to_directory_id):
+        """See :meth:`Client.move_file`."""
+        form = {"directory_id": to_directory_id, "project_id": project_id}
+        return File(await self._post("/files/" + str(file_id) + "/move", form))
+
+    async def rename_file(self, project_id, file_id, name):
+        """See :meth:`Client.rename_file`."""
+        form = {"name": name, "project_id": project_id}
+        return File(await self._post("/files/" + str(file_id) + "/rename", form))
+
+    async def download_file(self, project_id, file_id, to):
+        """See :meth:`Client.download_file`."""
+        await self._download("/projects/" + str(project_id) + "/files/" + str(file_id) + "/download", to)
+
+    async def download_file_by_path(self, project_id, path, to):
+        """See :meth:`Client.download_file_by_path`."""
+        file = await self.get_file_by_path(project_id, path.replace('\\', '/'))
+        await self.download_file(project_id, file.id, to)
+
+    async def upload_file(self, project_id, directory_id, file_path):
+        """See :meth:`Client.upload_file`."""
+        files = File.from_list(
+            await self._upload("/projects/" + str(project_id) + "/files/" + str(directory_id) + "/upload", file_path))
+        return files[0]
+
+    async def upload_file_to_path(self, project_id, file_path, dest_path):
+        """See :meth:`Client.upload_file_to_path`."""
+        upload_url = "/projects/" + str(project_id) + "/files/upload-to-path"
+        return File(await self._upload(upload_url, file_path, field='file', fields={'path': dest_path}))
+
+    async def upload_bytes(self, project_id, directory_id, name, f):
+        """See :meth:`Client.upload_bytes`. The contents of f are read into memory before they are sent."""
+        files = File.from_list(
+            await self._upload_raw("/projects/" + str(project_id) + "/files/" + str(directory_id) + "/upload/" +
+                                   str(name), name, f))
+        return files[0]
+
+    def list_files_changed_since(self, project_id, since, starting_page=None, page_size=None):
+        """See :meth:`Client.list_files_changed_since`. Returns an async generator of Paged."""
+        params = _set_paging_params({"since": since}, starting_page, page_size)
+        urlpart = "/projects/" + str(project_id) + "/file-changes-since"
+        return self._iter_pages(File, lambda page_params: self._get_paged(urlpart, page_params), params)
+
+    def iter_files_changed_since(self, project_id, since, page_size=None):
+        """See :meth:`Client.iter_files_changed_since`. Returns an async generator."""
+        params = _set_paging_params({"since": since}, None, page_size)
+        urlpart = "/projects/" + str(project_id) + "/file-changes-since"
+        return _iter_items(self._iter_pages(File, lambda page_params: self._get_paged(urlpart, page_params), params, 1))
+
+    # Entities
+    async def get_all_entities(self, project_id, params=None):
+        """See :meth:`Client.get_all_entities`."""
+        return Entity.from_list(await self._get("/projects/" + str(project_id) + "/entities", params))
+
+    def get_all_entities_paged(self, project_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_entities_paged`. Returns an async generator of Paged."""
+        urlpart = "/projects/" + str(project_id) + "/entities"
+        return self._get_all_paged(Entity, urlpart, params, starting_page, page_size)
+
+    def iter_all_entities(self, project_id, params=None, page_size=None):
+        """See :meth:`Client.iter_all_entities`. Returns an async generator."""
+        urlpart = "/projects/" + str(project_id) + "/entities"
+        return _iter_items(self._get_all_paged(Entity, urlpart, params, None, page_size, read_ahead=1))
+
+    async def get_entity(self, project_id, entity_id, params=None):
+        """See :meth:`Client.get_entity`."""
+        return Entity(await self._get("/projects/" + str(project_id) + "/entities/" + str(entity_id), params))
+
+    async def create_entity(self, project_id, name, activity_id, request=None, attrs=None):
+        """See :meth:`Client.create_entity`."""
+        if not request:
+            request = CreateEntityRequest()
+        if not attrs:
+            attrs = []
+        form = _merge_dicts({
+            "name": name,
+            "project_id": project_id,
+            "attributes": attrs,
+            "activity_id": activity_id,
+        }, request.to_dict())
+        return Entity(await self._post("/entities", form))
+
+    async def delete_entity(self, project_id, entity_id):
+        """See :meth:`Client.delete_entity`."""
+        await self._delete("/projects/" + str(project_id) + "/entities/" + str(entity_id))
+
+    async def create_entity_state(self, project_id, entity_id, activity_id, current=True, attrs=None):
+        """See :meth:`Client.create_entity_state`."""
+        if not attrs:
+            attrs = []
+        form = {"current": current, "attributes": attrs}
+        return Entity(await self._post("/projects/" + str(project_id) + "/entities/" + str(entity_id) +
+                                       "/activities/" + str(activity_id) + "/create-entity-state", form))
+
+    # Activities
+    async def get_all_activities(self, project_id, params=None):
+        """See :meth:`Client.get_all_activities`."""
+        return Activity.from_list(await self._get("/projects/" + str(project_id) + "/activities", params))
+
+    def get_all_activities_paged(self, project_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_activities_paged`. Returns an async generator of Paged."""
+        urlpart = "/projects/" + str(project_id) + "/activities"
+        return self._get_all_paged(Activity, urlpart, params, starting_page, page_size)
+
+    def iter_all_activities(self, project_id, params=None, page_size=None):
+        """See :meth:`Client.iter_all_activities`. Returns an async generator."""
+        urlpart = "/projects/" + str(project_id) + "/activities"
+        return _iter_items(self._get_all_paged(Activity, urlpart, params, None, page_size, read_ahead=1))
+
+    async def get_activity(self, project_id, activity_id, params=None):
+        """See :meth:`Client.get_activity`."""
+        return Activity(await self._get("/projects/" + str(project_id) + "/activities/" + str(activity_id), params))
+
+    async def create_activity(self, project_id, name, request=None, attrs=None):
+        """See :meth:`Client.create_activity`."""
+        if not request:
+            request = CreateActivityRequest()
+        if not attrs:
+            attrs = []
+        form = _merge_dicts({"project_id": project_id, "name": name, "attributes": attrs}, request.to_dict())
+        return Activity(await self._post("/activities", form))
+
+    async def delete_activity(self, project_id, activity_id):
+        """See :meth:`Client.delete_activity`."""
+        await self._delete("/projects/" + str(project_id) + "/activities/" + str(activity_id))
+
+    # Datasets
+    async def get_all_datasets(self, project_id, params=None):
+        """See :meth:`Client.get_all_datasets`."""
+        return Dataset.from_list(await self._get("/projects/" + str(project_id) + "/datasets", params))
+
+    def get_all_datasets_paged(self, project_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_datasets_paged`. Returns an async generator of Paged."""
+        urlpart = "/projects/" + str(project_id) + "/datasets"
+        return self._get_all_paged(Dataset, urlpart, params, starting_page, page_size)
+
+    def iter_all_datasets(self, project_id, params=None, page_size=None):
+        """See :meth:`Client.iter_all_datasets`. Returns an async generator."""
+        urlpart = "/projects/" + str(project_id) + "/datasets"
+        return _iter_items(self._get_all_paged(Dataset, urlpart, params, None, page_size, read_ahead=1))
+
+    async def get_dataset(self, project_id, dataset_id, params=None):
+        """See :meth:`Client.get_dataset`."""
+        return Dataset(await self._get("/projects/" + str(project_id) + "/datasets/" + str(dataset_id), params))
+
+    async def get_dataset_files(self, project_id, dataset_id, params=None):
+        """See :meth:`Client.get_dataset_files`."""
+        return File.from_list(
+            await self._get("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/files", params))
+
+    async def get_dataset_entities(self, project_id, dataset_id, params=None):
+        """See :meth:`Client.get_dataset_entities`."""
+        return Entity.from_list(
+            await self._get("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/entities", params))
+
+    async def get_dataset_activities(self, project_id, dataset_id, params=None):
+        """See :meth:`Client.get_dataset_activities`."""
+        return Activity.from_list(
+            await self._get("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/activities", params))
+
+    async def create_dataset(self, project_id, name, attrs=None):
+        """See :meth:`Client.create_dataset`."""
+        if not attrs:
+            attrs = CreateDatasetRequest()
+        form = _merge_dicts({"name": name}, attrs.to_dict())
+        return Dataset(await self._post("/projects/" + str(project_id) + "/datasets", form))
+
+    async def update_dataset(self, project_id, dataset_id, name, attrs=None):
+        """See :meth:`Client.update_dataset`."""
+        if not attrs:
+            attrs = UpdateDatasetRequest()
+        form = _merge_dicts({"name": name}, attrs.to_dict())
+        return Dataset(await self._put("/projects/" + str(project_id) + "/datasets/" + str(dataset_id), form))
+
+    async def delete_dataset(self, project_id, dataset_id):
+        """See :meth:`Client.delete_dataset`."""
+        await self._delete("/projects/" + str(project_id) + "/datasets/" + str(dataset_id))
+
+    async def update_dataset_file_selection(self, project_id, dataset_id, file_selection):
+        """See :meth:`Client.update_dataset_file_selection`."""
+        form = _merge_dicts({"project_id": project_id}, file_selection)
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/selection", form))
+
+    async def change_dataset_file_selection(self, project_id, dataset_id, file_selection):
+        """See :meth:`Client.change_dataset_file_selection`."""
+        return Dataset(
+            await self._put("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/change_file_selection",
+                            file_selection))
+
+    async def update_dataset_activities(self, project_id, dataset_id, activity_id):
+        """See :meth:`Client.update_dataset_activities`."""
+        form = {"project_id": project_id, "activity_id": activity_id}
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/activities/selection", form))
+
+    async def update_dataset_entities(self, project_id, dataset_id, entity_id):
+        """See :meth:`Client.update_dataset_entities`."""
+        form = {"project_id": project_id, "entity_id": entity_id}
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/entities", form))
+
+    async def update_dataset_workflows(self, project_id, dataset_id, workflow_id):
+        """See :meth:`Client.update_dataset_workflows`."""
+        form = {"project_id": project_id, "workflow_id": workflow_id}
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/workflows", form))
+
+    async def publish_dataset(self, project_id, dataset_id):
+        """See :meth:`Client.publish_dataset`."""
+        form = {"project_id": project_id}
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/publish", form))
+
+    async def unpublish_dataset(self, project_id, dataset_id):
+        """See :meth:`Client.unpublish_dataset`."""
+        form = {"project_id": project_id}
+        return Dataset(await self._put("/datasets/" + str(dataset_id) + "/unpublish", form))
+
+    async def assign_doi_to_dataset(self, project_id, dataset_id):
+        """See :meth:`Client.assign_doi_to_dataset`."""
+        return Dataset(
+            await self._put("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/assign_doi", {}))
+
+    async def check_file_in_dataset(self, project_id, dataset_id, file_id):
+        """See :meth:`Client.check_file_in_dataset`."""
+        return await self._get("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/files/" + str(
+            file_id) + "/check_selection")
+
+    async def check_file_by_path_in_dataset(self, project_id, dataset_id, file_path):
+        """See :meth:`Client.check_file_by_path_in_dataset`."""
+        form = {"file_path": file_path.replace('\\', '/')}
+        return await self._post(
+            "/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/check_select_by_path", form)
+
+    async def import_dataset(self, dataset_id, project_id, directory_name):
+        """See :meth:`Client.import_dataset`."""
+        form = {"directory": directory_name}
+        await self._post("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/import", form)
+
+    # Published Data
+    async def get_all_published_datasets(self, params=None):
+        """See :meth:`Client.get_all_published_datasets`."""
+        return Dataset.from_list(await self._get("/published/datasets", params))
+
+    def get_all_published_datasets_paged(self, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_published_datasets_paged`. Returns an async generator of Paged."""
+        return self._get_all_paged(Dataset, "/published/datasets", params, starting_page, page_size)
+
+    def iter_all_published_datasets(self, params=None, page_size=None):
+        """See :meth:`Client.iter_all_published_datasets`. Returns an async generator."""
+        return _iter_items(self._get_all_paged(Dataset, "/published/datasets", params, None, page_size, read_ahead=1))
+
+    async def get_published_dataset(self, dataset_id, params=None):
+        """See :meth:`Client.get_published_dataset`."""
+        return Dataset(await self._get("/published/datasets/" + str(dataset_id), params))
+
+    async def get_published_dataset_files(self, dataset_id, params=None):
+        """See :meth:`Client.get_published_dataset_files`."""
+        return File.from_list(await self._get("/published/datasets/" + str(dataset_id) + "/files", params))
+
+    def get_published_dataset_files_paged(self, dataset_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_published_dataset_files_paged`. Returns an async generator of Paged."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/files"
+        return self._get_all_paged(File, urlpart, params, starting_page, page_size)
+
+    def iter_published_dataset_files(self, dataset_id, params=None, page_size=None):
+        """See :meth:`Client.iter_published_dataset_files`. Returns an async generator."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/files"
+        return _iter_items(self._get_all_paged(File, urlpart, params, None, page_size, read_ahead=1))
+
+    async def get_published_dataset_directory(self, dataset_id, directory_id, params=None):
+        """See :meth:`Client.get_published_dataset_directory`."""
+        return File(
+            await self._get("/published/datasets/" + str(dataset_id) + "/directories/" + str(directory_id), params))
+
+    async def list_published_dataset_directory(self, dataset_id, directory_id, params=None):
+        """See :meth:`Client.list_published_dataset_directory`."""
+        return File.from_list(await self._get(
+            "/published/datasets/" + str(dataset_id) + "/directories/" + str(directory_id) + "/list", params))
+
+    async def list_published_dataset_directory_by_path(self, dataset_id, path, params=None):
+        """See :meth:`Client.list_published_dataset_directory_by_path`."""
+        path_param = {"path": path.replace('\\', '/')}
+        return File.from_list(
+            await self._get("/published/datasets/" + str(dataset_id) + "/directories_by_path", params, path_param))
+
+    async def get_published_dataset_entities(self, dataset_id, params=None):
+        """See :meth:`Client.get_published_dataset_entities`."""
+        return Entity.from_list(await self._get("/published/datasets/" + str(dataset_id) + "/entities", params))
+
+    def get_published_dataset_entities_paged(self, dataset_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_published_dataset_entities_paged`. Returns an async generator of Paged."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        return self._get_all_paged(Entity, urlpart, params, starting_page, page_size)
+
+    def iter_published_dataset_entities(self, dataset_id, params=None, page_size=None):
+        """See :meth:`Client.iter_published_dataset_entities`. Returns an async generator."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        return _iter_items(self._get_all_paged(Entity, urlpart, params, None, page_size, read_ahead=1))
+
+    async def get_published_dataset_activities(self, dataset_id, params=None):
+        """See :meth:`Client.get_published_dataset_activities`."""
+        return Activity.from_list(await self._get("/published/datasets/" + str(dataset_id) + "/activities", params))
+
+    def get_published_dataset_activities_paged(self, dataset_id, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.get_published_dataset_activities_paged`. Returns an async generator of Paged."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        return self._get_all_paged(Activity, urlpart, params, starting_page, page_size)
+
+    def iter_published_dataset_activities(self, dataset_id, params=None, page_size=None):
+        """See :meth:`Client.iter_published_dataset_activities`. Returns an async generator."""
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        return _iter_items(self._get_all_paged(Activity, urlpart, params, None, page_size, read_ahead=1))
+
+    async def search_published_data(self, search_str):
+        """See :meth:`Client.search_published_data`."""
+        form = {"search": search_str}
+        return Searchable.from_list(await self._post("/published/data/search", form))
+
+    def get_all_published_dataset_files_matching(self, match, starting_page=None, page_size=None):
+        """See :meth:`Client.get_all_published_dataset_files_matching`. Returns an async generator of Paged."""
+        return self._get_files_matching("/published/datasets/files/matching", match, starting_page, page_size)
+
+    def get_published_dataset_files_matching(self, dataset_id, match, starting_page=None, page_size=None):
+        """See :meth:`Client.get_published_dataset_files_matching`. Returns an async generator of Paged."""
+        return self._get_files_matching(f"/published/datasets/{dataset_id}/files/matching", match, starting_page,
+                                        page_size)
+
+    def iter_all_published_dataset_files_matching(self, match, page_size=None):
+        """See :meth:`Client.iter_all_published_dataset_files_matching`. Returns an async generator."""
+        url = "/published/datasets/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, 1))
+
+    def iter_published_dataset_files_matching(self, dataset_id, match, page_size=None):
+        """See :meth:`Client.iter_published_dataset_files_matching`. Returns an async generator."""
+        url = f"/published/datasets/{dataset_id}/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, 1))
+
+    async def get_published_datasets_for_author(self, author):
+        """See :meth:`Client.get_published_datasets_for_author`."""
+        form = {"author": author}
+        return Dataset.from_list(await self._post("/published/authors/search", form))
+
+    async def get_published_datasets_for_tag(self, tag):
+        """See :meth:`Client.get_published_datasets_for_tag`."""
+        form = {"tag": tag}
+        return Dataset.from_list(await self._post("/published/tags/search", form))
+
+    async def list_published_authors(self):
+        """See :meth:`Client.list_published_authors`."""
+        return await self._get("/published/authors")
+
+    async def list_tags_for_published_datasets(self):
+        """See :meth:`Client.list_tags_for_published_datasets`."""
+        return Tag.from_list(await self._get("/published/tags"))
+
+    async def download_published_dataset_zipfile(self, dataset_id, to):
+        """See :meth:`Client.download_published_dataset_zipfile`."""
+        await self._download("/published/datasets/" + str(dataset_id) + "/download_zipfile", to)
+
+    async def download_published_dataset_file(self, dataset_id, file_id, to):
+        """See :meth:`Client.download_published_dataset_file`."""
+        await self._download("/published/datasets/" + str(dataset_id) + "/files/" + str(file_id) + "/download", to)
+
+    # Users
+    async def get_current_user(self, params=None):
+        """See :meth:`Client.get_current_user`."""
+        return User(await self._get("/users/by-apikey/" + self.apikey, params))
+
+    async def get_user_by_email(self, email, params=None):
+        """See :meth:`Client.get_user_by_email`."""
+        return User(await self._get("/users/by-email/" + email, params))
+
+    async def list_users(self, params=None):
+        """See :meth:`Client.list_users`."""
+        return User.from_list(await self._get("/users", params))
+
+    def list_users_paged(self, params=None, starting_page=None, page_size=None):
+        """See :meth:`Client.list_users_paged`. Returns an async generator of Paged."""
+        return self._get_all_paged(User, "/users", params, starting_page, page_size)
+
+    def iter_users(self, params=None, page_size=None):
+        """See :meth:`Client.iter_users`. Returns an async generator."""
+        return _iter_items(self._get_all_paged(User, "/users", params, None, page_size, read_ahead=1))
+
+    # MQL
+    async def mql_load_project(self, project_id):
+        await self._post("/queries/" + str(project_id) + "/load-project", {})
+
+    async def mql_reload_project(self, project_id):
+        await self._post("/queries/" + str(project_id) + "/load-project", {})
+
+    async def mql_execute_query(self, project_id, statement, select_processes=True, select_samples=True):
+        await self.mql_load_project(project_id)
+        form = {
+            "statement": statement,
+            "select_processes": select_processes,
+            "select_samples": select_samples
+        }
+        return await self._post("/queries/" + str(project_id) + "/execute-query", form)
+
+    # Internal
+
+    def _get_all_paged(self, cls, urlpart, params, starting_page, page_size, read_ahead=None):
+        query = _set_paging_params(dict(QueryParams.to_query_args(params)), starting_page, page_size)
+        return self._iter_pages(cls, lambda page_params: self._get_paged(urlpart, page_params), query, read_ahead)
+
+    def _get_files_matching(self, url, match, starting_page, page_size, read_ahead=None):
+        params = _set_paging_params({}, starting_page, page_size)
+        form = {"match": match if isinstance(match, list) else [match]}
+        return self._iter_pages(File, lambda page_params: self._post_paged(url, form, page_params), params, read_ahead)
+
+    async def _iter_pages(self, cls, fetch, params, read_ahead=None):
+        # See Client._iter_pages, the pages after the first are fetched by up to read_ahead (by default
+        # page_workers) tasks.
+        p = _paged(cls, await fetch(params))
+        first_page = p.current_page
+        last_page = p.last_page
+        if first_page is None or last_page is None:
+            yield p
+            return
+        pages = iter(range(first_page + 1, last_page + 1))
+        in_flight = deque()
+
+        def submit_next():
+            page = next(pages, None)
+            if page is not None:
+                in_flight.append(asyncio.ensure_future(fetch(_merge_dicts(params, {"page[number]": page}))))
+
+        try:
+            for _ in range(max(1, self.page_workers if read_ahead is None else read_ahead)):
+                submit_next()
+            yield p
+            p = None
+            while in_flight:
+                body = await in_flight.popleft()
+                submit_next()
+                yield _paged(cls, body)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, ssl=None if self._verify_tls_cert else False)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                                  json_serialize=self.json_codec.dumps)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _timeout_for(self, deadline):
+        connect, read = self.timeout
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.001)
+            connect = remaining if connect is None else min(connect, remaining)
+            read = remaining if read is None else min(read, remaining)
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+    async def _sleep_before_deadline(self, seconds, deadline, reason, response=None):
+        if deadline is not None and time.monotonic() + seconds > deadline:
+            raise DeadlineExceededError("deadline exceeded " + reason, response)
+        await asyncio.sleep(seconds)
+
+    async def _request(self, method, urlpart, handler, **kwargs):
+        """
+        Sends a request, retrying transient failures, and passes the response to handler while the
+        connection is still open. Returns the result of handler. data may be a function returning the body,
+        which is called for each attempt, for bodies that can only be sent once such as a FormData.
+        """
+        url = self.base_url + urlpart
+        if self.log:
+            print(method + ":", url)
+        session = self._get_session()
+        deadline = _deadline.get()
+        make_data = kwargs.pop("data") if callable(kwargs.get("data", None)) else None
+        attempt = 0
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceededError("deadline exceeded")
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                await self._sleep_before_deadline(wait, deadline, "waiting for rate limit")
+            if make_data is not None:
+                kwargs["data"] = make_data()
+            r = None
+            try:
+                async with self._semaphore:
+                    async with session.request(method, url, timeout=self._timeout_for(deadline), **kwargs) as r:
+                        self._update_rate_limits_from_request(r)
+                        if not self.retry_policy.should_retry(method, attempt, r, self.retry_stats.retries):
+                            return await self._handle(r, handler)
+                        delay = self.retry_policy.delay(attempt, r)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DeadlineExceededError("deadline exceeded: " + str(e), None) from e
+                if r is not None or not self.retry_policy.should_retry(method, attempt, None, self.retry_stats.retries):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            await self._sleep_before_deadline(delay, deadline, "waiting to retry " + method + " " + url, r)
+            self.retry_stats.add(1, delay)
+            attempt += 1
+
+    async def _handle(self, r, handler):
+        try:
+            r.raise_for_status()
+        except aiohttp.ClientResponseError as e:
+            if not self.raise_exception:
+                return None
+            raise MCAPIError(str(e), r)
+        return await handler(r)
+
+    def _update_rate_limits_from_request(self, r):
+        self.rate_limit = int(r.headers.get('x-ratelimit-limit', self.rate_limit))
+        self.rate_limit_remaining = int(r.headers.get('x-ratelimit-remaining', self.rate_limit_remaining))
+        self.rate_limiter.update(limit=r.headers.get('x-ratelimit-limit', None),
+                                 remaining=r.headers.get('x-ratelimit-remaining', None),
+                                 reset=r.headers.get('x-ratelimit-reset', None),
+                                 retry_after=r.headers.get('retry-after', None))
+
+    async def _read_body(self, r):
+        if r.content_type == 'application/json':
+            return self.json_codec.decode(await r.read())
+        return None
+
+    async def _read_data(self, r):
+        result = await self._read_body(r)
+        if result is not None and "data" in result:
+            return result["data"]
+        return result
+
+    @staticmethod
+    async def _read_nothing(r):
+        return None
+
+    async def _get(self, urlpart, params=None, other_params=None):
+        params_to_use = _merge_dicts(QueryParams.to_query_args(params), other_params or {})
+        return await self._request("GET", urlpart, self._read_data, params=_query_args(params_to_use))
+
+    async def _get_paged(self, urlpart, params):
+        return await self._request("GET", urlpart, self._read_body, params=_query_args(params))
+
+    async def _post(self, urlpart, data=None, params=None):
+        return await self._request("POST", urlpart, self._read_data, json=data or {}, params=_query_args(params))
+
+    async def _post_paged(self, urlpart, data, params):
+        return await self._request("POST", urlpart, self._read_body, json=data, params=_query_args(params))
+
+    async def _put(self, urlpart, data):
+        return await self._request("PUT", urlpart, self._read_data, json=data)
+
+    async def _delete(self, urlpart, params=None):
+        await self._request("DELETE", urlpart, self._read_nothing, params=_query_args(params))
+
+    async def _download(self, urlpart, to):
+        deadline = _deadline.get()
+
+        async def write_to_file(r):
+            with open(to, 'wb') as f:
+                async for chunk in r.content.iter_chunked(8192):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise DeadlineExceededError("deadline exceeded", r)
+                    f.write(chunk)
+
+        await self._request("GET", urlpart, write_to_file)
+
+    async def _upload(self, urlpart, file_path, field='files[]', fields=None):
+        opened = []
+
+        def form():
+            # aiohttp closes the file once it has sent it, so each attempt gets a new form and file.
+            f = open(file_path, 'rb')
+            opened.append(f)
+            data = aiohttp.FormData(fields or {})
+            data.add_field(field, f, filename=os.path.basename(file_path))
+            return data
+
+        try:
+            return await self._request("POST", urlpart, self._read_data, data=form)
+        finally:
+            for f in opened:
+                f.close()
+
+    async def _upload_raw(self, urlpart, name, f):
+        content = f.read()
+
+        def form():
+            data = aiohttp.FormData()
+            data.add_field('files[]', content, filename=name)
+            return data
+
+        return await self._request("POST", urlpart, self._read_data, data=form)
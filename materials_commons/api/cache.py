@@ -0,0 +1,307 @@
+import fnmatch
+import getpass
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from os.path import join
+
+from .codec import default_codec
+
+
+class RevalidationCache(object):
+    """
+    An in-memory cache of GET responses that carry an ETag or Last-Modified header. When the same url is
+    requested again the stored validators are sent as If-None-Match/If-Modified-Since, and if the server
+    answers 304 (Not Modified) the previously decoded payload is reused instead of downloading and decoding
+    the response again. Cached payloads are shared between calls, so they should not be modified.
+
+    max_entries : int
+        Optional, defaults to 1024. The number of urls to keep. The least recently used entries are dropped
+        first.
+
+    Attributes
+    ----------
+    hits : int
+        Requests answered 304 whose cached payload was reused.
+    misses : int
+        Requests sent without validators because nothing was cached for the url.
+    revalidations : int
+        Requests sent with validators. The difference between revalidations and hits is the number of
+        times the server sent back a changed object.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validators(self, key):
+        """
+        Returns the conditional request headers to send for key.
+
+        :param key: Key identifying the request
+        :rtype: dict
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return {}
+            self.revalidations += 1
+            self._entries.move_to_end(key)
+            etag, last_modified, _ = entry
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def not_modified(self, key):
+        """
+        Returns the cached payload for key after the server answered 304.
+
+        :param key: Key identifying the request
+        :return: (found, payload), found is False if the entry was dropped in the meantime
+        :rtype: tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return False, None
+            self.hits += 1
+            return True, entry[2]
+
+    def store(self, key, headers, payload):
+        """
+        Stores the payload for key if the response headers carry a validator, otherwise drops any cached entry.
+
+        :param key: Key identifying the request
+        :param headers: The response headers
+        :param payload: The decoded response
+        """
+        etag = headers.get('etag', None)
+        last_modified = headers.get('last-modified', None)
+        with self._lock:
+            if etag is None and last_modified is None:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = (etag, last_modified, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        :return: {"hits": int, "misses": int, "revalidations": int, "entries": int}
+        :rtype: dict
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations,
+                    "entries": len(self._entries)}
+
+    def clear(self):
+        """
+        Drops all cached entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache(object):
+    """
+    A persistent cache of GET responses stored in a SQLite database, so that repeated runs of a script can
+    reuse the project, directory and dataset metadata fetched by earlier runs. Entries are keyed by server,
+    url, query parameters and user (a hash of the apikey, the apikey itself isn't stored), and expire after
+    a per-endpoint time to live. Writes (POST, PUT, DELETE) made through the client drop the cached entries
+    for the objects they touch, for example any write in a project drops that project's entries.
+
+    path : str
+        Optional, defaults to ~/.materialscommons/response_cache.db. The database file.
+    default_ttl : float
+        Optional, defaults to 300. Seconds a response is reused for.
+    ttls : dict
+        Optional. Maps url patterns (shell style, matched against the url without the server part, for
+        example "/projects/*/directories/*") to the time to live in seconds for matching responses. The first
+        matching pattern wins. A time to live of 0 disables caching for the endpoint. These are added to
+        DEFAULT_TTLS, which disables caching for the globus endpoints and the apikey lookup.
+    max_bytes : int
+        Optional, defaults to 256MB. When the cached responses take more space than this, expired entries and
+        then the least recently used entries are dropped.
+
+    Attributes
+    ----------
+    hits : int
+        Responses served from the cache.
+    misses : int
+        Lookups that found no fresh entry.
+    evictions : int
+        Entries dropped to stay under max_bytes.
+    invalidations : int
+        Entries dropped because of writes.
+    """
+
+    DEFAULT_TTLS = {
+        "*/globus/*": 0,
+        "/users/by-apikey/*": 0,
+    }
+
+    def __init__(self, path=None, default_ttl=300.0, ttls=None, max_bytes=256 * 1024 * 1024):
+        if path is None:
+            user = getpass.getuser()
+            path = join(os.path.expanduser('~' + user), '.materialscommons', 'response_cache.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.default_ttl = default_ttl
+        self.ttls = OrderedDict(ttls or {})
+        for pattern, ttl in self.DEFAULT_TTLS.items():
+            self.ttls.setdefault(pattern, ttl)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        os.chmod(path, 0o600)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                user TEXT NOT NULL,
+                                url TEXT NOT NULL,
+                                body BLOB NOT NULL,
+                                size INTEGER NOT NULL,
+                                expires_at REAL NOT NULL,
+                                accessed_at REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_user_url ON responses (user, url)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def user_key(apikey):
+        """
+        Returns the value identifying the user in cache entries for apikey.
+        """
+        return hashlib.sha256(apikey.encode("utf-8")).hexdigest()[:32]
+
+    def ttl_for(self, urlpart):
+        """
+        Returns the time to live in seconds for responses from urlpart.
+        """
+        for pattern, ttl in self.ttls.items():
+            if fnmatch.fnmatchcase(urlpart, pattern):
+                return ttl
+        return self.default_ttl
+
+    def get(self, user, base_url, urlpart, params):
+        """
+        Looks up a cached response.
+
+        :return: (found, payload)
+        :rtype: tuple
+        """
+        if self.ttl_for(urlpart) <= 0:
+            return False, None
+        key = self._key(user, base_url, urlpart, params)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body FROM responses WHERE key = ? AND expires_at > ?",
+                                   (key, now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return True, default_codec.decode(row[0])
+
+    def put(self, user, base_url, urlpart, params, payload):
+        """
+        Stores a response.
+        """
+        ttl = self.ttl_for(urlpart)
+        if ttl <= 0:
+            return
+        body = default_codec.encode(payload)
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (self._key(user, base_url, urlpart, params), user, base_url + urlpart, body, len(body),
+                              now + ttl, now))
+            self._evict(now)
+
+    def invalidate(self, user, base_url, prefixes=(), urls=()):
+        """
+        Drops cached responses for user whose url starts with one of prefixes (followed by a path separator),
+        or equals one of prefixes or urls.
+
+        :param str user: The user key, see user_key()
+        :param str base_url: The server the urls are on
+        :param prefixes: url paths (without the server) whose entries, and entries below them, are dropped
+        :param urls: url paths (without the server) whose entries are dropped
+        """
+        with self._lock:
+            dropped = 0
+            for prefix in prefixes:
+                url = base_url + prefix
+                dropped += self._db.execute(
+                    "DELETE FROM responses WHERE user = ? AND (url = ? OR substr(url, 1, ?) = ?)",
+                    (user, url, len(url) + 1, url + "/")).rowcount
+            for urlpart in urls:
+                dropped += self._db.execute("DELETE FROM responses WHERE user = ? AND url = ?",
+                                            (user, base_url + urlpart)).rowcount
+            self.invalidations += dropped
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        :return: {"hits": int, "misses": int, "evictions": int, "invalidations": int, "entries": int, "bytes": int}
+        :rtype: dict
+        """
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "entries": entries, "bytes": size}
+
+    def clear(self):
+        """
+        Drops all cached responses.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _key(user, base_url, urlpart, params):
+        params_key = json.dumps(sorted((k, str(v)) for k, v in params.items()))
+        return hashlib.sha256("\n".join([user, base_url + urlpart, params_key]).encode("utf-8")).hexdigest()
+
+    def _evict(self, now):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self.evictions += self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,148 @@
+import datetime
+import getpass
+import hashlib
+import json
+import os
+import tempfile
+from os.path import join
+
+_SINCE_FORMAT = "%Y-%m-%d %H:%M:%S"
+_STATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class ProjectChangeFeed(object):
+    """
+    Follows the files changed in a project. Each call to poll() returns the files changed since the previous
+    call, and the position reached (the latest change time seen, and the files seen at or shortly before it)
+    is saved to disk so the next run of a script carries on where the last one stopped. ::
+
+        feed = mcapi.ProjectChangeFeed(c, project_id)
+        for f in feed.poll():
+            index(f)
+
+    Every poll asks the server for changes since a little before the latest change already seen, so changes
+    that are recorded late, or with a slightly different clock, aren't missed. Files returned again because
+    of this overlap are recognized by their id and change time and skipped.
+
+    client : mcapi.Client
+        The client to make calls with.
+    project_id : int
+        The project to follow.
+    path : str
+        Optional, defaults to a file under ~/.materialscommons/change_feeds named after the server and project.
+        The file the position is saved in.
+    start : datetime.datetime
+        Optional, defaults to None (the beginning of the project). The UTC time to start from when there is no
+        saved position.
+    overlap : float
+        Optional, defaults to 300. Seconds before the latest change seen to ask for changes from.
+    page_size : int
+        Optional, defaults to 1000. Number of files fetched per request.
+
+    Attributes
+    ----------
+    high_water_mark : datetime.datetime
+        The latest change time seen, None if nothing has been seen yet.
+    """
+
+    def __init__(self, client, project_id, path=None, start=None, overlap=300.0, page_size=1000):
+        self.client = client
+        self.project_id = project_id
+        if path is None:
+            user = getpass.getuser()
+            server = hashlib.sha256(client.base_url.encode("utf-8")).hexdigest()[:16]
+            path = join(os.path.expanduser('~' + user), '.materialscommons', 'change_feeds',
+                        server + "-project-" + str(project_id) + ".json")
+        self.path = path
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self.page_size = page_size
+        self.high_water_mark = start
+        self._seen = set()
+        self._load()
+
+    def poll(self, save=True):
+        """
+        Returns the files changed since the previous poll.
+
+        :param bool save: Optional, defaults to True. Save the new position. Pass False and call save() once
+            the changes have been processed, so that the next run returns them again if processing fails.
+        :return: The changed files, oldest first
+        :rtype: File[]
+        :raises MCAPIError:
+        """
+        since = datetime.datetime(1970, 1, 1) if self.high_water_mark is None else self.high_water_mark - self.overlap
+        changes = []
+        undated = set()
+        for f in self.client.iter_files_changed_since(self.project_id, since.strftime(_SINCE_FORMAT),
+                                                      page_size=self.page_size):
+            changed_at = _changed_at(f)
+            if changed_at is None:
+                undated.add(f.id)
+            if (f.id, changed_at) in self._seen or (changed_at is not None and changed_at < since):
+                continue
+            self._seen.add((f.id, changed_at))
+            changes.append(f)
+            if changed_at is not None and (self.high_water_mark is None or changed_at > self.high_water_mark):
+                self.high_water_mark = changed_at
+        # Only the files that can be returned again are remembered: those changed within the overlap, and
+        # those without a change time that this poll returned.
+        oldest = since if self.high_water_mark is None else self.high_water_mark - self.overlap
+        self._seen = {(file_id, t) for file_id, t in self._seen
+                      if (file_id in undated if t is None else t >= oldest)}
+        if save:
+            self.save()
+        changes.sort(key=lambda f: (_changed_at(f) or datetime.datetime.min, f.id))
+        return changes
+
+    def save(self):
+        """
+        Saves the current position. The file is replaced atomically, so an interrupted save leaves the
+        previous position in place.
+        """
+        state = {
+            "project_id": self.project_id,
+            "high_water_mark": _format(self.high_water_mark),
+            "seen": [[file_id, _format(t)] for file_id, t in self._seen],
+        }
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".change_feed")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def reset(self, start=None):
+        """
+        Forgets the saved position, so the next poll starts from start (a UTC datetime, None for the beginning
+        of the project).
+        """
+        self.high_water_mark = start
+        self._seen = set()
+        self.save()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        self.high_water_mark = _parse(state.get("high_water_mark", None))
+        self._seen = {(file_id, _parse(changed_at)) for file_id, changed_at in state.get("seen", [])}
+
+
+def _changed_at(f):
+    return f.updated_at if f.updated_at is not None else f.created_at
+
+
+def _format(t):
+    return None if t is None else t.strftime(_STATE_FORMAT)
+
+
+def _parse(value):
+    return None if value is None else datetime.datetime.strptime(value, _STATE_FORMAT)
@@ -1,13 +1,30 @@
+import gzip
 import logging
 import os
 import time
-from collections import OrderedDict
+import warnings
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 
 import requests
 
+from .cache import ResponseCache
+from .codec import default_codec
+from .hedging import endpoint_key, _Attempt, _HedgingAdapter, _aborted, _attempts, _CONNECTION_TRACKING
+from .jsonstream import JSONArrayStream
+from .paging import _aligned_page_size
 from .models import Project, Experiment, Dataset, Entity, Activity, User, File, GlobusUpload, \
-    GlobusDownload, Server, Community, Tag, Searchable, GlobusTransfer, Paged
+    GlobusDownload, Server, Community, Tag, Searchable, GlobusTransfer, Paged, Record, from_list, _keeping_raw_data
 from .query_params import QueryParams
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, RetryStats
+from .singleflight import SingleFlight
+from .table import FileTable
+from .transfer import TransferStats, accept_encoding
 from .requests import *
 from tusclient import client as tus_client
 from urllib.parse import urlparse
@@ -34,6 +51,16 @@ class MCAPIError(Exception):
         self.response = response
 
 
+class DeadlineExceededError(MCAPIError):
+    """
+    Raised when a call could not complete before the deadline set with Client.deadline(). The response is
+    the last response received before giving up, or None if there wasn't one.
+    """
+
+    def __init__(self, message, response=None):
+        super(DeadlineExceededError, self).__init__(message, response)
+
+
 def _merge_dicts(dict1, dict2):
     merged = dict1.copy()
     merged.update(dict2)
@@ -50,6 +77,102 @@ def _set_paging_params(params, starting_page, page_size):
     return params
 
 
+def _params_key(params):
+    return tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+def _invalidation_scopes(urlpart, data=None, result=None):
+    """
+    Returns the url prefixes and urls whose cached responses may be stale after a write to urlpart. A write
+    to /<collection>/<id>/... affects everything under /<collection>/<id> and the /<collection> listing, and
+    when the request or the object returned names a project, everything in that project. The returned object
+    names the project of writes such as update_experiment, sent to /experiments/<id> without a project id.
+    """
+    parts = urlpart.split("?")[0].strip("/").split("/")
+    prefixes = set()
+    urls = {"/" + parts[0]}
+    if len(parts) > 1:
+        prefixes.add("/" + parts[0] + "/" + parts[1])
+    project_id = data.get("project_id", None) if isinstance(data, dict) else None
+    if project_id is None and isinstance(result, dict):
+        project_id = result.get("project_id", None)
+    if project_id is not None:
+        prefixes.add("/projects/" + str(project_id))
+        urls.add("/projects")
+    if "datasets" in parts or parts[0] == "communities":
+        prefixes.add("/published")
+        prefixes.add("/communities")
+    return prefixes, urls
+
+
+def _paged(cls, body):
+    if body is None:
+        return Paged({}, [])
+    return Paged(body, from_list(cls, body.get("data", None)))
+
+
+def _with_preset(params, resource, preset):
+    # Adds the fields/include of a fieldset preset to params. Values in params take precedence.
+    if preset is None:
+        return params
+    return _merge_dicts(QueryParams.preset(resource, preset).to_params(), QueryParams.to_query_args(params))
+
+
+def _is_gzipped(kwargs):
+    return kwargs.get("headers", {}).get("Content-Encoding", None) == "gzip"
+
+
+def _gunzipped(kwargs):
+    # Returns the request arguments with the gzipped body replaced by the original one.
+    headers = {k: v for k, v in kwargs["headers"].items() if k != "Content-Encoding"}
+    return _merge_dicts(kwargs, {"data": gzip.decompress(kwargs["data"]), "headers": headers})
+
+
+def _gzip_size(body):
+    # The uncompressed size, which gzip stores (modulo 2^32) in the last four bytes.
+    return int.from_bytes(body[-4:], "little")
+
+
+def _as_is(data):
+    # The item "class" of the listings that fill a FileTable: the decoded dict itself.
+    return data
+
+
+def _file_positions(kwargs):
+    # The position of each file object in a multipart body, so the files can be rewound to send the body again.
+    # None if a file can't be rewound.
+    files = kwargs.get("files", None)
+    if not files:
+        return []
+    positions = []
+    for value in (files.values() if isinstance(files, dict) else (v for _, v in files)):
+        f = value[1] if isinstance(value, (tuple, list)) else value
+        if isinstance(f, (bytes, str)):
+            continue
+        try:
+            if not f.seekable():
+                return None
+            positions.append((f, f.tell()))
+        except (AttributeError, OSError):
+            return None
+    return positions
+
+
+def _iter_items(pages):
+    # chain/map hold no reference to a page once its items are consumed, so each page can be freed while
+    # the next one is fetched.
+    try:
+        yield from chain.from_iterable(map(attrgetter("data"), pages))
+    finally:
+        pages.close()
+
+
+def _close_response(future):
+    # Releases the connection held by a hedged request that lost the race.
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result()[0].close()
+
+
 def _origin(url):
     p = urlparse(url)
     # p.netloc may already include the port; keep it if present
@@ -66,24 +189,97 @@ class Client(object):
         Optional, defaults to https://materialscommons.org/api. The server to make API calls to.
     raise_exception: bool
         Optional, defaults to True. Disable exceptions and instead let user explicitly check status.
+    pool_connections: int
+        Optional, defaults to 10. The number of per-host connection pools to keep.
+    pool_maxsize: int
+        Optional, defaults to 10. The maximum number of connections kept open to a single host. Set this to
+        at least the number of threads sharing the client.
+    pool_block: bool
+        Optional, defaults to False. If True, requests wait for a free connection instead of opening a
+        throwaway connection when all pooled connections to a host are in use.
+    retry_policy: RetryPolicy
+        Optional, defaults to RetryPolicy(). Controls retrying requests that fail with a transient error.
+        Pass RetryPolicy(max_retries=0) to disable retries.
+    rate_limiter: RateLimiter
+        Optional, defaults to RateLimiter(). Paces requests to stay under the server's rate limit. A single
+        limiter can be shared by several clients using the same apikey.
+    connect_timeout: float
+        Optional, defaults to 10. Seconds to wait for a connection to the server. None waits forever.
+    read_timeout: float
+        Optional, defaults to 60. Seconds to wait for the server to send data. None waits forever.
+    coalesce_gets: bool
+        Optional, defaults to False. When True, identical GET requests (same url and parameters) made
+        concurrently by different threads are sent once, and every caller receives the result. Callers
+        then share the decoded response, so it should not be modified. The number of calls sent and
+        shared is tracked in single_flight.calls and single_flight.shared.
+    revalidation_cache: RevalidationCache
+        Optional, defaults to None. When set, GET responses with an ETag or Last-Modified header are cached,
+        and requesting them again sends a conditional request. If the object hasn't changed the server
+        answers 304 and the cached result is reused. Hit, miss and revalidation counts are available from
+        revalidation_cache.stats().
+    response_cache: ResponseCache
+        Optional, defaults to None. When set, GET responses are stored on disk and reused, by this and later
+        runs, until they expire. Writes made through the client drop the cached responses they affect.
+    hedge_policy: HedgePolicy
+        Optional, defaults to None. When set, read requests (GETs and read only lookups such as
+        get_file_by_path) that take longer than usual for their endpoint are sent a second time, and the
+        first answer is used, the slower request being aborted. The first copy is sent on the calling thread
+        and second copies by a pool of pool_maxsize workers. See HedgePolicy for the delay and the limit on
+        extra requests. Aborting the slower request relies on urllib3 2.x; with other versions hedge_policy is
+        ignored, with a warning.
+    page_workers: int
+        Optional, defaults to 4. The number of pages the paged file listings (list_files_changed_since and
+        the get_*_files_matching calls) fetch at once after the first page. Pages are still returned in order.
+        Set to 1 to fetch one page at a time.
+    adaptive_page_size: AdaptivePageSize
+        Optional, defaults to None. When set, the paged listings adjust the page size as they go to keep each
+        request near a target response time, and use larger pages when few requests are left in the rate
+        limit window. Pages are then fetched one at a time, and the page_size given to a listing is the
+        starting size.
+    json_codec: JSONCodec
+        Optional, defaults to a JSONCodec using orjson or msgspec if installed, otherwise the json module. Encodes
+        the bodies sent to the server and decodes its responses.
+    compress_requests_over: int
+        Optional, defaults to None (never). JSON request bodies of at least this many bytes, such as large
+        attribute lists, are sent gzip compressed. If the server rejects a compressed body with 415
+        (Unsupported Media Type) it is sent again uncompressed, and later bodies aren't compressed.
+    identity_map: IdentityMap
+        Optional, defaults to None. When set, the objects returned by the listing methods share their related
+        User and directory File objects: objects with the same type and id are built once.
+    keep_raw_data: bool
+        Optional, defaults to False. When True, the objects returned by the listing methods keep the dict they
+        were built from, as raw_data. Use mcapi.keep_raw_data() for other calls.
+
+    Responses are requested compressed with gzip or deflate, or brotli or zstd when the brotli or zstandard
+    package is installed. The bytes sent and received by each endpoint, before and after compression, are
+    counted in transfer_stats, a TransferStats.
+
+    The retries made by the client are counted in retry_stats, and those made by the most recent call in
+    last_retry_stats. Both are RetryStats instances with retries and sleep_time attributes.
+
+    A client can be shared by multiple threads. The r (last response) and last_retry_stats attributes
+    are tracked per thread.
     """
 
     def __init__(self, apikey, base_url="https://materialscommons.org/api", raise_exception=True,
-                 tus_chunk_size=sys.maxsize):
+                 tus_chunk_size=sys.maxsize, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 retry_policy=None, rate_limiter=None, connect_timeout=10.0, read_timeout=60.0,
+                 coalesce_gets=False, revalidation_cache=None, response_cache=None, hedge_policy=None,
+                 page_workers=4, adaptive_page_size=None, json_codec=None, compress_requests_over=None,
+                 identity_map=None, keep_raw_data=False):
         self.apikey = apikey
         self.base_url = base_url
         self.log = False
         self.raise_exception = raise_exception
         self.headers = {
             "Authorization": "Bearer " + self.apikey,
-            "Accept": "application/json"
+            "Accept": "application/json",
+            "Accept-Encoding": accept_encoding
         }
         self.rate_limit = 0
         self.rate_limit_remaining = 0
         self.rate_limit_reset = None
         self.retry_after = None
-        self.r = None
-        self._throttle_s = 0.0
         base_url_without_path = _origin(base_url)
         self._tus_client = tus_client.TusClient(base_url_without_path + "/files", headers=self.headers)
         self._tus_chunk_size = tus_chunk_size
@@ -92,38 +288,157 @@ class Client(object):
             self._verify_tls_cert = False
         else:
             self._verify_tls_cert = True
+        self._session = self._make_session(pool_connections, pool_maxsize, pool_block)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.timeout = (connect_timeout, read_timeout)
+        self._local = threading.local()
+        self._rate_limit_lock = threading.Lock()
+        self.single_flight = SingleFlight() if coalesce_gets else None
+        self.revalidation_cache = revalidation_cache
+        self.response_cache = response_cache
+        self._cache_user = ResponseCache.user_key(apikey)
+        if hedge_policy is not None and not _CONNECTION_TRACKING:
+            warnings.warn("hedge_policy is ignored: hedged requests aren't supported with urllib3 " +
+                          urllib3.__version__)
+            hedge_policy = None
+        self.hedge_policy = hedge_policy
+        self.json_codec = json_codec if json_codec is not None else default_codec
+        self.compress_requests_over = compress_requests_over
+        self._server_accepts_gzip = True
+        self.transfer_stats = TransferStats()
+        self.identity_map = identity_map
+        self.keep_raw_data = keep_raw_data
+        self._hedge_workers = max(2, pool_maxsize)
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+        self.page_workers = page_workers
+        self.adaptive_page_size = adaptive_page_size
+
+    def _make_session(self, pool_connections, pool_maxsize, pool_block):
+        """
+        Creates the session shared by all request helpers. The session keeps connections to the server
+        alive between calls so that only the first call to a host pays for the TCP and TLS handshakes.
+        """
+        session = requests.Session()
+        adapter = _HedgingAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        session.verify = self._verify_tls_cert
+        return session
+
+    def close(self):
+        """
+        Closes the pooled connections held by the client. The client should not be used after it is closed.
+        """
+        with self._hedge_lock:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_rate_limit_status(self):
+        """
+        Returns a consistent snapshot of the rate limit values last reported by the server.
+
+        :return: {"limit": int, "remaining": int, "reset": str, "retry_after": str}
+        :rtype: dict
+        """
+        with self._rate_limit_lock:
+            return {"limit": self.rate_limit, "remaining": self.rate_limit_remaining,
+                    "reset": self.rate_limit_reset, "retry_after": self.retry_after}
+
+    @property
+    def r(self):
+        """
+        The last response received by the calling thread.
+        """
+        return getattr(self._local, "r", None)
+
+    @r.setter
+    def r(self, value):
+        self._local.r = value
+
+    @property
+    def last_retry_stats(self):
+        """
+        The retries made by the most recent call on the calling thread.
+        """
+        stats = getattr(self._local, "last_retry_stats", None)
+        if stats is None:
+            stats = RetryStats()
+            self._local.last_retry_stats = stats
+        return stats
+
+    @last_retry_stats.setter
+    def last_retry_stats(self, value):
+        self._local.last_retry_stats = value
+
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Limits the time spent by all calls made on this thread inside the with block, including retries,
+        rate limit waits and fetching further pages of paged results. A call that would run past the deadline
+        raises DeadlineExceededError. Deadlines can be nested, the earliest one wins. ::
+
+            with c.deadline(30):
+                for page in c.list_files_changed_since(project_id, since):
+                    ...
+
+        :param float seconds: Number of seconds from now until the deadline
+        :raises DeadlineExceededError:
+        """
+        previous = getattr(self._local, "deadline", None)
+        deadline = time.monotonic() + seconds
+        if previous is not None:
+            deadline = min(previous, deadline)
+        self._local.deadline = deadline
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
 
     @staticmethod
-    def get_apikey(email, password, base_url="https://materialscommons.org/api"):
+    def get_apikey(email, password, base_url="https://materialscommons.org/api", timeout=(10.0, 60.0)):
         """
         Retrieve the API Key for the given user.
 
         :param str email: The users email address
         :param str password: The password for the user
         :param str base_url: Optional, defaults to https://materialscommns.org/api. Used to connect to a different server.
+        :param tuple timeout: Optional, defaults to (10, 60). The connect and read timeouts in seconds, as for Client.
         :return: The users apikey
         :rtype: str
         :raises MCAPIError:
         """
         url = base_url + "/get_apitoken"
         form = {"email": email, "password": password}
-        r = requests.post(url, json=form, verify=False)
+        r = requests.post(url, json=form, verify=False, timeout=timeout)
         r.raise_for_status()
         return r.json()["data"]["api_token"]
 
     @staticmethod
-    def login(email, password, base_url="https://materialscommons.org/api"):
+    def login(email, password, base_url="https://materialscommons.org/api", timeout=(10.0, 60.0)):
         """
         Creates a new instance of the Client by retrieving the given user's APIKey.
 
         :param str email: The users email address
         :param str password: The password for the user
         :param str base_url: Optional, defaults to https://materialscommns.org/api. Used to connect to a different server.
+        :param tuple timeout: Optional, defaults to (10, 60). The connect and read timeouts in seconds for the login.
         :return: The users apikey
         :rtype: str
         :raises MCAPIError:
         """
-        apikey = Client.get_apikey(email, password, base_url)
+        apikey = Client.get_apikey(email, password, base_url, timeout)
         return Client(apikey, base_url)
 
     @staticmethod
@@ -160,22 +475,122 @@ class Client(object):
         return Server(self._get("/server/info"))
 
     # Projects
-    def get_all_projects(self, params=None):
+    def get_all_projects(self, params=None, preset=None, raw=False):
         """
         Returns a list of all the projects a user has access to.
 
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: List of projects
         :rtype: Project[]
         :raises MCAPIError:
         """
-        return Project.from_list(self._get("/projects", params))
+        params = _with_preset(params, "projects", preset)
+        return from_list(self._item_class(Project, raw), self._get("/projects", params))
 
-    def get_all_project_files_matching(self, match, starting_page=None, page_size=None):
-        return self._get_files_matching("/projects/files/matching", match, starting_page, page_size)
+    def get_all_projects_paged(self, params=None, starting_page=None, page_size=None, preset=None, raw=False):
+        """
+        Returns the projects a user has access to, a page at a time.
 
-    def get_project_files_matching(self, project_id, match, starting_page=None, page_size=None):
-        return self._get_files_matching(f"/projects/{project_id}/files/matching", match, starting_page, page_size)
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of projects
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "projects", preset)
+        return self._get_all_paged(self._item_class(Project, raw), "/projects", params, starting_page, page_size)
+
+    def iter_all_projects(self, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the projects a user has access to, fetching them a page at a time.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The projects
+        :rtype: Project generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "projects", preset)
+        pages = self._get_all_paged(self._item_class(Project, raw), "/projects", params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_all_projects(self, params=None, preset=None, raw=False):
+        """
+        Returns the projects a user has access to one at a time, decoding them as the response is read. Only one item is
+        kept in memory at a time. The response isn't cached.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The projects
+        :rtype: Project generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "projects", preset)
+        return self._get_stream(self._item_class(Project, raw), "/projects", params)
+
+    def get_all_project_files_matching(self, match, starting_page=None, page_size=None, preset=None, raw=False):
+        url = "/projects/files/matching"
+        return self._get_files_matching(url, match, starting_page, page_size, preset=preset, raw=raw)
+
+    def get_project_files_matching(self, project_id, match, starting_page=None, page_size=None, preset=None, raw=False):
+        url = f"/projects/{project_id}/files/matching"
+        return self._get_files_matching(url, match, starting_page, page_size, preset=preset, raw=raw)
+
+    def iter_all_project_files_matching(self, match, page_size=None, preset=None, raw=False):
+        """
+        Iterates over the files matching match in all the user's projects, fetching them a page at a time.
+
+        :param match: A match string or a list of them
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The matching files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        url = "/projects/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, read_ahead=1, preset=preset, raw=raw))
+
+    def iter_project_files_matching(self, project_id, match, page_size=None, preset=None, raw=False):
+        """
+        Iterates over the files matching match in a project, fetching them a page at a time.
+
+        :param int project_id: The id of the project
+        :param match: A match string or a list of them
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The matching files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        url = f"/projects/{project_id}/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, read_ahead=1, preset=preset, raw=raw))
+
+    def get_project_files_matching_table(self, project_id, match, page_size=None, preset=None):
+        """
+        Gets the files matching match in a project as a FileTable, filled from the responses a page at a time
+        without building a File for each. Requires NumPy.
+
+        :param int project_id: The id of the project
+        :param match: A match string or a list of them
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "sizes-and-checksums", see QueryParams.preset()
+        :return: The matching files
+        :rtype: FileTable
+        :raises MCAPIError:
+        """
+        url = f"/projects/{project_id}/files/matching"
+        pages = self._get_files_matching(url, match, None, page_size, preset=preset, item_class=_as_is)
+        return FileTable.from_pages(page.data for page in pages)
 
     def create_project(self, name, attrs=None):
         """
@@ -274,17 +689,21 @@ class Client(object):
         return Project(self._put("/projects/" + str(project_id) + "/remove-admin/" + str(user_id), {}))
 
     # Experiments
-    def get_all_experiments(self, project_id, params=None):
+    def get_all_experiments(self, project_id, params=None, preset=None, raw=False):
         """
         Get all experiments for a given project.
 
         :param int project_id: The project id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: A list of experiments
         :rtype: Experiment[]
         :raises MCAPIError:
         """
-        return Experiment.from_list(self._get("/projects/" + str(project_id) + "/experiments", params))
+        params = _with_preset(params, "experiments", preset)
+        experiments = self._get("/projects/" + str(project_id) + "/experiments", params)
+        return from_list(self._item_class(Experiment, raw), experiments)
 
     def get_experiment(self, experiment_id, params=None):
         """
@@ -365,33 +784,57 @@ class Client(object):
         """
         return File(self._get("/projects/" + str(project_id) + "/directories/" + str(directory_id), params))
 
-    def list_directory(self, project_id, directory_id, params=None):
+    def list_directory(self, project_id, directory_id, params=None, preset=None, raw=False):
         """
         Return a list of all the files and directories in a given directory.
 
         :param int project_id: The id of the project the directory is in
         :param int directory_id: The directory id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: A list of the files and directories in the given directory
         :rtype: File[]
         :raises MCAPIError:
         """
-        return File.from_list(
-            self._get("/projects/" + str(project_id) + "/directories/" + str(directory_id) + "/list", params))
+        params = _with_preset(params, "files", preset)
+        urlpart = "/projects/" + str(project_id) + "/directories/" + str(directory_id) + "/list"
+        return from_list(self._item_class(File, raw), self._get(urlpart, params))
+
+    def list_directory_table(self, project_id, directory_id, params=None, preset=None):
+        """
+        Return the files and directories in a given directory as a FileTable, without building a File for
+        each. Requires NumPy.
+
+        :param int project_id: The id of the project the directory is in
+        :param int directory_id: The directory id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "sizes-and-checksums", see QueryParams.preset()
+        :return: The files and directories in the given directory
+        :rtype: FileTable
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "files", preset)
+        urlpart = "/projects/" + str(project_id) + "/directories/" + str(directory_id) + "/list"
+        return FileTable.from_rows(self._get(urlpart, params) or [])
 
-    def list_directory_by_path(self, project_id, path, params=None):
+    def list_directory_by_path(self, project_id, path, params=None, preset=None, raw=False):
         """
         Return a list of all the files and directories at given path.
 
         :param int project_id: The id of the project the path is in
         :param str path:
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: A list of the files and directories in the given path
         :rtype: File[]
         :raises MCAPIError:
         """
+        params = _with_preset(params, "files", preset)
         path_param = {"path": path.replace('\\', '/')}
-        return File.from_list(self._get("/projects/" + str(project_id) + "/directories_by_path", params, path_param))
+        files = self._get("/projects/" + str(project_id) + "/directories_by_path", params, path_param)
+        return from_list(self._item_class(File, raw), files)
 
     def create_directory(self, project_id, name, parent_id, attrs=None):
         """
@@ -514,7 +957,7 @@ class Client(object):
         :raises MCAPIError:
         """
         form = {"path": file_path.replace('\\', '/'), "project_id": project_id}
-        return File(self._post("/files/by_path", form))
+        return File(self._post("/files/by_path", form, read_only=True))
 
     def update_file(self, project_id, file_id, attrs):
         """
@@ -628,9 +1071,7 @@ class Client(object):
 
         uploader = self._tus_client.uploader(file_path=file_path, chunk_size=self._tus_chunk_size, retries=5,
                                              retry_delay=5, metadata=metadata, verify_tls_cert=self._verify_tls_cert)
-        uploader.upload()
-
-        return uploader.url
+        return self._tus_upload(project_id, uploader)
 
     def resumable_upload_file(self, project_id, directory_id, file_path, show_progress=False, url=None):
         """
@@ -657,12 +1098,7 @@ class Client(object):
         uploader = self._tus_client.uploader(file_path=file_path, chunk_size=self._tus_chunk_size, retries=5, url=url,
                                              retry_delay=5, metadata=metadata, verify_tls_cert=self._verify_tls_cert)
 
-        if show_progress:
-            self._upload_to_tus_with_progress(uploader, filename)
-        else:
-            uploader.upload()
-
-        return uploader.url
+        return self._tus_upload(project_id, uploader, filename, show_progress)
 
     def resumable_upload_file_stream(self, project_id, directory_id, filename, file_stream, show_progress=False, url=None):
         """
@@ -688,11 +1124,20 @@ class Client(object):
 
         uploader = self._tus_client.uploader(file_stream=file_stream, chunk_size=self._tus_chunk_size, retries=5,
                                              retry_delay=5, metadata=metadata, verify_tls_cert=self._verify_tls_cert)
-        if show_progress:
-            self._upload_to_tus_with_progress(uploader, filename)
-        else:
-            uploader.upload()
+        return self._tus_upload(project_id, uploader, filename, show_progress)
 
+    def _tus_upload(self, project_id, uploader, filename=None, show_progress=False):
+        """
+        Runs a TUS upload. The upload doesn't go through the request helpers, so the project's cached
+        responses are dropped here.
+        """
+        try:
+            if show_progress:
+                self._upload_to_tus_with_progress(uploader, filename)
+            else:
+                uploader.upload()
+        finally:
+            self._invalidate_cached("/projects/" + str(project_id))
         return uploader.url
 
     def _upload_to_tus_with_progress(self, uploader, filename):
@@ -746,7 +1191,7 @@ class Client(object):
                              f))
         return files[0]
 
-    def list_files_changed_since(self, project_id, since, starting_page=None, page_size=None):
+    def list_files_changed_since(self, project_id, since, starting_page=None, page_size=None, preset=None, raw=False):
         """
         Lists files changed (uploaded) in project since datetime in since
 
@@ -754,11 +1199,13 @@ class Client(object):
         :param str since: The datetime to get files changed since, form "YYYY-MM-DD HH:MM:SS"
         :param int starting_page: The starting page to retrieve
         :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: The list of files changed
         :rtype: Paged
         :raises MCAPIError:
         """
-        params = {"since": since}
+        params = _with_preset({"since": since}, "files", preset)
 
         if starting_page is not None:
             params["page[number]"] = starting_page
@@ -766,30 +1213,123 @@ class Client(object):
         if page_size is not None:
             params["page[size]"] = page_size
 
-        files = File.from_list(
-            self._get("/projects/" + str(project_id) + "/file-changes-since", params))
-        p = Paged(self.r.json(), files)
-        first_page = p.current_page
-        last_page = p.last_page
-        yield p
-        for page in range(first_page + 1, last_page + 1):
-            params["page[number]"] = page
-            files = File.from_list(self._get("/projects/" + str(project_id) + "/file-changes-since", params))
-            yield Paged(self.r.json(), files)
+        return self._files_changed_since(project_id, params, raw=raw)
+
+    def iter_files_changed_since(self, project_id, since, page_size=None, preset=None, raw=False):
+        """
+        Iterates over the files changed (uploaded) in project since datetime in since, fetching them a page at
+        a time. The next page is fetched in the background while the current one is used.
+
+        :param int project_id: The id of the project
+        :param str since: The datetime to get files changed since, form "YYYY-MM-DD HH:MM:SS"
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The files changed
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        params = _set_paging_params(_with_preset({"since": since}, "files", preset), None, page_size)
+        return _iter_items(self._files_changed_since(project_id, params, raw=raw, read_ahead=1))
+
+    def get_files_changed_since_table(self, project_id, since, page_size=None, preset=None):
+        """
+        Gets the files changed (uploaded) in project since datetime in since as a FileTable, filled from the
+        responses a page at a time without building a File for each. Requires NumPy. ::
+
+            table = c.get_files_changed_since_table(project_id, "1970-01-01 00:00:00", preset="sizes-and-checksums")
+            directory_ids, sizes = table.group_sum("directory_id")
+
+        :param int project_id: The id of the project
+        :param str since: The datetime to get files changed since, form "YYYY-MM-DD HH:MM:SS"
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "sizes-and-checksums", see QueryParams.preset()
+        :return: The files changed
+        :rtype: FileTable
+        :raises MCAPIError:
+        """
+        params = _set_paging_params(_with_preset({"since": since}, "files", preset), None, page_size)
+        pages = self._files_changed_since(project_id, params, item_class=_as_is)
+        return FileTable.from_pages(page.data for page in pages)
+
+    def _files_changed_since(self, project_id, params, read_ahead=None, raw=False, item_class=None):
+        urlpart = "/projects/" + str(project_id) + "/file-changes-since"
+        item_class = item_class or self._item_class(File, raw)
+
+        def fetch(page_params):
+            return self._get_paged(urlpart, page_params)
+
+        return self._iter_pages(item_class, fetch, params, read_ahead)
 
     # Entities
 
-    def get_all_entities(self, project_id, params=None):
+    def get_all_entities(self, project_id, params=None, preset=None, raw=False):
         """
         Get all entities in a project.
 
         :param int project_id: The id of the project
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: The list of entities
         :rtype: Entity[]
         :raises MCAPIError:
         """
-        return Entity.from_list(self._get("/projects/" + str(project_id) + "/entities", params))
+        params = _with_preset(params, "entities", preset)
+        return from_list(self._item_class(Entity, raw), self._get("/projects/" + str(project_id) + "/entities", params))
+
+    def get_all_entities_paged(self, project_id, params=None, starting_page=None, page_size=None,
+                               preset=None, raw=False):
+        """
+        Get the entities in a project, a page at a time.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of entities
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        return self._get_all_paged(self._item_class(Entity, raw), "/projects/" + str(project_id) + "/entities",
+                                   params, starting_page, page_size)
+
+    def iter_all_entities(self, project_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the entities in a project, fetching them a page at a time.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The entities
+        :rtype: Entity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        pages = self._get_all_paged(self._item_class(Entity, raw), "/projects/" + str(project_id) + "/entities",
+                                    params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_all_entities(self, project_id, params=None, preset=None, raw=False):
+        """
+        Returns the entities in a project one at a time, decoding them as the response is read. Only one item is kept in
+        memory at a time. The response isn't cached.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The entities
+        :rtype: Entity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        return self._get_stream(self._item_class(Entity, raw), "/projects/" + str(project_id) + "/entities", params)
 
     def get_entity(self, project_id, entity_id, params=None):
         """
@@ -858,17 +1398,74 @@ class Client(object):
             activity_id) + "/create-entity-state", form))
 
     # Activities
-    def get_all_activities(self, project_id, params=None):
+    def get_all_activities(self, project_id, params=None, preset=None, raw=False):
         """
         Get all activities in a project.
 
         :param int project_id: The id of the project
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: List of activities
         :rtype: Activity[]
         :raises MCAPIError:
         """
-        return Activity.from_list(self._get("/projects/" + str(project_id) + "/activities", params))
+        params = _with_preset(params, "activities", preset)
+        activities = self._get("/projects/" + str(project_id) + "/activities", params)
+        return from_list(self._item_class(Activity, raw), activities)
+
+    def get_all_activities_paged(self, project_id, params=None, starting_page=None, page_size=None,
+                                 preset=None, raw=False):
+        """
+        Get the activities in a project, a page at a time.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of activities
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        return self._get_all_paged(self._item_class(Activity, raw), "/projects/" + str(project_id) + "/activities",
+                                   params, starting_page, page_size)
+
+    def iter_all_activities(self, project_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the activities in a project, fetching them a page at a time.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The activities
+        :rtype: Activity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        pages = self._get_all_paged(self._item_class(Activity, raw), "/projects/" + str(project_id) + "/activities",
+                                    params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_all_activities(self, project_id, params=None, preset=None, raw=False):
+        """
+        Returns the activities in a project one at a time, decoding them as the response is read. Only one item is kept
+        in memory at a time. The response isn't cached.
+
+        :param int project_id: The id of the project
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The activities
+        :rtype: Activity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        return self._get_stream(self._item_class(Activity, raw), "/projects/" + str(project_id) + "/activities", params)
 
     def get_activity(self, project_id, activity_id, params=None):
         """
@@ -913,28 +1510,137 @@ class Client(object):
         self._delete("/projects/" + str(project_id) + "/activities/" + str(activity_id))
 
     # Datasets
-    def get_all_datasets(self, project_id, params=None):
+    def get_all_datasets(self, project_id, params=None, preset=None, raw=False):
         """
         Get all datasets in a project.
 
         :param int project_id: The project id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: The list of datasets
         :rtype: Dataset[]
         :raises MCAPIError:
         """
-        return Dataset.from_list(self._get("/projects/" + str(project_id) + "/datasets", params))
+        params = _with_preset(params, "datasets", preset)
+        datasets = self._get("/projects/" + str(project_id) + "/datasets", params)
+        return from_list(self._item_class(Dataset, raw), datasets)
+
+    def get_all_datasets_paged(self, project_id, params=None, starting_page=None, page_size=None,
+                               preset=None, raw=False):
+        """
+        Get the datasets in a project, a page at a time.
+
+        :param int project_id: The project id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of datasets
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        return self._get_all_paged(self._item_class(Dataset, raw), "/projects/" + str(project_id) + "/datasets",
+                                   params, starting_page, page_size)
+
+    def iter_all_datasets(self, project_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the datasets in a project, fetching them a page at a time.
+
+        :param int project_id: The project id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The datasets
+        :rtype: Dataset generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        pages = self._get_all_paged(self._item_class(Dataset, raw), "/projects/" + str(project_id) + "/datasets",
+                                    params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_all_datasets(self, project_id, params=None, preset=None, raw=False):
+        """
+        Returns the datasets in a project one at a time, decoding them as the response is read. Only one item is kept in
+        memory at a time. The response isn't cached.
+
+        :param int project_id: The project id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The datasets
+        :rtype: Dataset generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        return self._get_stream(self._item_class(Dataset, raw), "/projects/" + str(project_id) + "/datasets", params)
 
-    def get_all_published_datasets(self, params=None):
+    def get_all_published_datasets(self, params=None, preset=None, raw=False):
         """
         Get all published datasets.
 
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: The list of published datasets
         :rtype: Dataset[]
         :raises MCAPIError:
         """
-        return Dataset.from_list(self._get("/published/datasets", params))
+        params = _with_preset(params, "datasets", preset)
+        return from_list(self._item_class(Dataset, raw), self._get("/published/datasets", params))
+
+    def get_all_published_datasets_paged(self, params=None, starting_page=None, page_size=None, preset=None, raw=False):
+        """
+        Get the published datasets, a page at a time.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of published datasets
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        return self._get_all_paged(self._item_class(Dataset, raw), "/published/datasets", params, starting_page,
+                                   page_size)
+
+    def iter_all_published_datasets(self, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the published datasets, fetching them a page at a time.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The published datasets
+        :rtype: Dataset generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        pages = self._get_all_paged(self._item_class(Dataset, raw), "/published/datasets", params, None, page_size,
+                                    read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_all_published_datasets(self, params=None, preset=None, raw=False):
+        """
+        Returns the published datasets one at a time, decoding them as the response is read. Only one item is kept in
+        memory at a time. The response isn't cached.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The published datasets
+        :rtype: Dataset generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "datasets", preset)
+        return self._get_stream(self._item_class(Dataset, raw), "/published/datasets", params)
 
     def get_published_dataset(self, dataset_id, params=None):
         """
@@ -948,18 +1654,93 @@ class Client(object):
         """
         return Dataset(self._get("/published/datasets/" + str(dataset_id), params))
 
-    def get_published_dataset_files(self, dataset_id, params=None):
+    def get_published_dataset_files(self, dataset_id, params=None, preset=None, raw=False):
         """
         Get files for a published dataset.
 
         :param int dataset_id: The dataset id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :rtype: File[]
         :return: The files
         :raises MCAPIError:
         """
-        return File.from_list(
-            self._get("/published/datasets/" + str(dataset_id) + "/files", params))
+        params = _with_preset(params, "files", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/files"
+        return from_list(self._item_class(File, raw), self._get(urlpart, params))
+
+    def get_published_dataset_files_paged(self, dataset_id, params=None, starting_page=None, page_size=None,
+                                          preset=None, raw=False):
+        """
+        Get the files for a published dataset, a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of files
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "files", preset)
+        return self._get_all_paged(self._item_class(File, raw), "/published/datasets/" + str(dataset_id) + "/files",
+                                   params, starting_page, page_size)
+
+    def iter_published_dataset_files(self, dataset_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the files for a published dataset, fetching them a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "files", preset)
+        pages = self._get_all_paged(self._item_class(File, raw), "/published/datasets/" + str(dataset_id) + "/files",
+                                    params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def get_published_dataset_files_table(self, dataset_id, params=None, page_size=None, preset=None):
+        """
+        Get the files for a published dataset as a FileTable, filled from the responses a page at a time
+        without building a File for each. Requires NumPy.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "sizes-and-checksums", see QueryParams.preset()
+        :return: The files
+        :rtype: FileTable
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "files", preset)
+        pages = self._get_all_paged(_as_is, "/published/datasets/" + str(dataset_id) + "/files", params, None,
+                                    page_size)
+        return FileTable.from_pages(page.data for page in pages)
+
+    def stream_published_dataset_files(self, dataset_id, params=None, preset=None, raw=False):
+        """
+        Returns the files for a published dataset one at a time, decoding them as the response is read. Only one item is
+        kept in memory at a time. The response isn't cached.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "files", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/files"
+        return self._get_stream(self._item_class(File, raw), urlpart, params)
 
     def get_published_dataset_directory(self, dataset_id, directory_id, params=None):
         """
@@ -974,60 +1755,180 @@ class Client(object):
         """
         return File(self._get("/published/datasets/" + str(dataset_id) + "/directories/" + str(directory_id), params))
 
-    def list_published_dataset_directory(self, dataset_id, directory_id, params=None):
+    def list_published_dataset_directory(self, dataset_id, directory_id, params=None, preset=None, raw=False):
         """
         Return a list of all the files and directories in a given published dataset directory.
 
         :param int dataset_id: The id of the dataset the directory is in
         :param int directory_id: The directory id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: A list of the files and directories in the given directory
         :rtype: File[]
         :raises MCAPIError:
         """
-        return File.from_list(
-            self._get("/published/datasets/" + str(dataset_id) + "/directories/" + str(directory_id) + "/list", params))
+        params = _with_preset(params, "files", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/directories/" + str(directory_id) + "/list"
+        return from_list(self._item_class(File, raw), self._get(urlpart, params))
 
-    def list_published_dataset_directory_by_path(self, dataset_id, path, params=None):
+    def list_published_dataset_directory_by_path(self, dataset_id, path, params=None, preset=None, raw=False):
         """
         Return a list of all the files and directories at given path.
 
         :param int dataset_id: The id of the dataset the path is in
         :param str path:
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: A list of the files and directories in the given path
         :rtype: File[]
         :raises MCAPIError:
         """
+        params = _with_preset(params, "files", preset)
         path_param = {"path": path.replace('\\', '/')}
-        return File.from_list(
-            self._get("/published/datasets/" + str(dataset_id) + "/directories_by_path", params, path_param))
+        urlpart = "/published/datasets/" + str(dataset_id) + "/directories_by_path"
+        return from_list(self._item_class(File, raw), self._get(urlpart, params, path_param))
 
-    def get_published_dataset_entities(self, dataset_id, params=None):
+    def get_published_dataset_entities(self, dataset_id, params=None, preset=None, raw=False):
         """
         Get entities for a published dataset.
 
         :param int dataset_id: The dataset id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :rtype: Entity[]
         :return: The entities
         :raises MCAPIError:
         """
-        return Entity.from_list(
-            self._get("/published/datasets/" + str(dataset_id) + "/entities", params))
+        params = _with_preset(params, "entities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        return from_list(self._item_class(Entity, raw), self._get(urlpart, params))
+
+    def get_published_dataset_entities_paged(self, dataset_id, params=None, starting_page=None, page_size=None,
+                                             preset=None, raw=False):
+        """
+        Get the entities for a published dataset, a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of entities
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        return self._get_all_paged(self._item_class(Entity, raw), urlpart, params, starting_page, page_size)
+
+    def iter_published_dataset_entities(self, dataset_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the entities for a published dataset, fetching them a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The entities
+        :rtype: Entity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        pages = self._get_all_paged(self._item_class(Entity, raw), urlpart, params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_published_dataset_entities(self, dataset_id, params=None, preset=None, raw=False):
+        """
+        Returns the entities for a published dataset one at a time, decoding them as the response is read. Only one item
+        is kept in memory at a time. The response isn't cached.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The entities
+        :rtype: Entity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "entities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/entities"
+        return self._get_stream(self._item_class(Entity, raw), urlpart, params)
 
-    def get_published_dataset_activities(self, dataset_id, params=None):
+    def get_published_dataset_activities(self, dataset_id, params=None, preset=None, raw=False):
         """
         Get activities for a published dataset.
 
         :param int dataset_id: The dataset id
         :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :rtype: Activity[]
         :return: The activities
         :raises MCAPIError:
         """
-        return Activity.from_list(
-            self._get("/published/datasets/" + str(dataset_id) + "/activities", params))
+        params = _with_preset(params, "activities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        return from_list(self._item_class(Activity, raw), self._get(urlpart, params))
+
+    def get_published_dataset_activities_paged(self, dataset_id, params=None, starting_page=None, page_size=None,
+                                               preset=None, raw=False):
+        """
+        Get the activities for a published dataset, a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of activities
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        return self._get_all_paged(self._item_class(Activity, raw), urlpart, params, starting_page, page_size)
+
+    def iter_published_dataset_activities(self, dataset_id, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the activities for a published dataset, fetching them a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The activities
+        :rtype: Activity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        pages = self._get_all_paged(self._item_class(Activity, raw), urlpart, params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_published_dataset_activities(self, dataset_id, params=None, preset=None, raw=False):
+        """
+        Returns the activities for a published dataset one at a time, decoding them as the response is read. Only one
+        item is kept in memory at a time. The response isn't cached.
+
+        :param int dataset_id: The dataset id
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The activities
+        :rtype: Activity generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "activities", preset)
+        urlpart = "/published/datasets/" + str(dataset_id) + "/activities"
+        return self._get_stream(self._item_class(Activity, raw), urlpart, params)
 
     def search_published_data(self, search_str):
         """
@@ -1039,14 +1940,48 @@ class Client(object):
         :raises MCAPIError:
         """
         form = {"search": search_str}
-        return Searchable.from_list(self._post("/published/data/search", form))
+        return Searchable.from_list(self._post("/published/data/search", form, read_only=True))
+
+    def get_all_published_dataset_files_matching(self, match, starting_page=None, page_size=None,
+                                                 preset=None, raw=False):
+        url = "/published/datasets/files/matching"
+        return self._get_files_matching(url, match, starting_page, page_size, preset=preset, raw=raw)
+
+    def get_published_dataset_files_matching(self, dataset_id, match, starting_page=None, page_size=None,
+                                             preset=None, raw=False):
+        url = f"/published/datasets/{dataset_id}/files/matching"
+        return self._get_files_matching(url, match, starting_page, page_size, preset=preset, raw=raw)
+
+    def iter_all_published_dataset_files_matching(self, match, page_size=None, preset=None, raw=False):
+        """
+        Iterates over the files matching match in all published datasets, fetching them a page at a time.
 
-    def get_all_published_dataset_files_matching(self, match, starting_page=None, page_size=None):
-        return self._get_files_matching("/published/datasets/files/matching", match, starting_page, page_size)
+        :param match: A match string or a list of them
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The matching files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        url = "/published/datasets/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, read_ahead=1, preset=preset, raw=raw))
 
-    def get_published_dataset_files_matching(self, dataset_id, match, starting_page=None, page_size=None):
-        return self._get_files_matching(f"/published/datasets/{dataset_id}/files/matching", match, starting_page,
-                                        page_size)
+    def iter_published_dataset_files_matching(self, dataset_id, match, page_size=None, preset=None, raw=False):
+        """
+        Iterates over the files matching match in a published dataset, fetching them a page at a time.
+
+        :param int dataset_id: The dataset id
+        :param match: A match string or a list of them
+        :param int page_size: Number of entries per page
+        :param str preset: Optional fieldset preset, such as "paths", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The matching files
+        :rtype: File generator
+        :raises MCAPIError:
+        """
+        url = f"/published/datasets/{dataset_id}/files/matching"
+        return _iter_items(self._get_files_matching(url, match, None, page_size, read_ahead=1, preset=preset, raw=raw))
 
     def import_dataset(self, dataset_id, project_id, directory_name):
         """
@@ -1328,7 +2263,7 @@ class Client(object):
         """
         form = {"file_path": file_path.replace('\\', '/')}
         return self._post("/projects/" + str(project_id) + "/datasets/" + str(dataset_id) + "/check_select_by_path",
-                          form)
+                          form, read_only=True)
 
     # Globus
     def create_globus_upload_request(self, project_id, name):
@@ -1466,15 +2401,65 @@ class Client(object):
         """
         return User(self._get("/users/by-apikey/" + self.apikey, params))
 
-    def list_users(self, params=None):
+    def list_users(self, params=None, preset=None, raw=False):
         """
         List users of Materials Commons.
 
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
         :return: List of users
         :rtype: User[]
         :raises MCAPIError:
         """
-        return User.from_list(self._get("/users", params))
+        params = _with_preset(params, "users", preset)
+        return from_list(self._item_class(User, raw), self._get("/users", params))
+
+    def list_users_paged(self, params=None, starting_page=None, page_size=None, preset=None, raw=False):
+        """
+        List the users of Materials Commons, a page at a time.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int starting_page: The starting page to retrieve
+        :param int page_size: Number of entries per page
+        :return: The pages of users
+        :rtype: Paged generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "users", preset)
+        return self._get_all_paged(self._item_class(User, raw), "/users", params, starting_page, page_size)
+
+    def iter_users(self, params=None, page_size=None, preset=None, raw=False):
+        """
+        Iterates over all the users of Materials Commons, fetching them a page at a time.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :param int page_size: Number of entries per page
+        :return: The users
+        :rtype: User generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "users", preset)
+        pages = self._get_all_paged(self._item_class(User, raw), "/users", params, None, page_size, read_ahead=1)
+        return _iter_items(pages)
+
+    def stream_users(self, params=None, preset=None, raw=False):
+        """
+        Returns the users of Materials Commons one at a time, decoding them as the response is read. Only one item is
+        kept in memory at a time. The response isn't cached.
+
+        :param params:
+        :param str preset: Optional fieldset preset, such as "ids-only", see QueryParams.preset()
+        :param bool raw: Return read-only Record views of the response instead of models, see Record
+        :return: The users
+        :rtype: User generator
+        :raises MCAPIError:
+        """
+        params = _with_preset(params, "users", preset)
+        return self._get_stream(self._item_class(User, raw), "/users", params)
 
     # Communities
     def create_community(self, name, attrs={}):
@@ -1617,7 +2602,7 @@ class Client(object):
         :raises MCAPIError:
         """
         form = {"author": author}
-        return Dataset.from_list(self._post("/published/authors/search", form))
+        return Dataset.from_list(self._post("/published/authors/search", form, read_only=True))
 
     def get_published_datasets_for_tag(self, tag):
         """
@@ -1629,7 +2614,7 @@ class Client(object):
         :raises MCAPIError:
         """
         form = {"tag": tag}
-        return Dataset.from_list(self._post("/published/tags/search", form))
+        return Dataset.from_list(self._post("/published/tags/search", form, read_only=True))
 
     def list_authors_in_community(self, community_id):
         """
@@ -1682,8 +2667,13 @@ class Client(object):
 
     # Internal
 
-    def _get_files_matching(self, url, match, starting_page, page_size):
-        params = _set_paging_params({}, starting_page, page_size)
+    def _get_all_paged(self, cls, urlpart, params, starting_page, page_size, read_ahead=None):
+        query = _set_paging_params(dict(QueryParams.to_query_args(params)), starting_page, page_size)
+        return self._iter_pages(cls, lambda page_params: self._get_paged(urlpart, page_params), query, read_ahead)
+
+    def _get_files_matching(self, url, match, starting_page, page_size, read_ahead=None, preset=None, raw=False,
+                            item_class=None):
+        params = _set_paging_params(_with_preset({}, "files", preset), starting_page, page_size)
         form = {}
 
         # API user can either send us a single string match, or an array of matches
@@ -1693,107 +2683,466 @@ class Client(object):
         else:
             form["match"] = [match]
 
-        files = File.from_list(self._post(url, form, params=params))
-        p = Paged(self.r.json(), files)
+        def fetch(page_params):
+            return self._post_paged(url, form, params=page_params)
+
+        return self._iter_pages(item_class or self._item_class(File, raw), fetch, params, read_ahead)
+
+    def _iter_pages(self, cls, fetch, params, read_ahead=None):
+        """
+        Generates the Paged results of a paged listing. fetch(params) returns the response body for one page.
+        The first page tells how many pages there are, the rest are fetched in the background by up to
+        page_workers threads, at most read_ahead pages ahead of the caller (by default twice page_workers),
+        and yielded in order. Pages not yet started are cancelled when the generator is closed.
+        """
+        if self.adaptive_page_size is not None:
+            yield from self._iter_pages_adaptive(cls, fetch, params)
+            return
+        p = _paged(cls, fetch(params))
         first_page = p.current_page
         last_page = p.last_page
-        yield p
-        for page in range(first_page + 1, last_page + 1):
-            params["page[number]"] = page
-            files = File.from_list(self._post(url, form, params=params))
-            yield Paged(self.r.json(), files)
-
-    def _throttle(self):
-        if self._throttle_s < 0:
-            self._throttle_s = 0.0
-        if self._throttle_s:
-            time.sleep(self._throttle_s)
+        if first_page is None or last_page is None:
+            yield p
+            return
+        pages = iter(range(first_page + 1, last_page + 1))
+        if read_ahead is None:
+            read_ahead = 2 * self.page_workers if self.page_workers > 1 else 0
+        if read_ahead <= 0:
+            yield p
+            for page in pages:
+                yield _paged(cls, fetch(_merge_dicts(params, {"page[number]": page})))
+            return
+
+        deadline = getattr(self._local, "deadline", None)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.page_workers, read_ahead)),
+                                      thread_name_prefix="mcapi-pages")
+        in_flight = deque()
+
+        def submit_next():
+            page = next(pages, None)
+            if page is not None:
+                page_params = _merge_dicts(params, {"page[number]": page})
+                in_flight.append(executor.submit(self._call_with_deadline, deadline, fetch, page_params))
+
+        def next_body():
+            body = in_flight.popleft().result()
+            submit_next()
+            return body
+
+        try:
+            for _ in range(read_ahead):
+                submit_next()
+            yield p
+            p = None
+            while in_flight:
+                yield _paged(cls, next_body())
+        finally:
+            for f in in_flight:
+                f.cancel()
+            executor.shutdown(wait=False)
+
+    def _iter_pages_adaptive(self, cls, fetch, params):
+        """
+        Generates the Paged results of a paged listing one page at a time, choosing each page's size with
+        adaptive_page_size from the response time and size of the page before it.
+        """
+        sizer = self.adaptive_page_size
+        page = int(params.get("page[number]", 1))
+        requested = params.get("page[size]", None)
+        size = sizer.first_size(requested)
+        if page > 1:
+            # The starting page is counted in the caller's page size, so start at the same item: with a
+            # power of two size that divides its offset if there is one, otherwise with the caller's size.
+            if requested is None:
+                size = None
+            else:
+                offset = (page - 1) * int(requested)
+                size = _aligned_page_size(offset, int(requested), size)
+                page = offset // size + 1
+        while True:
+            start = time.monotonic()
+            page_params = {"page[number]": page} if size is None else {"page[number]": page, "page[size]": size}
+            p = _paged(cls, fetch(_merge_dicts(params, page_params)))
+            elapsed = time.monotonic() - start
+            nbytes = len(self.r.content) if self.r is not None else 0
+            if p.current_page is None or p.last_page is None or p.per_page is None:
+                yield p
+                return
+            page, size, last_page, items = int(p.current_page), int(p.per_page), int(p.last_page), len(p.data)
+            yield p
+            if page >= last_page or items == 0:
+                return
+            status = self.get_rate_limit_status()
+            desired = sizer.next_size(size, elapsed, items, nbytes, status["remaining"], status["limit"])
+            offset = page * size
+            size = _aligned_page_size(offset, size, desired)
+            page = offset // size + 1
+
+    def _call_with_deadline(self, deadline, fn, *args):
+        # Runs fn on a worker thread, carrying over the caller's deadline.
+        self._local.deadline = deadline
+        try:
+            return fn(*args)
+        finally:
+            self._local.deadline = None
+
+    def _throttle(self, deadline=None):
+        wait = self.rate_limiter.reserve()
+        if wait > 0:
+            self._sleep_before_deadline(wait, deadline, "waiting for rate limit")
+
+    def _sleep_before_deadline(self, seconds, deadline, reason, response=None):
+        if deadline is not None and time.monotonic() + seconds > deadline:
+            raise DeadlineExceededError("deadline exceeded " + reason, response)
+        time.sleep(seconds)
+
+    def _check_deadline(self, deadline):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceededError("deadline exceeded")
+
+    def _timeout_for(self, deadline):
+        if deadline is None:
+            return self.timeout
+        remaining = max(deadline - time.monotonic(), 0.001)
+        return tuple(remaining if t is None else min(t, remaining) for t in self.timeout)
 
     # request calls
+    def _request(self, method, url, **kwargs):
+        deadline = getattr(self._local, "deadline", None)
+        stats = RetryStats()
+        # A body with files that can't be rewound is only sent once, a retry would send the rest of the files.
+        positions = _file_positions(kwargs)
+        try:
+            attempt = 0
+            while True:
+                self._check_deadline(deadline)
+                if _aborted():
+                    raise requests.ConnectionError("superseded by a hedged request")
+                self._throttle(deadline)
+                for f, position in positions or ():
+                    f.seek(position)
+                r = None
+                try:
+                    r = self._session.request(method, url, timeout=self._timeout_for(deadline), **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise DeadlineExceededError("deadline exceeded: " + str(e), None) from e
+                    if positions is None or _aborted() or \
+                            not self.retry_policy.should_retry(method, attempt, None, self.retry_stats.retries):
+                        raise
+                    delay = self.retry_policy.delay(attempt)
+                else:
+                    if r.status_code == 415 and _is_gzipped(kwargs):
+                        # The server doesn't take compressed bodies, send this one and the later ones as is.
+                        self._server_accepts_gzip = False
+                        kwargs = _gunzipped(kwargs)
+                        r.close()
+                        continue
+                    if not kwargs.get("stream", False):
+                        self._record_transfer(method, url, kwargs, r)
+                    if positions is None or \
+                            not self.retry_policy.should_retry(method, attempt, r, self.retry_stats.retries):
+                        return r
+                    self._update_rate_limits_from_request(r)
+                    delay = self.retry_policy.delay(attempt, r)
+                    r.close()
+                self._sleep_before_deadline(delay, deadline, "waiting to retry " + method + " " + url, r)
+                stats.add(1, delay)
+                self.retry_stats.add(1, delay)
+                attempt += 1
+        finally:
+            self.last_retry_stats = stats
+
+    def _item_class(self, cls, raw):
+        # What the listings build each item with: a Record with raw=True, otherwise cls, with identity_map
+        # active if there is one and raw data kept if keep_raw_data is set.
+        if raw:
+            return partial(Record, model_class=cls)
+        build = cls if self.identity_map is None else self.identity_map.bind(cls)
+        return _keeping_raw_data(build) if self.keep_raw_data else build
+
+    def _record_transfer(self, method, url, kwargs, r, received_bytes=None):
+        # Counts the request body and the response, which must have been read, in transfer_stats.
+        body = kwargs.get("data", None)
+        sent_wire_bytes = len(body) if isinstance(body, bytes) else 0
+        sent_bytes = _gzip_size(body) if _is_gzipped(kwargs) else sent_wire_bytes
+        if received_bytes is None:
+            received_bytes = len(r.content)
+        received_wire_bytes = r.raw.tell() if hasattr(r.raw, "tell") else received_bytes
+        urlpart = url[len(self.base_url):] if url.startswith(self.base_url) else urlparse(url).path
+        self.transfer_stats.record(endpoint_key(method, urlpart), sent_bytes, sent_wire_bytes, received_bytes,
+                                   received_wire_bytes)
+
+    def _read(self, method, urlpart, **kwargs):
+        """
+        Sends a request that doesn't change anything on the server, hedging it if a hedge_policy is set.
+        """
+        url = self.base_url + urlpart
+        policy = self.hedge_policy
+        if policy is None:
+            return self._request(method, url, **kwargs)
+        endpoint = endpoint_key(method, urlpart)
+        delay = policy.delay_for(endpoint)
+        if delay is None:
+            start = time.monotonic()
+            r = self._request(method, url, **kwargs)
+            policy.latencies.record(endpoint, time.monotonic() - start)
+            return r
+
+        # The first copy is sent on the calling thread, so hedging never limits how many reads are in flight.
+        # The second copy is sent by a worker if the first hasn't answered after delay.
+        deadline = getattr(self._local, "deadline", None)
+        attempt = _Attempt()
+        first_done = threading.Event()
+        hedge = self._get_hedge_executor().submit(self._call_with_deadline, deadline, self._send_hedge, endpoint,
+                                                  method, url, kwargs, time.monotonic() + delay, first_done, attempt)
+        _attempts.current = attempt
+        try:
+            r, _ = self._timed_request(endpoint, method, url, kwargs)
+        except requests.RequestException:
+            # Aborted because the second copy answered first, or failed: use the second copy if one was sent.
+            first_done.set()
+            try:
+                result = None if hedge.cancel() else hedge.result()
+            except requests.RequestException:
+                result = None
+            if result is None:
+                raise
+            policy.record_win()
+            r, self.last_retry_stats = result
+            return r
+        finally:
+            _attempts.current = None
+            first_done.set()
+        if not hedge.cancel():
+            hedge.add_done_callback(_close_response)
+        return r
+
+    def _send_hedge(self, endpoint, method, url, kwargs, at, first_done, attempt):
+        # Sends the second copy of a read if the first hasn't answered by at. Time spent waiting for a worker
+        # counts towards the wait. Returns None if no copy was sent.
+        if first_done.wait(max(0.0, at - time.monotonic())) or not self.hedge_policy.acquire_hedge():
+            return None
+        result = self._timed_request(endpoint, method, url, kwargs)
+        attempt.abort()
+        return result
+
+    def _timed_request(self, endpoint, method, url, kwargs):
+        start = time.monotonic()
+        r = self._request(method, url, **kwargs)
+        self.hedge_policy.latencies.record(endpoint, time.monotonic() - start)
+        return r, self.last_retry_stats
+
+    def _get_hedge_executor(self):
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=self._hedge_workers,
+                                                          thread_name_prefix="mcapi-hedge")
+            return self._hedge_executor
+
     def _download(self, urlpart, to):
-        self._throttle()
         url = self.base_url + urlpart
-        with requests.get(url, stream=True, verify=self._verify_tls_cert, headers=self.headers) as r:
+        deadline = getattr(self._local, "deadline", None)
+        with self._request("GET", url, stream=True) as r:
             self._handle(r)
             with open(to, 'wb') as f:
                 for chunk in r.iter_content(chunk_size=8192):
+                    self._check_deadline(deadline)
                     if chunk:
                         f.write(chunk)
 
     def _upload_to_path(self, urlpart, file_path, dest_path):
-        self._throttle()
         url = self.base_url + urlpart
         form = {'path': dest_path}
-        with open(file_path, 'rb') as f:
-            files = {'file': f}
-            r = requests.post(url, files=files, verify=self._verify_tls_cert, headers=self.headers, data=form)
-            return self._handle_with_json(r)
+        try:
+            with open(file_path, 'rb') as f:
+                files = {'file': f}
+                r = self._request("POST", url, files=files, data=form)
+                return self._handle_with_json(r)
+        finally:
+            self._invalidate_cached(urlpart)
 
     def _upload(self, urlpart, file_path):
-        self._throttle()
         url = self.base_url + urlpart
-        with open(file_path, 'rb') as f:
-            files = [('files[]', f)]
-            r = requests.post(url, verify=self._verify_tls_cert, headers=self.headers, files=files)
-            return self._handle_with_json(r)
+        try:
+            with open(file_path, 'rb') as f:
+                files = [('files[]', f)]
+                r = self._request("POST", url, files=files)
+                return self._handle_with_json(r)
+        finally:
+            self._invalidate_cached(urlpart)
 
     def _upload_raw(self, urlpart, f):
-        self._throttle()
         url = self.base_url + urlpart
         files = [('files[]', f)]
-        r = requests.post(url, verify=self._verify_tls_cert, headers=self.headers, files=files)
-        return self._handle_with_json(r)
+        try:
+            r = self._request("POST", url, files=files)
+            return self._handle_with_json(r)
+        finally:
+            self._invalidate_cached(urlpart)
 
     def _get(self, urlpart, params={}, other_params={}):
-        self._throttle()
         url = self.base_url + urlpart
         if self.log:
             print("GET:", url)
         params_to_use = _merge_dicts(QueryParams.to_query_args(params), other_params)
-        r = requests.get(url, params=params_to_use, verify=self._verify_tls_cert, headers=self.headers)
-        return self._handle_with_json(r)
+        if self.response_cache is not None:
+            found, result = self.response_cache.get(self._cache_user, self.base_url, urlpart, params_to_use)
+            if found:
+                return result
+        if self.single_flight is None:
+            r, result = self._send_get(urlpart, params_to_use)
+            return result
+        key = (url, _params_key(params_to_use), self.apikey)
+        deadline = getattr(self._local, "deadline", None)
+        try:
+            r, result = self.single_flight.do(key, lambda: self._send_get(urlpart, params_to_use), deadline)
+        except TimeoutError as e:
+            if deadline is None or time.monotonic() < deadline:
+                raise
+            raise DeadlineExceededError("deadline exceeded waiting for GET " + url) from e
+        self.r = r
+        return result
+
+    def _send_get(self, urlpart, params):
+        url = self.base_url + urlpart
+        cache = self.revalidation_cache
+        if cache is None:
+            r = self._read("GET", urlpart, params=params)
+            result = self._handle_with_json(r)
+        else:
+            key = (url, _params_key(params), self.apikey)
+            r = self._read("GET", urlpart, params=params, headers=cache.validators(key))
+            found = False
+            if r.status_code == 304:
+                self._handle(r)
+                found, result = cache.not_modified(key)
+                if not found:
+                    # The entry was dropped while the request was in flight, so fetch it in full.
+                    r = self._read("GET", urlpart, params=params)
+            if not found:
+                result = self._handle_with_json(r)
+                if r.status_code == 200:
+                    cache.store(key, r.headers, result)
+        if self.response_cache is not None and result is not None:
+            self.response_cache.put(self._cache_user, self.base_url, urlpart, params, result)
+        return r, result
+
+    def _get_paged(self, urlpart, params):
+        url = self.base_url + urlpart
+        if self.log:
+            print("GET:", url)
+        r = self._read("GET", urlpart, params=params)
+        return self._handle_with_body(r)
+
+    def _get_stream(self, cls, urlpart, params):
+        """
+        Generates cls objects from the data array of a GET response, decoding the array as it is read. The
+        response is closed when the generator is closed.
+        """
+        url = self.base_url + urlpart
+        if self.log:
+            print("GET:", url)
+        deadline = getattr(self._local, "deadline", None)
+        with self._request("GET", url, params=QueryParams.to_query_args(params), stream=True) as r:
+            if not r.ok:
+                # Read the error body while the connection is open so it is available on the exception.
+                r.content
+            if not self._handle(r) or r.headers.get('content-type') != 'application/json':
+                return
+            for item in JSONArrayStream(self._iter_content(r, deadline)):
+                yield cls(item)
+
+    def _iter_content(self, r, deadline):
+        received_bytes = 0
+        try:
+            for chunk in r.iter_content(chunk_size=65536):
+                self._check_deadline(deadline)
+                received_bytes += len(chunk)
+                yield chunk
+        finally:
+            self._record_transfer("GET", r.request.url, {}, r, received_bytes)
 
     def _get_no_value(self, urlpart):
-        self._throttle()
         url = self.base_url + urlpart
         if self.log:
             print("GET:", url)
-        r = requests.get(url, verify=self._verify_tls_cert, headers=self.headers)
+        r = self._request("GET", url)
         return self._handle(r)
 
-    def _post(self, urlpart, data={}, params=None):
-        self._throttle()
+    def _post(self, urlpart, data={}, params=None, read_only=False):
+        url = self.base_url + urlpart
+        if self.log:
+            print("POST:", url)
+        data = dict(data)
+        result = None
+        try:
+            if read_only:
+                r = self._read("POST", urlpart, params=params, **self._json_body(data))
+            else:
+                r = self._request("POST", url, params=params, **self._json_body(data))
+            result = self._handle_with_json(r)
+            return result
+        finally:
+            if not read_only:
+                self._invalidate_cached(urlpart, data, result)
+
+    def _post_paged(self, urlpart, data, params):
         url = self.base_url + urlpart
         if self.log:
             print("POST:", url)
-        data = OrderedDict(data)
-        r = requests.post(url, json=data, verify=self._verify_tls_cert, headers=self.headers, params=params)
-        return self._handle_with_json(r)
+        r = self._request("POST", url, params=params, **self._json_body(data))
+        return self._handle_with_body(r)
 
     def _put(self, urlpart, data):
-        self._throttle()
         url = self.base_url + urlpart
         if self.log:
             print("PUT:", url)
-        data = OrderedDict(data)
-        r = requests.put(url, json=data, verify=self._verify_tls_cert, headers=self.headers)
-        return self._handle_with_json(r)
+        data = dict(data)
+        result = None
+        try:
+            r = self._request("PUT", url, **self._json_body(data))
+            result = self._handle_with_json(r)
+            return result
+        finally:
+            self._invalidate_cached(urlpart, data, result)
+
+    def _json_body(self, data):
+        # The request arguments that send data as a JSON body, encoded with json_codec and compressed when
+        # it is at least compress_requests_over bytes.
+        body = self.json_codec.encode(data)
+        headers = {"Content-Type": "application/json"}
+        if self.compress_requests_over is not None and self._server_accepts_gzip and \
+                len(body) >= self.compress_requests_over:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        return {"data": body, "headers": headers}
 
     def _delete(self, urlpart, params=None):
-        self._throttle()
         url = self.base_url + urlpart
         if self.log:
             print("DELETE:", url)
-        r = requests.delete(url, verify=self._verify_tls_cert, params=params, headers=self.headers)
-        self._handle(r)
+        try:
+            r = self._request("DELETE", url, params=params)
+            self._handle(r)
+        finally:
+            self._invalidate_cached(urlpart)
 
     def _delete_with_value(self, urlpart):
-        self._throttle()
         url = self.base_url + urlpart
         if self.log:
             print("DELETE:", url)
-        r = requests.delete(url, verify=self._verify_tls_cert, headers=self.headers)
-        return self._handle_with_json(r)
+        try:
+            r = self._request("DELETE", url)
+            return self._handle_with_json(r)
+        finally:
+            self._invalidate_cached(urlpart)
+
+    def _invalidate_cached(self, urlpart, data=None, result=None):
+        if self.response_cache is None:
+            return
+        prefixes, urls = _invalidation_scopes(urlpart, data, result)
+        self.response_cache.invalidate(self._cache_user, self.base_url, prefixes, urls)
 
     def _handle(self, r):
         # try:
@@ -1814,23 +3163,26 @@ class Client(object):
             raise MCAPIError(str(e), e.response)
 
     def _handle_with_json(self, r):
+        result = self._handle_with_body(r)
+        if result is not None and "data" in result:
+            return result["data"]
+        return result
+
+    def _handle_with_body(self, r):
         if not self._handle(r):
             return None
         if r.headers.get('content-type') == 'application/json':
-            result = r.json()
-            if "data" in result:
-                return result["data"]
-            else:
-                return result
+            return self.json_codec.decode(r.content)
         return None
 
     def _update_rate_limits_from_request(self, r):
-        self.rate_limit = int(r.headers.get('x-ratelimit-limit', self.rate_limit))
-        self.rate_limit_remaining = int(r.headers.get('x-ratelimit-remaining', self.rate_limit_remaining))
-        self.rate_limit_reset = r.headers.get('x-ratelimit-reset', None)
-        self.retry_after = r.headers.get('retry-after', None)
-
-        if self.rate_limit_remaining < 10:
-            self._throttle_s = 60. / (self.rate_limit_remaining - 1.)
-        else:
-            self._throttle_s = 0.0
+        reset = r.headers.get('x-ratelimit-reset', None)
+        retry_after = r.headers.get('retry-after', None)
+        with self._rate_limit_lock:
+            self.rate_limit = int(r.headers.get('x-ratelimit-limit', self.rate_limit))
+            self.rate_limit_remaining = int(r.headers.get('x-ratelimit-remaining', self.rate_limit_remaining))
+            self.rate_limit_reset = reset
+            self.retry_after = retry_after
+        self.rate_limiter.update(limit=r.headers.get('x-ratelimit-limit', None),
+                                 remaining=r.headers.get('x-ratelimit-remaining', None),
+                                 reset=reset, retry_after=retry_after)
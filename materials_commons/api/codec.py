@@ -0,0 +1,111 @@
+import json
+import math
+from functools import partial
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JSONCodec(object):
+    """
+    Encodes and decodes the JSON sent to and received from the server. orjson or msgspec is used when installed,
+    otherwise the standard library json module. Whatever the backend, encode accepts and rejects the same objects
+    as json.dumps. The faster library is only given dicts, lists, tuples, str, int, bool, None and finite
+    floats; anything else (NaN, datetimes, subclasses such as numpy.float64), and anything it fails on (ints over
+    64 bits, non-str dict keys), is encoded by json.dumps, which raises for what it can't encode.
+
+    backend : str
+        Optional, defaults to the first of "orjson", "msgspec" and "json" that is installed. The library to use.
+
+    Attributes
+    ----------
+    backend : str
+        The library in use.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+        if backend == "orjson" and orjson is not None:
+            self._encode = partial(_checked_encode, orjson.dumps)
+            self._decode = orjson.loads
+        elif backend == "msgspec" and msgspec is not None:
+            self._encode = partial(_checked_encode, msgspec.json.Encoder().encode)
+            self._decode = msgspec.json.Decoder().decode
+        elif backend == "json":
+            self._encode = _stdlib_encode
+            self._decode = json.loads
+        else:
+            raise ValueError("JSON backend '" + str(backend) + "' isn't available")
+        self.backend = backend
+
+    def encode(self, obj):
+        """
+        Returns obj encoded as UTF-8 JSON.
+
+        :rtype: bytes
+        """
+        return self._encode(obj)
+
+    def dumps(self, obj):
+        """
+        Returns obj encoded as a JSON string.
+
+        :rtype: str
+        """
+        return self._encode(obj).decode("utf-8")
+
+    def decode(self, data):
+        """
+        Returns the object decoded from data, JSON in bytes or a str.
+
+        :raises ValueError: If data isn't valid JSON
+        """
+        return self._decode(data)
+
+
+def _stdlib_encode(obj):
+    return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+_SCALARS = frozenset((str, int, bool, type(None)))
+
+
+def _plain(obj):
+    # True if obj holds only the types orjson and msgspec encode exactly as json does. Other types, such as
+    # datetimes, which they encode and json rejects, or NaN, which they write as null, are left to json.
+    stack = [obj]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        o = pop()
+        t = type(o)
+        if t in _SCALARS:
+            continue
+        if t is dict:
+            extend(o.values())
+        elif t is list or t is tuple:
+            extend(o)
+        elif t is not float or not math.isfinite(o):
+            return False
+    return True
+
+
+def _checked_encode(encode, obj):
+    if not _plain(obj):
+        return _stdlib_encode(obj)
+    try:
+        return encode(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _stdlib_encode(obj)
+
+
+# Used where no codec is given: by the request objects (for example CreateDatasetRequest), the response cache
+# and clients created without a json_codec.
+default_codec = JSONCodec()
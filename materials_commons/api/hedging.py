@@ -0,0 +1,220 @@
+import re
+import socket
+import threading
+from collections import deque, defaultdict
+
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# The first copy of the hedged read being sent by each thread.
+_attempts = threading.local()
+
+
+def endpoint_key(method, urlpart):
+    """
+    Returns a key grouping requests to the same endpoint, with the ids in the url replaced, for example
+    "GET /projects/{id}/directories/{id}/list".
+    """
+    return method + " " + _ID_SEGMENT.sub("/{id}", urlpart.split("?")[0])
+
+
+class LatencyTracker(object):
+    """
+    Keeps the most recent response times for each endpoint.
+
+    window : int
+        Optional, defaults to 200. The number of response times kept per endpoint.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+
+    def count(self, endpoint):
+        with self._lock:
+            return len(self._samples.get(endpoint, ()))
+
+    def percentile(self, endpoint, percentile):
+        """
+        Returns the given percentile (0-100) of the recorded response times for endpoint, or None if there
+        are no samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+
+class HedgePolicy(object):
+    """
+    Controls sending a second copy of slow read requests. If a read hasn't answered after the given
+    percentile of the recent response times for its endpoint, a second copy is sent and whichever answers
+    first is used. Only requests that don't change anything on the server are hedged.
+
+    percentile : float
+        Optional, defaults to 95. The response time percentile after which a second copy is sent.
+    min_delay : float
+        Optional, defaults to 0.01. The shortest wait in seconds before sending a second copy.
+    max_extra_load : float
+        Optional, defaults to 0.05. The fraction of extra requests hedging may add, for example 0.05 allows
+        one hedged request per 20 reads.
+    min_samples : int
+        Optional, defaults to 20. The number of response times needed for an endpoint before its requests
+        are hedged.
+    window : int
+        Optional, defaults to 200. The number of recent response times kept per endpoint.
+
+    Attributes
+    ----------
+    requests : int
+        The number of hedgeable requests made.
+    hedged : int
+        The number of second copies sent.
+    hedge_wins : int
+        The number of times the second copy answered first.
+    latencies : LatencyTracker
+        The recent response times per endpoint.
+    """
+
+    def __init__(self, percentile=95.0, min_delay=0.01, max_extra_load=0.05, min_samples=20, window=200):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def delay_for(self, endpoint):
+        """
+        Returns the seconds to wait before hedging a request to endpoint, or None if it shouldn't be hedged.
+        """
+        with self._lock:
+            self.requests += 1
+        if self.latencies.count(endpoint) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(endpoint, self.percentile))
+
+    def acquire_hedge(self):
+        """
+        Returns True, counting the hedge, if sending another copy stays within max_extra_load.
+        """
+        with self._lock:
+            if self.hedged + 1 > self.max_extra_load * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+
+class _Attempt(object):
+    """
+    The first copy of a hedged read, sent on the caller's thread. When the second copy answers first it
+    aborts this one by shutting down its connection, so the caller doesn't wait for the slow answer.
+    """
+
+    def __init__(self):
+        self.aborted = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            _shutdown(self._conn)
+
+    def _checked_out(self, conn):
+        with self._lock:
+            self._conn = conn
+            if self.aborted:
+                _shutdown(conn)
+
+    def _returned(self, conn):
+        # The connection goes back to the pool for other requests, so it must no longer be shut down.
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+
+
+def _shutdown(conn):
+    sock = getattr(conn, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _aborted():
+    attempt = getattr(_attempts, "current", None)
+    return attempt is not None and attempt.aborted
+
+
+def _connection_tracking_supported():
+    # The tracked pools override urllib3 internals: HTTPConnectionPool._get_conn and _put_conn, and the pool
+    # classes a PoolManager creates. They are only trusted with urllib3 2.x, and only if they are still there.
+    try:
+        major = int(urllib3.__version__.split(".")[0])
+    except ValueError:
+        return False
+    if major != 2:
+        return False
+    if not all(callable(getattr(HTTPConnectionPool, name, None)) for name in ("_get_conn", "_put_conn")):
+        return False
+    return isinstance(getattr(urllib3.PoolManager(1), "pool_classes_by_scheme", None), dict)
+
+
+# Whether the first copy of a hedged read can be aborted. Client ignores hedge_policy when it can't.
+_CONNECTION_TRACKING = _connection_tracking_supported()
+
+
+class _TrackedPoolMixin(object):
+    # Tells the calling thread's _Attempt which connection its request uses.
+
+    def _get_conn(self, timeout=None):
+        conn = super(_TrackedPoolMixin, self)._get_conn(timeout)
+        attempt = getattr(_attempts, "current", None)
+        if attempt is not None:
+            attempt._checked_out(conn)
+        return conn
+
+    def _put_conn(self, conn):
+        attempt = getattr(_attempts, "current", None)
+        if attempt is not None:
+            attempt._returned(conn)
+        super(_TrackedPoolMixin, self)._put_conn(conn)
+
+
+class _TrackedHTTPConnectionPool(_TrackedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _TrackedHTTPSConnectionPool(_TrackedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _HedgingAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose connections can be shut down by a hedge that answered first.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_HedgingAdapter, self).init_poolmanager(*args, **kwargs)
+        if _CONNECTION_TRACKING:
+            self.poolmanager.pool_classes_by_scheme = {"http": _TrackedHTTPConnectionPool,
+                                                       "https": _TrackedHTTPSConnectionPool}
@@ -0,0 +1,109 @@
+import contextvars
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import partial
+
+_active = contextvars.ContextVar("materials_commons_identity_map", default=None)
+
+
+class IdentityMap(object):
+    """
+    Shares the related objects repeated across a response, such as the owner User and directory File of each
+    file in a listing. While the map is active, a related object with the same type and id as one already built
+    is the same Python object, so it is only built and stored once. ::
+
+        ids = mcapi.IdentityMap()
+        with ids.active():
+            files = c.list_directory(project_id, directory_id)
+
+    Objects are held weakly, so the map never keeps them alive. Keep using one map to share objects across
+    calls, or use a new one for each call. Client(identity_map=...) uses a map for every listing.
+
+    Because objects are shared, changing one (for example files[0].owner.name) changes it for every object
+    that refers to it. An object is only shared with parts of a response that hold the same values: if a later
+    response sends different values for the same id, for example a directory that has since been renamed, a
+    new object is built from them and shared from then on, while the objects already handed out keep the old
+    values.
+
+    Attributes
+    ----------
+    hits : int
+        The number of times an existing object was returned.
+    misses : int
+        The number of objects built.
+    """
+
+    def __init__(self):
+        # (cls, id) -> (weak reference to the object, the dict it was built from)
+        self._objects = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def active(self):
+        """
+        Uses the map for the related objects built inside the with block, in this thread or task.
+        """
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def get(self, cls, data):
+        """
+        Returns the cls object with the id in data, building it from data if there is none yet.
+        """
+        key = (cls, data.get('id', None))
+        if key[1] is None:
+            return cls(data)
+        with self._lock:
+            obj = self._lookup(key, data)
+            if obj is not None:
+                self.hits += 1
+                return obj
+        obj = cls(data)
+        with self._lock:
+            self.misses += 1
+            existing = self._lookup(key, data)
+            if existing is not None:
+                return existing
+            self._objects[key] = (weakref.ref(obj, partial(self._forget, key)), data)
+            return obj
+
+    def _lookup(self, key, data):
+        # The object built for key if it was built from the same values as data.
+        entry = self._objects.get(key)
+        if entry is None or (entry[1] is not data and entry[1] != data):
+            return None
+        return entry[0]()
+
+    def _forget(self, key, ref):
+        # Called when an object is garbage collected; the lock is reentrant as this can happen while it is held.
+        with self._lock:
+            entry = self._objects.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._objects[key]
+
+    def bind(self, cls):
+        """
+        Returns a function that builds a cls object from a dict with the map active.
+        """
+        def build(data):
+            token = _active.set(self)
+            try:
+                return cls(data)
+            finally:
+                _active.reset(token)
+
+        return build
+
+
+def related(cls, data):
+    # Builds a related object, such as an owner, through the active IdentityMap if there is one.
+    identity_map = _active.get()
+    if identity_map is None:
+        return cls(data)
+    return identity_map.get(cls, data)
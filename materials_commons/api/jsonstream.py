@@ -0,0 +1,147 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONArrayStream(object):
+    """
+    Decodes the items of a JSON array incrementally from a stream of chunks, so only the item being decoded
+    and the unread part of the current chunk are held in memory. The array can either be the whole document,
+    or the value of a member (by default "data") of the top level object, as in Materials Commons list
+    responses. ::
+
+        stream = JSONArrayStream(r.iter_content(chunk_size=65536))
+        for item in stream:
+            ...
+        print(stream.fields)
+
+    chunks : iterable
+        The document as an iterable of bytes or str chunks.
+    key : str
+        Optional, defaults to "data". The member of the top level object holding the array.
+
+    Attributes
+    ----------
+    fields : dict
+        The other members of the top level object, for example the paging information of a paged response.
+        Members after the array are only available once all the items have been read. If the member named
+        key isn't an array it is stored here as well.
+    """
+
+    def __init__(self, chunks, key="data"):
+        self.key = key
+        self.fields = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self):
+        c = self._next_char()
+        if c == "[":
+            yield from self._items()
+        elif c == "{":
+            yield from self._members()
+        else:
+            raise self._error("expected an array or an object")
+        if self._skip_whitespace():
+            raise self._error("extra data after the document")
+
+    def _members(self):
+        self._pos += 1
+        if self._next_char() == "}":
+            self._pos += 1
+            return
+        while True:
+            name = self._decode()
+            if not isinstance(name, str):
+                raise self._error("expected a member name")
+            self._expect(":")
+            if name == self.key and self._next_char() == "[":
+                yield from self._items()
+            else:
+                self.fields[name] = self._decode()
+            c = self._next_char()
+            self._pos += 1
+            if c == "}":
+                return
+            if c != ",":
+                raise self._error("expected ',' or '}'")
+
+    def _items(self):
+        self._pos += 1
+        if self._next_char() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode()
+            c = self._next_char()
+            self._pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise self._error("expected ',' or ']'")
+
+    def _decode(self):
+        """
+        Decodes the value starting at the current position, reading more chunks until it is complete.
+        """
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end == len(self._buf) and not self._eof and self._buf[self._pos] not in "\"[{":
+                # A number at the end of the buffer may continue in the next chunk.
+                if self._read():
+                    continue
+            self._pos = end
+            return value
+
+    def _expect(self, c):
+        if self._next_char() != c:
+            raise self._error("expected '" + c + "'")
+        self._pos += 1
+
+    def _next_char(self):
+        if not self._skip_whitespace():
+            raise self._error("unexpected end of document")
+        return self._buf[self._pos]
+
+    def _skip_whitespace(self):
+        # Returns False at the end of the document.
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return True
+            if not self._read():
+                return False
+
+    def _read(self):
+        # Appends the next chunk to the buffer, dropping the part already decoded.
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self._buf = self._buf[self._pos:] + chunk
+                self._pos = 0
+                return True
+        self._eof = True
+        rest = self._utf8.decode(b"", final=True)
+        if rest:
+            self._buf = self._buf[self._pos:] + rest
+            self._pos = 0
+            return True
+        return False
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buf, min(self._pos, len(self._buf)))
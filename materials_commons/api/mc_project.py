@@ -1,11 +1,24 @@
+from .cache import ResponseCache
 from .config import *
 
 
-def mc_project(project_id):
+def mc_project(project_id, cache=False):
+    """
+    Gets a project using the default remote from the config file, with a client attached for downloading
+    its files.
+
+    :param int project_id: The project id
+    :param bool cache: If True, API responses are cached on disk (see ResponseCache) so that later runs
+        start without re-fetching the same metadata
+    :return: The project
+    :rtype: Project
+    """
     config = Config()
     if not config.default_remote.mcurl or not config.default_remote.mcapikey:
         raise Exception("Default remote not set")
     client = config.default_remote.make_client()
+    if cache:
+        client.response_cache = ResponseCache()
     project = client.get_project(project_id)
     project.client = client
     return project
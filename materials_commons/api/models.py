@@ -1,8 +1,12 @@
+import contextvars
 import os
 import shutil
+from collections.abc import Mapping
+from contextlib import contextmanager
 from pathlib import Path
 
-from .util import get_date
+from .identity import related
+from .util import to_datetime
 
 
 def from_list(cls, data):
@@ -18,16 +22,62 @@ def pretty_print(clas, indent=0):
     """
     print(' ' * indent + type(clas).__name__ + ':')
     indent += 4
-    for k, v in clas.__dict__.items():
-        if '__dict__' in dir(v):
+    for k, v in _attributes(clas):
+        if isinstance(v, _Model):
             pretty_print(v, indent)
         elif isinstance(v, list):
             print(' ' * indent + k + ': ')
             for item in v:
                 pretty_print(item, indent + 4)
         else:
-            if k != '_data':
-                print(' ' * indent + k + ': ' + str(v))
+            print(' ' * indent + k + ': ' + str(v))
+
+
+def _attributes(obj):
+    # The public attributes set on obj, from the __slots__ of its classes (base classes first) and its __dict__.
+    # The slot of a lazy attribute stands for the attribute itself.
+    names = []
+    for cls in reversed(type(obj).__mro__):
+        for name in cls.__dict__.get('__slots__', ()):
+            if isinstance(cls.__dict__.get(name[1:], None), _LazyAttribute):
+                name = name[1:]
+            names.append(name)
+    names.extend(getattr(obj, '__dict__', {}))
+    for name in names:
+        if not name.startswith('_') and hasattr(obj, name):
+            yield name, getattr(obj, name)
+
+
+_keep_raw = contextvars.ContextVar("materials_commons_keep_raw_data", default=False)
+
+
+@contextmanager
+def keep_raw_data(keep=True):
+    """
+    Makes the model objects created inside the with block, in this thread or task, keep a copy of the dict they
+    were built from, available as raw_data. Off by default, as the copy about doubles the memory used by each
+    object. Client(keep_raw_data=True) does the same for the objects returned by the client's listings. ::
+
+        with mcapi.keep_raw_data():
+            f = c.get_file(project_id, file_id)
+    """
+    token = _keep_raw.set(keep)
+    try:
+        yield
+    finally:
+        _keep_raw.reset(token)
+
+
+def _keeping_raw_data(build):
+    # Returns a function that calls build(data) with raw data kept.
+    def build_keeping_raw_data(data):
+        token = _keep_raw.set(True)
+        try:
+            return build(data)
+        finally:
+            _keep_raw.reset(token)
+
+    return build_keeping_raw_data
 
 
 class Paged(object):
@@ -39,7 +89,156 @@ class Paged(object):
         self.data = data
 
 
-class Common(object):
+class Record(Mapping):
+    """
+    A read-only view of an object as returned by the server, used by the listing methods when called with
+    raw=True. Nothing is copied or parsed: keys are read with record["name"] or record.name, dates are the
+    server's strings and related objects are dicts. to_model() builds the full model object when needed.
+
+    Methods
+    -------
+    to_model()
+        Returns the model object (for example a File) for the record. It is built on the first call.
+    """
+
+    __slots__ = ("_data", "_model_class", "_model")
+
+    def __init__(self, data, model_class):
+        self._data = data
+        self._model_class = model_class
+        self._model = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __getattr__(self, name):
+        if name in Record.__slots__ or name.startswith("__"):
+            # Only reached while _data isn't set yet, for example when copying or unpickling.
+            raise AttributeError(name)
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return "Record(" + self._model_class.__name__ + ", " + repr(self._data) + ")"
+
+    def to_model(self):
+        if self._model is None:
+            self._model = self._model_class(self._data)
+        return self._model
+
+
+class _Unbuilt(object):
+    # The part of a response a _LazyList attribute is built from, until it is first read.
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class _LazyAttribute(object):
+    """
+    A model attribute decoded from the response the first time it is read. The value is kept in the slot named
+    after the attribute with a leading underscore, which holds the undecoded part of the response until then.
+    """
+
+    def __init__(self):
+        self.name = None
+        self._slot = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self._slot = owner.__dict__['_' + name]
+
+    def __set__(self, obj, value):
+        self._slot.__set__(obj, value)
+
+
+class _LazyDate(_LazyAttribute):
+    """
+    A timestamp attribute, such as created_at. The server's string is kept and parsed into a datetime on first
+    read. None if the response doesn't have it.
+    """
+
+    def load(self, obj, data):
+        value = data.get(self.name, None)
+        if value is not None:
+            self._slot.__set__(obj, value)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            value = self._slot.__get__(obj, owner)
+        except AttributeError:
+            return None
+        if type(value) is str:
+            value = to_datetime(value)
+            self._slot.__set__(obj, value)
+        return value
+
+
+class _LazyList(_LazyAttribute):
+    """
+    A list of related objects, such as a dataset's files. The model objects are built on first read. Until
+    then only the part of the response they are built from is kept.
+    """
+
+    def __init__(self, class_name):
+        super(_LazyList, self).__init__()
+        self.class_name = class_name
+
+    def load(self, obj, data):
+        items = data.get(self.name, None)
+        if items:
+            self._slot.__set__(obj, _Unbuilt(items))
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            value = self._slot.__get__(obj, owner)
+        except AttributeError:
+            value = _Unbuilt([])
+        if type(value) is _Unbuilt:
+            value = from_list(globals()[self.class_name], value.data)
+            self._slot.__set__(obj, value)
+        return value
+
+
+class _Model(object):
+    # Base of the model classes. Their attributes are declared in __slots__, so objects have no __dict__.
+    __slots__ = ('_data',)
+    _lazy_attributes = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._lazy_attributes = tuple(v for c in cls.__mro__ for v in c.__dict__.values()
+                                     if isinstance(v, _LazyAttribute))
+
+    def __init__(self, data):
+        if _keep_raw.get():
+            self._data = data.copy()
+        for lazy_attribute in self._lazy_attributes:
+            lazy_attribute.load(self, data)
+
+    @property
+    def raw_data(self):
+        """The dict the object was built from, None unless it was created with raw data kept, see keep_raw_data()."""
+        return getattr(self, '_data', None)
+
+    def pretty_print(self):
+        pretty_print(self)
+
+
+class Common(_Model):
     """
     Base class for most models. Contains common attributes shared across most model objects.
 
@@ -66,6 +265,8 @@ class Common(object):
     project_id : int
         The project_id is an optional field that exists only if the underlying model has a project_id field. The
         project_id is the id of the project the object is associated with.
+    raw_data : dict
+        The dict the object was built from, None unless it was created with raw data kept, see keep_raw_data().
 
     Methods
     -------
@@ -74,22 +275,25 @@ class Common(object):
         over lists of objects maintaining proper indenting. Private attributes are ignored.
     """
 
+    __slots__ = ('id', 'uuid', 'name', 'description', 'summary', 'owner_id', '_created_at', '_updated_at', 'project_id',
+                 'owner')
+    created_at = _LazyDate()
+    updated_at = _LazyDate()
+
     def __init__(self, data):
-        self._data = data.copy()
+        super(Common, self).__init__(data)
         self.id = data.get('id', None)
         self.uuid = data.get('uuid', None)
         self.name = data.get('name', None)
         self.description = data.get('description', None)
         self.summary = data.get('summary', None)
         self.owner_id = data.get('owner_id', None)
-        self.created_at = get_date('created_at', data)
-        self.updated_at = get_date('updated_at', data)
         project_id = data.get('project_id', None)
         if project_id:
             self.project_id = project_id
         owner = data.get('owner', None)
         if owner:
-            self.owner = User(owner)
+            self.owner = related(User, owner)
 
     def pretty_print(self):
         pretty_print(self)
@@ -113,12 +317,14 @@ class Community(Common):
         List of published datasets associated with the community.
     """
 
+    __slots__ = ('public', '_files', '_links', '_datasets')
+    files = _LazyList('File')
+    links = _LazyList('Link')
+    datasets = _LazyList('Dataset')
+
     def __init__(self, data={}):
         super(Community, self).__init__(data)
         self.public = data.get('public', None)
-        self.files = File.from_list_attr(data)
-        self.links = Link.from_list_attr(data)
-        self.datasets = Dataset.from_list_attr(data)
 
     @staticmethod
     def from_list(data):
@@ -145,10 +351,12 @@ class Activity(Common):
         The list of files associated with this activity.
     """
 
+    __slots__ = ('_entities', '_files')
+    entities = _LazyList('Entity')
+    files = _LazyList('File')
+
     def __init__(self, data={}):
         super(Activity, self).__init__(data)
-        self.entities = Entity.from_list_attr(data)
-        self.files = File.from_list_attr(data)
 
     @staticmethod
     def from_list(data):
@@ -213,6 +421,18 @@ class Dataset(Common):
         The root directory (/) for published datasets. Unpublished datasets do not have a root directory.
     """
 
+    __slots__ = ('license', 'license_link', 'doi', 'authors', 'file_selection', 'zipfile_size', 'zipfile_name',
+                 '_workflows', '_experiments', '_activities', '_entities', '_files', 'globus_path',
+                 'globus_endpoint_id', 'experiments_count', 'files_count', 'workflows_count', 'activities_count',
+                 'entities_count', 'comments_count', '_published_at', '_tags', 'root_dir')
+    published_at = _LazyDate()
+    workflows = _LazyList('Workflow')
+    experiments = _LazyList('Experiment')
+    activities = _LazyList('Activity')
+    entities = _LazyList('Entity')
+    files = _LazyList('File')
+    tags = _LazyList('Tag')
+
     def __init__(self, data={}):
         super(Dataset, self).__init__(data)
         self.license = data.get('license', None)
@@ -222,11 +442,6 @@ class Dataset(Common):
         self.file_selection = data.get('file_selection', None)
         self.zipfile_size = data.get('zipfile_size', None)
         self.zipfile_name = data.get('zipfile_name', None)
-        self.workflows = Workflow.from_list_attr(data)
-        self.experiments = Experiment.from_list_attr(data)
-        self.activities = Activity.from_list_attr(data)
-        self.entities = Entity.from_list_attr(data)
-        self.files = File.from_list_attr(data)
         self.globus_path = data.get('globus_path', None)
         self.globus_endpoint_id = data.get('globus_endpoint_id', None)
         self.experiments_count = data.get('experiments_count', None)
@@ -235,8 +450,6 @@ class Dataset(Common):
         self.activities_count = data.get('activities_count', None)
         self.entities_count = data.get('entities_count', None)
         self.comments_count = data.get('comments_count', None)
-        self.published_at = get_date('published_at', data)
-        self.tags = Tag.from_list_attr(data)
         root_dir = data.get('rootDir', None)
         if root_dir:
             self.root_dir = File(root_dir)
@@ -280,10 +493,12 @@ class Entity(Common):
         The list of files associated with this entity.
     """
 
+    __slots__ = ('_activities', '_files')
+    activities = _LazyList('Activity')
+    files = _LazyList('File')
+
     def __init__(self, data={}):
         super(Entity, self).__init__(data)
-        self.activities = Activity.from_list_attr(data)
-        self.files = File.from_list_attr(data)
 
     @staticmethod
     def from_list(data):
@@ -310,12 +525,14 @@ class Experiment(Common):
         The list of files used in the experiment.
     """
 
+    __slots__ = ('_workflows', '_activities', '_entities', '_files')
+    workflows = _LazyList('Workflow')
+    activities = _LazyList('Activity')
+    entities = _LazyList('Entity')
+    files = _LazyList('File')
+
     def __init__(self, data={}):
         super(Experiment, self).__init__(data)
-        self.workflows = Workflow.from_list_attr(data)
-        self.activities = Activity.from_list_attr(data)
-        self.entities = Entity.from_list_attr(data)
-        self.files = File.from_list_attr(data)
 
     @staticmethod
     def from_list(data):
@@ -357,6 +574,9 @@ class File(Common):
         The directory object for the file. If the file is the root directory then this will be set to None.
     """
 
+    __slots__ = ('mime_type', 'path', 'directory_id', 'size', 'checksum', 'experiments_count', 'activities_count',
+                 'entities_count', 'entity_states_count', 'previous_versions_count', 'directory', '__weakref__')
+
     def __init__(self, data={}):
         super(File, self).__init__(data)
         self.mime_type = data.get('mime_type', None)
@@ -371,16 +591,20 @@ class File(Common):
         self.previous_versions_count = data.get('previous_versions_count', None)
         directory = data.get('directory', None)
         if directory:
-            self.directory = File(directory)
-            self._make_path()
+            self.directory = related(File, directory)
+            self._make_path(directory.get('path', None))
         else:
             self.directory = None
 
-    def _make_path(self):
-        if self.directory.path == "/":
-            self.path = self.directory.path + self.name
+    def _make_path(self, directory_path):
+        # Uses the directory's path from this file's own response, not self.directory's, which may be shared.
+        if directory_path is None or self.name is None:
+            # The directory or name wasn't requested, for example with a sparse fieldset.
+            return
+        if directory_path == "/":
+            self.path = directory_path + self.name
         else:
-            self.path = self.directory.path + "/" + self.name
+            self.path = directory_path + "/" + self.name
 
     @staticmethod
     def from_list(data):
@@ -392,6 +616,8 @@ class File(Common):
 
 
 class GlobusUpload(Common):
+    __slots__ = ('globus_endpoint_id', 'globus_url', 'globus_path', 'status')
+
     def __init__(self, data={}):
         super(GlobusUpload, self).__init__(data)
         self.globus_endpoint_id = data.get('globus_endpoint_id', None)
@@ -409,6 +635,8 @@ class GlobusUpload(Common):
 
 
 class GlobusDownload(Common):
+    __slots__ = ('globus_endpoint_id', 'globus_url', 'globus_path', 'status')
+
     def __init__(self, data={}):
         super(GlobusDownload, self).__init__(data)
         self.globus_endpoint_id = data.get('globus_endpoint_id', None)
@@ -425,7 +653,7 @@ class GlobusDownload(Common):
         return GlobusDownload.from_list(data.get(attr, []))
 
 
-class GlobusTransfer(object):
+class GlobusTransfer(_Model):
     """
     A GlobusTransfer represents a started globus transfer, whether its an upload or a download.
 
@@ -459,8 +687,14 @@ class GlobusTransfer(object):
         Formatted string datetime when the object was last updated. String format is "%Y-%m-%dT%H:%M:%S.%fZ".
     """
 
+    __slots__ = ('id', 'uuid', 'globus_endpoint_id', 'globus_url', 'globus_path', 'state',
+                 'last_globus_transfer_id_completed', 'latest_globus_transfer_completed_date', 'project_id', 'owner_id',
+                 'transfer_request_id', '_created_at', '_updated_at')
+    created_at = _LazyDate()
+    updated_at = _LazyDate()
+
     def __init__(self, data={}):
-        self._data = data.copy()
+        super(GlobusTransfer, self).__init__(data)
         self.id = data.get('id', None)
         self.uuid = data.get('uuid', None)
         self.globus_endpoint_id = data.get('globus_endpoint_id', None)
@@ -472,8 +706,6 @@ class GlobusTransfer(object):
         self.project_id = data.get('project_id', None)
         self.owner_id = data.get('owner_id', None)
         self.transfer_request_id = data.get('transfer_request_id', None)
-        self.created_at = get_date('created_at', data)
-        self.updated_at = get_date('updated_at', data)
 
     def pretty_print(self):
         pretty_print(self)
@@ -497,6 +729,8 @@ class Link(Common):
         The url for the link.
     """
 
+    __slots__ = ('url',)
+
     def __init__(self, data={}):
         super(Link, self).__init__(data)
         self.url = data.get('url', data)
@@ -532,17 +766,19 @@ class Project(Common):
         The root directory (/) of the project.
     """
 
+    __slots__ = ('slug', 'is_active', '_activities', '_workflows', '_experiments', '_entities', '_members', '_admins',
+                 'files', 'client', 'root_dir')
+    activities = _LazyList('Activity')
+    workflows = _LazyList('Workflow')
+    experiments = _LazyList('Experiment')
+    entities = _LazyList('Entity')
+    members = _LazyList('User')
+    admins = _LazyList('User')
+
     def __init__(self, data={}):
         super(Project, self).__init__(data)
         self.slug = data.get('slug', None)
         self.is_active = data.get('is_active', None)
-        self.activities = Activity.from_list_attr(data)
-        self.workflows = Workflow.from_list_attr(data)
-        self.experiments = Experiment.from_list_attr(data)
-        self.activities = Activity.from_list_attr(data)
-        self.entities = Entity.from_list_attr(data)
-        self.members = User.from_list_attr(data, 'members')
-        self.admins = User.from_list_attr(data, 'admins')
         self.files = {}
         self.client = None
         self.root_dir = None
@@ -587,7 +823,7 @@ class Project(Common):
                 pass
 
 
-class Server(object):
+class Server(_Model):
     """
     A Server contains information about the Materials Commons server hosting the API.
 
@@ -613,8 +849,11 @@ class Server(object):
         A UUID that global identifies this server instance.
     """
 
+    __slots__ = ('globus_endpoint_id', 'institution', 'version', 'last_updated_at', 'first_deployed_at', 'contact',
+                 'description', 'name', 'uuid')
+
     def __init__(self, data={}):
-        self._data = data.copy()
+        super(Server, self).__init__(data)
         self.globus_endpoint_id = data.get('globus_endpoint_id', None)
         self.institution = data.get('institution', None)
         self.version = data.get('version', None)
@@ -629,7 +868,7 @@ class Server(object):
         pretty_print(self)
 
 
-class Tag(object):
+class Tag(_Model):
     """
     A tag is an attribute that can be added to different objects in the system. Currently only datasets support tags.
 
@@ -647,13 +886,15 @@ class Tag(object):
         Formatted string datetime when the object was last updated. String format is "%Y-%m-%dT%H:%M:%S.%fZ".
     """
 
+    __slots__ = ('id', 'name', 'slug', '_created_at', '_updated_at')
+    created_at = _LazyDate()
+    updated_at = _LazyDate()
+
     def __init__(self, data={}):
-        self._data = data.copy()
+        super(Tag, self).__init__(data)
         self.id = data.get('id', None)
         self.name = data.get('name', None)
         self.slug = data.get('slug', None)
-        self.created_at = get_date('created_at', data)
-        self.updated_at = get_date('updated_at', data)
 
     def pretty_print(self):
         pretty_print(self)
@@ -667,7 +908,7 @@ class Tag(object):
         return Tag.from_list(data.get(attr, []))
 
 
-class User(object):
+class User(_Model):
     """
     A User represents a user account on Materials Commons.
 
@@ -691,8 +932,13 @@ class User(object):
         Formatted string datetime when the object was last updated. String format is "%Y-%m-%dT%H:%M:%S.%fZ".
     """
 
+    __slots__ = ('id', 'uuid', 'name', 'email', 'description', 'affiliation', 'slug', '_created_at', '_updated_at',
+                 '__weakref__')
+    created_at = _LazyDate()
+    updated_at = _LazyDate()
+
     def __init__(self, data={}):
-        self._data = data.copy()
+        super(User, self).__init__(data)
         self.id = data.get('id', None)
         self.uuid = data.get('uuid', None)
         self.name = data.get('name', None)
@@ -700,8 +946,6 @@ class User(object):
         self.description = data.get('description', None)
         self.affiliation = data.get('affiliation', None)
         self.slug = data.get('slug', None)
-        self.created_at = get_date('created_at', data)
-        self.updated_at = get_date('updated_at', data)
 
     def pretty_print(self):
         pretty_print(self)
@@ -715,7 +959,7 @@ class User(object):
         return User.from_list(data.get(attr, []))
 
 
-class Searchable(object):
+class Searchable(_Model):
     """
     A searchable represents the results of a search.
 
@@ -731,21 +975,23 @@ class Searchable(object):
         Depending on what type field is set to the item will be one of the above types.
     """
 
+    __slots__ = ('title', 'url', 'type', 'item')
+
     def __init__(self, data={}):
-        self._data = data.copy()
+        super(Searchable, self).__init__(data)
         self.title = data.get('title')
         self.url = data.get('url')
         self.type = data.get('type')
-        self._fill_item()
+        self._fill_item(data)
 
     def pretty_print(self):
         pretty_print(self)
 
-    def _fill_item(self):
+    def _fill_item(self, data):
         if self.type == "datasets":
-            self.item = Dataset(self._data["searchable"])
+            self.item = Dataset(data["searchable"])
         elif self.type == "communities":
-            self.item = Community(self._data["searchable"])
+            self.item = Community(data["searchable"])
 
     @staticmethod
     def from_list(data):
@@ -757,6 +1003,8 @@ class Workflow(Common):
     A workflow is a graphical and textual representation a user created for an experimental workflow.
     """
 
+    __slots__ = ()
+
     def __init__(self, data={}):
         super(Workflow, self).__init__(data)
 
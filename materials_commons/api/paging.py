@@ -0,0 +1,87 @@
+class AdaptivePageSize(object):
+    """
+    Adjusts the page size of a paged listing while it is being read, so each page takes about target_seconds
+    to fetch. After each page the next size is estimated from that page's response time, scaled by at most
+    a factor of two per page, and rounded down to a power of two. Page numbers stay aligned because a size
+    is only switched to at an offset that is a multiple of it.
+
+    When the server reports that few requests are left in the current rate limit window, pages are grown
+    instead, so the rest of the listing takes fewer requests.
+
+    target_seconds : float
+        Optional, defaults to 1. The response time to aim for.
+    min_size : int
+        Optional, defaults to 16. The smallest page size used.
+    max_size : int
+        Optional, defaults to 4096. The largest page size used.
+    max_bytes : int
+        Optional, defaults to 8MB. Pages aren't grown past this many bytes, estimated from the size of the
+        items already received.
+    low_headroom : float
+        Optional, defaults to 0.1. The fraction of the rate limit remaining below which pages are grown.
+    initial_size : int
+        Optional, defaults to 256. The size of the first page when the caller doesn't give a page size. A
+        page size given by the caller is rounded down to a power of two. A listing started past its first page
+        starts at the same item as it would without adaptive sizing, so its first page may use the caller's
+        page size (or the server's, if none is given) before the size is adjusted.
+    """
+
+    def __init__(self, target_seconds=1.0, min_size=16, max_size=4096, max_bytes=8 * 1024 * 1024, low_headroom=0.1,
+                 initial_size=256):
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.low_headroom = low_headroom
+        self.initial_size = initial_size
+
+    def first_size(self, page_size=None):
+        """
+        Returns the size to request the first page with.
+
+        :param int page_size: The page size given by the caller, if any
+        :rtype: int
+        """
+        return self._clamp(self.initial_size if page_size is None else int(page_size))
+
+    def next_size(self, size, seconds, items, nbytes, remaining=None, limit=None):
+        """
+        Returns the page size to use next.
+
+        :param int size: The size of the page just fetched
+        :param float seconds: The time the page took to fetch
+        :param int items: The number of items on the page
+        :param int nbytes: The size of the response in bytes
+        :param int remaining: The requests left in the rate limit window, if known
+        :param int limit: The rate limit, if known
+        :rtype: int
+        """
+        if items == 0:
+            return size
+        if seconds > 0:
+            desired = size * min(2.0, max(0.5, self.target_seconds / seconds))
+        else:
+            desired = size * 2.0
+        if remaining is not None and limit and remaining <= self.low_headroom * limit:
+            desired = max(desired, size * 2.0)
+        if nbytes > 0:
+            desired = min(desired, max(self.max_bytes * items / nbytes, 1))
+        return self._clamp(desired)
+
+    def _clamp(self, size):
+        # Limits size to [min_size, max_size] and rounds it down to a power of two.
+        size = int(min(max(size, self.min_size), self.max_size))
+        return 1 << (size.bit_length() - 1)
+
+
+def _aligned_page_size(offset, size, desired):
+    """
+    Returns desired, or the largest smaller power of two, that divides offset, so the items already read form
+    whole pages of the new size. Returns size if that would shrink the page below both size and desired.
+    """
+    new_size = desired
+    while new_size > 1 and offset % new_size:
+        new_size //= 2
+    if new_size < min(size, desired):
+        return size
+    return new_size
@@ -34,7 +34,7 @@ class QueryParams(object):
                 query_params["filter[" + f.field + "]"] = ",".join(f.values)
         if self.counts:
             count_fields = [f + "Count" for f in self.counts]
-            if "include" not in query_params:
+            if "include" in query_params:
                 query_params["include"] = query_params["include"] + "," + ",".join(count_fields)
             else:
                 query_params["include"] = ",".join(count_fields)
@@ -43,6 +43,24 @@ class QueryParams(object):
 
         return query_params
 
+    @staticmethod
+    def preset(resource, name):
+        """
+        Returns the QueryParams for a named fieldset preset, see FIELDSET_PRESETS.
+
+        :param str resource: The kind of object listed, for example "files" or "entities"
+        :param str name: The preset name, for example "ids-only", "paths", "sizes-and-checksums" or "full"
+        :rtype: QueryParams
+        :raises ValueError: If there is no such preset for resource
+        """
+        presets = FIELDSET_PRESETS.get(resource, {})
+        if name not in presets:
+            raise ValueError("unknown preset '" + str(name) + "' for " + resource + ", expected one of: " +
+                             ", ".join(presets))
+        fields, include = presets[name]
+        return QueryParams(fields=[QueryField(field, values) for field, values in fields.items()],
+                           include=list(include))
+
     @staticmethod
     def to_query_args(params):
         if params is None:
@@ -50,3 +68,30 @@ class QueryParams(object):
         if type(params) is dict:
             return params
         return params.to_params()
+
+
+def _common_presets(resource):
+    return {
+        "ids-only": ({resource: ["id", "uuid"]}, []),
+        "full": ({}, []),
+    }
+
+
+# Named sparse fieldsets per kind of object. Each preset is ({resource or relation: [fields]}, [includes]).
+# "full" sends no fields or include, so the server returns its default payload.
+FIELDSET_PRESETS = {
+    "files": {
+        "ids-only": ({"files": ["id", "uuid"]}, []),
+        "paths": ({"files": ["id", "uuid", "name", "path", "mime_type", "directory_id"],
+                   "directory": ["id", "name", "path"]}, ["directory"]),
+        "sizes-and-checksums": ({"files": ["id", "uuid", "name", "path", "mime_type", "directory_id", "owner_id",
+                                           "size", "checksum"]}, []),
+        "full": ({}, []),
+    },
+    "projects": _common_presets("projects"),
+    "experiments": _common_presets("experiments"),
+    "entities": _common_presets("entities"),
+    "activities": _common_presets("activities"),
+    "datasets": _common_presets("datasets"),
+    "users": _common_presets("users"),
+}
@@ -0,0 +1,140 @@
+import threading
+import time
+
+
+def _to_float(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter(object):
+    """
+    A token bucket that paces requests to stay under the server's rate limit. One limiter can be
+    shared by all the threads using a Client (or by several clients using the same apikey).
+
+    The bucket is seeded from the x-ratelimit-limit and x-ratelimit-remaining response headers, and
+    refills continuously at limit/period tokens per second. When the server sends x-ratelimit-reset the
+    bucket is refilled at the reset instead. It is only emptied until then when the limit has been
+    exhausted, that is when the remaining requests are down to the headroom or the server sends
+    retry-after. Until the first response headers have been seen no pacing is done.
+
+    Each caller reserves a token and is told how long to wait for it. When the bucket is empty the
+    reservations queue up behind each other, so concurrent callers are spread out over time instead
+    of all waking up together.
+
+    period : float
+        Optional, defaults to 60. The length in seconds of the server's rate limit window.
+    headroom : int
+        Optional, defaults to 1. The number of requests to keep in reserve below the server's limit.
+    """
+
+    def __init__(self, period=60.0, headroom=1, clock=time.monotonic):
+        self.period = period
+        self.headroom = headroom
+        self.limit = None
+        self._clock = clock
+        self._capacity = None
+        self._rate = None
+        self._tokens = 0.0
+        self._last = clock()
+        self._reset_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        """
+        The number of requests that can be made right now without waiting. Negative when callers are
+        queued waiting for tokens.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def reserve(self):
+        """
+        Takes a token from the bucket.
+
+        :return: The number of seconds the caller must wait before making its request
+        :rtype: float
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if self._rate is None:
+                return 0.0
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            start = now
+            if self._reset_at is not None and self._reset_at > now:
+                start = self._reset_at
+            return (start - now) + (-self._tokens / self._rate)
+
+    def acquire(self):
+        """
+        Takes a token from the bucket, sleeping until it is available.
+
+        :return: The number of seconds slept
+        :rtype: float
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update(self, limit=None, remaining=None, reset=None, retry_after=None):
+        """
+        Updates the bucket from the rate limit headers of a response.
+
+        :param limit: The x-ratelimit-limit header value
+        :param remaining: The x-ratelimit-remaining header value
+        :param reset: The x-ratelimit-reset header value, either a unix timestamp or a number of seconds
+        :param retry_after: The retry-after header value in seconds
+        """
+        limit = _to_float(limit)
+        remaining = _to_float(remaining)
+        reset = _to_float(reset)
+        retry_after = _to_float(retry_after)
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if limit is not None and limit > 0:
+                seeded = self._rate is not None
+                self.limit = limit
+                self._capacity = max(1.0, limit - self.headroom)
+                self._rate = limit / self.period
+                if not seeded:
+                    self._tokens = self._capacity
+            if self._rate is None:
+                return
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining - self.headroom)
+            wait = None
+            if reset is not None:
+                # Large values are unix timestamps, small values a number of seconds until the reset.
+                wait = reset - time.time() if reset > 1e9 else reset
+            if retry_after is not None:
+                wait = retry_after if wait is None else max(wait, retry_after)
+            if wait is not None and wait > 0:
+                if retry_after is not None or (remaining is not None and remaining <= self.headroom):
+                    self._tokens = min(self._tokens, 0.0)
+                self._reset_at = now + wait
+
+    def _refill(self, now):
+        if self._rate is None:
+            self._last = now
+            return
+        if self._reset_at is not None:
+            if now < self._reset_at:
+                self._last = now
+                return
+            # The server's window has reset, so the whole bucket is available again.
+            self._tokens = min(self._capacity, self._tokens + self._capacity)
+            self._last = self._reset_at
+            self._reset_at = None
+        self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
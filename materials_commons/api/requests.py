@@ -1,4 +1,4 @@
-import json
+from .codec import default_codec
 
 
 class RequestCommon(object):
@@ -38,11 +38,11 @@ class CreateDatasetRequest(RequestCommon):
 
         self.ds_authors = authors
         if self.ds_authors is not None:
-            self.ds_authors = json.dumps(self.ds_authors)
+            self.ds_authors = default_codec.dumps(self.ds_authors)
 
         self.tags = tags
         if self.tags is not None:
-            self.tags = json.dumps(self.tags)
+            self.tags = default_codec.dumps(self.tags)
 
         self.file1_id = file1_id
         self.file2_id = file2_id
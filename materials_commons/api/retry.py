@@ -0,0 +1,143 @@
+import email.utils
+import random
+import threading
+import time
+
+
+def _parse_retry_after(value):
+    """
+    Parses a Retry-After header value. The server may send either a number of seconds or an HTTP date.
+    Returns the number of seconds to wait, or None if the value can't be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _status_code(response):
+    # requests responses have status_code, aiohttp responses have status
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(response, "status", None)
+    return status
+
+
+class RetryStats(object):
+    """
+    Counts the retries made and the time spent sleeping between them.
+
+    Attributes
+    ----------
+    retries : int
+        The number of times a request was retried.
+    sleep_time : float
+        The total number of seconds spent sleeping before retries.
+    """
+
+    def __init__(self):
+        self.retries = 0
+        self.sleep_time = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, retries, sleep_time):
+        with self._lock:
+            self.retries += retries
+            self.sleep_time += sleep_time
+
+
+class RetryPolicy(object):
+    """
+    Controls how the Client retries requests that fail with a transient error.
+
+    Idempotent requests (see retry_methods) are retried when the server responds with one of the
+    retry_statuses or the connection fails. A 429 (Too Many Requests) response is retried for every
+    method since the server rejected the request without processing it. Uploads are retried only if the
+    files can be rewound to send them again. The wait between attempts
+    grows exponentially with jitter, unless the server sends a Retry-After header, which is honored.
+
+    max_retries : int
+        Optional, defaults to 3. The maximum number of retries for a single call.
+    backoff_factor : float
+        Optional, defaults to 0.5. The base wait in seconds. The wait before retry n (starting at 0) is
+        at most backoff_factor * 2^n seconds.
+    max_backoff : float
+        Optional, defaults to 30. The maximum wait in seconds between two attempts.
+    jitter : bool
+        Optional, defaults to True. Pick a random wait between 0 and the computed backoff so that many
+        clients failing at once don't retry in lock step.
+    retry_statuses : tuple of int
+        Optional, defaults to (429, 502, 503, 504). Response statuses that are retried.
+    retry_methods : tuple of str
+        Optional, defaults to ("GET", "PUT", "DELETE", "HEAD", "OPTIONS"). HTTP methods that are safe to retry.
+    max_total_retries : int
+        Optional, defaults to None (no limit). The retry budget for all calls made by a client. Once
+        a client has made this many retries, failures are raised immediately.
+    max_retry_after : float
+        Optional, defaults to 300. The longest Retry-After value (in seconds) that will be waited for. If
+        the server asks for a longer wait the error is raised instead.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30.0, jitter=True,
+                 retry_statuses=(429, 502, 503, 504), retry_methods=("GET", "PUT", "DELETE", "HEAD", "OPTIONS"),
+                 max_total_retries=None, max_retry_after=300.0):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.max_total_retries = max_total_retries
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, method, attempt, response=None, total_retries=0):
+        """
+        Returns True if a failed attempt should be retried.
+
+        :param str method: The HTTP method of the request
+        :param int attempt: The number of retries already made for this call
+        :param response: The response, or None if the request failed with a connection error
+        :param int total_retries: The number of retries already made by the client
+        :rtype: bool
+        """
+        if attempt >= self.max_retries:
+            return False
+        if self.max_total_retries is not None and total_retries >= self.max_total_retries:
+            return False
+        if response is None:
+            return method.upper() in self.retry_methods
+        status = _status_code(response)
+        if status not in self.retry_statuses:
+            return False
+        if status != 429 and method.upper() not in self.retry_methods:
+            return False
+        retry_after = _parse_retry_after(response.headers.get('retry-after', None))
+        return retry_after is None or retry_after <= self.max_retry_after
+
+    def backoff(self, attempt):
+        """
+        Returns the number of seconds to wait before retry number attempt (starting at 0).
+        """
+        wait = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            return random.uniform(0, wait)
+        return wait
+
+    def delay(self, attempt, response=None):
+        """
+        Returns the number of seconds to wait before retrying, honoring any Retry-After header on response.
+        """
+        if response is not None:
+            retry_after = _parse_retry_after(response.headers.get('retry-after', None))
+            if retry_after is not None:
+                return retry_after
+        return self.backoff(attempt)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Collapses concurrent calls with the same key into one. The first caller for a key runs the function,
+    and callers arriving with the same key while it is running wait for it and receive its result (or
+    its exception) instead of running the function again.
+
+    Attributes
+    ----------
+    calls : int
+        The number of times the function was actually run.
+    shared : int
+        The number of callers that received the result of another caller's run.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, deadline=None):
+        """
+        Runs fn, unless a call with the same key is already running, in which case waits for that call.
+
+        :param key: A hashable key identifying the call
+        :param fn: The function to run, it takes no arguments
+        :param float deadline: Optional time.monotonic() value to stop waiting for another caller's run at
+        :return: The result of fn
+        :raises TimeoutError: If the deadline passes while waiting for another caller's run
+        """
+        with self._lock:
+            call = self._calls.get(key, None)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not call.done.wait(timeout):
+                raise TimeoutError("timed out waiting for in-flight call")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
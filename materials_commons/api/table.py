@@ -0,0 +1,171 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from .util import to_datetime64
+
+
+def _path(d):
+    # The path of a file, made from its directory's path and its name when the directory is included, as File does.
+    directory = d.get('directory', None)
+    name = d.get('name', None)
+    if not directory or directory.get('path', None) is None or name is None:
+        return d.get('path', None) or ''
+    if directory['path'] == '/':
+        return '/' + name
+    return directory['path'] + '/' + name
+
+
+def _int_column(rows, key, missing):
+    return numpy.array([missing if v is None else v for v in (d.get(key, None) for d in rows)], dtype=numpy.int64)
+
+
+def _str_column(rows, key):
+    return numpy.array([d.get(key, None) or '' for d in rows], dtype=object)
+
+
+def _factorize(column):
+    # Returns the sorted distinct values of column and the index of each row's value among them. Strings are
+    # numbered with a dict, which is much faster than having numpy.unique sort the column's Python objects.
+    if column.dtype != object:
+        keys, inverse = numpy.unique(column, return_inverse=True)
+        return keys, inverse.ravel()
+    index = {}
+    codes = numpy.fromiter((index.setdefault(v, len(index)) for v in column), dtype=numpy.int64, count=len(column))
+    keys = numpy.empty(len(index), dtype=object)
+    keys[:] = list(index)
+    order = numpy.argsort(keys, kind='stable')
+    rank = numpy.empty(len(order), dtype=numpy.int64)
+    rank[order] = numpy.arange(len(order))
+    return keys[order], rank[codes]
+
+
+class FileTable(object):
+    """
+    The files of a listing stored by column in a NumPy structured array, for summing and counting over many
+    files without building a File object for each one. Requires NumPy. ::
+
+        table = c.get_files_changed_since_table(project_id, "1970-01-01 00:00:00")
+        mime_types, sizes = table.group_sum("mime_type")
+
+    Missing ids are -1, missing sizes 0, missing strings '' and missing times NaT.
+
+    Attributes
+    ----------
+    array : numpy.ndarray
+        The structured array holding the table, one element per file, with the fields in COLUMNS.
+    """
+
+    COLUMNS = (('id', 'i8'), ('uuid', 'O'), ('name', 'O'), ('path', 'O'), ('mime_type', 'O'),
+               ('directory_id', 'i8'), ('owner_id', 'i8'), ('size', 'i8'), ('checksum', 'O'),
+               ('created_at', 'datetime64[us]'), ('updated_at', 'datetime64[us]'))
+
+    def __init__(self, array=None):
+        if numpy is None:
+            raise ImportError("FileTable requires numpy")
+        self.array = array if array is not None else numpy.empty(0, dtype=list(self.COLUMNS))
+
+    @staticmethod
+    def from_rows(rows):
+        """
+        Builds a table from file dicts as decoded from a response.
+
+        :param list rows: The file dicts
+        :rtype: FileTable
+        """
+        if numpy is None:
+            raise ImportError("FileTable requires numpy")
+        array = numpy.empty(len(rows), dtype=list(FileTable.COLUMNS))
+        array['id'] = _int_column(rows, 'id', -1)
+        array['uuid'] = _str_column(rows, 'uuid')
+        array['name'] = _str_column(rows, 'name')
+        array['path'] = [_path(d) for d in rows]
+        array['mime_type'] = _str_column(rows, 'mime_type')
+        array['directory_id'] = _int_column(rows, 'directory_id', -1)
+        array['owner_id'] = _int_column(rows, 'owner_id', -1)
+        array['size'] = _int_column(rows, 'size', 0)
+        array['checksum'] = _str_column(rows, 'checksum')
+        array['created_at'] = to_datetime64(d.get('created_at', None) for d in rows)
+        array['updated_at'] = to_datetime64(d.get('updated_at', None) for d in rows)
+        return FileTable(array)
+
+    @staticmethod
+    def from_pages(pages):
+        """
+        Builds a table from lists of file dicts, such as the pages of a listing, converting each list as it
+        arrives so only one is held at a time.
+
+        :param pages: Iterable of lists of file dicts
+        :rtype: FileTable
+        """
+        parts = [FileTable.from_rows(rows).array for rows in pages]
+        if not parts:
+            return FileTable()
+        return FileTable(numpy.concatenate(parts))
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, column):
+        return self.array[column]
+
+    def group_sum(self, by, column='size'):
+        """
+        Sums a column over the files grouped by one or more columns, for example the size per mime_type or per
+        (owner_id, directory_id).
+
+        :param by: A column name or a list of them
+        :param str column: The column to sum, defaults to 'size'
+        :return: The distinct keys, sorted (a structured array when grouping by several columns), and the sum for
+            each key
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        keys, inverse, counts = self._groups(by)
+        order = numpy.argsort(inverse)
+        starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+        values = self.array[column][order]
+        if len(values) == 0:
+            return keys, values
+        return keys, numpy.add.reduceat(values, starts)
+
+    def group_count(self, by):
+        """
+        Counts the files grouped by one or more columns.
+
+        :param by: A column name or a list of them
+        :return: The distinct keys, sorted, and the number of files with each
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        keys, _, counts = self._groups(by)
+        return keys, counts
+
+    def _groups(self, by):
+        # Returns the distinct keys, the index of each row's key, and the number of rows per key. Several
+        # columns are combined into one integer code per row, from the index of each column's value.
+        if isinstance(by, str):
+            keys, inverse = _factorize(self.array[by])
+            return keys, inverse, numpy.bincount(inverse, minlength=len(keys))
+        code = numpy.zeros(len(self.array), dtype=numpy.int64)
+        for name in by:
+            keys, inverse = _factorize(self.array[name])
+            code = code * max(len(keys), 1) + inverse
+        _, first, inverse = numpy.unique(code, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        keys = self.array[list(by)][first]
+        return keys, inverse, numpy.bincount(inverse, minlength=len(keys))
+
+    def to_arrow(self):
+        """
+        Returns the table as a pyarrow Table. Requires pyarrow.
+
+        :rtype: pyarrow.Table
+        """
+        if pyarrow is None:
+            raise ImportError("to_arrow requires pyarrow")
+        return pyarrow.table({name: self.array[name] for name, _ in self.COLUMNS})
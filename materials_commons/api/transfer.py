@@ -0,0 +1,91 @@
+import threading
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+# The response encodings the installed urllib3 can decode: gzip and deflate, plus br and zstd when brotli and
+# zstandard are installed.
+accept_encoding = ACCEPT_ENCODING
+
+
+class EndpointTransfer(object):
+    """
+    The bytes sent to and received from one endpoint.
+
+    Attributes
+    ----------
+    requests : int
+        The number of requests made.
+    sent_bytes : int
+        The size of the request bodies before compression.
+    sent_wire_bytes : int
+        The size of the request bodies as sent.
+    received_bytes : int
+        The size of the response bodies after decompression.
+    received_wire_bytes : int
+        The size of the response bodies as received.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.sent_bytes = 0
+        self.sent_wire_bytes = 0
+        self.received_bytes = 0
+        self.received_wire_bytes = 0
+
+    @property
+    def bytes_saved(self):
+        """The number of bytes compression kept off the wire."""
+        return self.sent_bytes - self.sent_wire_bytes + self.received_bytes - self.received_wire_bytes
+
+    def _add(self, other):
+        self.requests += other.requests
+        self.sent_bytes += other.sent_bytes
+        self.sent_wire_bytes += other.sent_wire_bytes
+        self.received_bytes += other.received_bytes
+        self.received_wire_bytes += other.received_wire_bytes
+
+
+class TransferStats(object):
+    """
+    Counts the bytes each endpoint sends and receives, on the wire and after decompression, so the savings
+    from compression can be seen. Endpoints are keyed like "GET /projects/{id}/entities".
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, sent_bytes=0, sent_wire_bytes=0, received_bytes=0, received_wire_bytes=0):
+        with self._lock:
+            t = self._endpoints.get(endpoint)
+            if t is None:
+                t = self._endpoints[endpoint] = EndpointTransfer()
+            t.requests += 1
+            t.sent_bytes += sent_bytes
+            t.sent_wire_bytes += sent_wire_bytes
+            t.received_bytes += received_bytes
+            t.received_wire_bytes += received_wire_bytes
+
+    def endpoints(self):
+        """
+        Returns a copy of the counts for each endpoint.
+
+        :rtype: dict of str to EndpointTransfer
+        """
+        with self._lock:
+            result = {}
+            for endpoint, t in self._endpoints.items():
+                result[endpoint] = EndpointTransfer()
+                result[endpoint]._add(t)
+            return result
+
+    def total(self):
+        """
+        Returns the counts summed over all endpoints.
+
+        :rtype: EndpointTransfer
+        """
+        total = EndpointTransfer()
+        for t in self.endpoints().values():
+            total._add(t)
+        return total
@@ -1,9 +1,41 @@
 import datetime
 import os
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+_SERVER_DATE = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{1,6}Z", re.ASCII)
 
 
 def to_datetime(dt_str):
-    return datetime.datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%fZ")
+    # fromisoformat is many times faster than strptime, but accepts forms that _DATE_FORMAT doesn't, such as a
+    # date alone or a UTC offset. It is only used for the server's own form; anything else goes through strptime.
+    if _SERVER_DATE.fullmatch(dt_str):
+        try:
+            return datetime.datetime.fromisoformat(dt_str[:-1])
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(dt_str, _DATE_FORMAT)
+
+
+def to_datetime64(dt_strs):
+    """
+    Decodes a column of timestamps as sent by the server, such as the created_at values of a listing
+    returned with raw=True, into a NumPy array in one call. Requires NumPy.
+
+    :param dt_strs: The timestamps, strings in the form "%Y-%m-%dT%H:%M:%S.%fZ", datetimes or None
+    :return: The timestamps, None values become NaT
+    :rtype: numpy.ndarray of datetime64[us]
+    """
+    if numpy is None:
+        raise ImportError("to_datetime64 requires numpy")
+    # NumPy parses the strings itself, once the "Z" it warns about is removed.
+    return numpy.array(["NaT" if v is None else v[:-1] if isinstance(v, str) and v.endswith("Z") else v
+                        for v in dt_strs], dtype="datetime64[us]")
 
 
 def get_date(attr_name, data):
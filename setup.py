@@ -48,5 +48,6 @@ setup(
     install_requires=[
         "requests>=2.32.5",
         "tuspy>=1.1.0",
+        "aiohttp>=3.8.0",
     ]
 )
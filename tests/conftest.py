@@ -0,0 +1,198 @@
+import gzip
+import json
+import re
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def file_dict(i):
+    return {"id": i, "uuid": "uuid-" + str(i), "name": "f" + str(i) + ".txt", "size": i * 10,
+            "mime_type": "text/plain", "directory_id": i % 7, "owner_id": i % 3,
+            "created_at": "2024-01-02T03:04:05.000000Z", "updated_at": "2024-01-02T03:04:05.000000Z",
+            "owner": {"id": i % 3, "name": "user" + str(i % 3), "email": "user" + str(i % 3) + "@example.com"},
+            "directory": {"id": i % 7, "name": "d" + str(i % 7), "path": "/d" + str(i % 7), "mime_type": "directory"}}
+
+
+class StubServer(object):
+    """
+    A local HTTP server answering the Materials Commons API calls used by the tests. Its attributes control
+    the responses: fail_next requests fail with fail_status (and retry_after, if set), and every request
+    waits delay seconds, or the next of delays if any are left. requests records (method, path, body size)
+    and queries the parsed query string for each request received, and abandoned counts the requests whose
+    client closed the connection while they waited. headers are added to every response. received keeps the
+    (headers, body) of each request. Responses are gzip compressed if compress is set and the client accepts
+    it, and gzip compressed bodies are rejected with 415 unless accepts_gzip is set.
+    """
+
+    ETAG = '"v1"'
+
+    def __init__(self, files):
+        self.files = files
+        self.delay = 0.0
+        self.delays = []
+        self.abandoned = 0
+        self.headers = {}
+        self.received = []
+        self.compress = False
+        self.accepts_gzip = True
+        self.fail_next = 0
+        self.fail_status = 503
+        self.retry_after = None
+        self.requests = []
+        self.queries = []
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 128
+        self._server.stub = self
+        self.url = "http://127.0.0.1:" + str(self._server.server_address[1]) + "/api"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, method=None, path=None):
+        with self.lock:
+            return len([r for r in self.requests if method in (None, r[0]) and path in (None, r[1])])
+
+    def respond(self, method, path, query, headers):
+        if path.endswith("/file-changes-since"):
+            since = query.get("since", ["1970-01-01 00:00:00"])[0]
+            changed = [f for f in self.files if _changed_at(f) is None or _changed_at(f) >= since]
+            return 200, self._paged(changed, query), {}
+        if re.search(r"/projects/\d+/entities$", path):
+            return 200, {"data": self.files}, {}
+        if re.search(r"/files/\d+/upload", path):
+            return 200, {"data": [self.files[0]]}, {}
+        if re.search(r"/projects/\d+/experiments$", path):
+            return 200, {"data": [{"id": 5, "name": "experiment", "project_id": 1}]}, {}
+        match = re.search(r"/experiments/(\d+)$", path)
+        if match and method == "PUT":
+            return 200, {"data": {"id": int(match.group(1)), "name": "renamed", "project_id": 1}}, {}
+        if re.search(r"/projects/\d+$", path):
+            if headers.get("If-None-Match") == self.ETAG:
+                return 304, None, {}
+            return 200, {"data": {"id": 1, "name": "project"}}, {"ETag": self.ETAG}
+        return 404, {"error": "not found"}, {}
+
+    @staticmethod
+    def _paged(items, query):
+        number = int(query.get("page[number]", ["1"])[0])
+        size = int(query.get("page[size]", ["100"])[0])
+        last = max(1, (len(items) + size - 1) // size)
+        return {"current_page": number, "last_page": last, "per_page": size, "total": len(items),
+                "data": items[(number - 1) * size:number * size]}
+
+
+def _changed_at(f):
+    # A file's change time in the form of the since parameter, "YYYY-MM-DD HH:MM:SS".
+    t = f["updated_at"] or f["created_at"]
+    return None if t is None else t[:19].replace("T", " ")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self, method):
+        stub = self.server.stub
+        n = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(n) if n else b""
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with stub.lock:
+            stub.requests.append((method, url.path, n))
+            stub.queries.append(query)
+            stub.received.append((self.headers, received))
+            fail = stub.fail_next > 0
+            if fail:
+                stub.fail_next -= 1
+            delay = stub.delays.pop(0) if stub.delays else stub.delay
+        if delay and not self._wait(delay):
+            with stub.lock:
+                stub.abandoned += 1
+            self.close_connection = True
+            return
+        if fail:
+            status, body, headers = stub.fail_status, {"error": "failed"}, {}
+            if stub.retry_after is not None:
+                headers["Retry-After"] = stub.retry_after
+        elif self.headers.get("Content-Encoding") == "gzip" and not stub.accepts_gzip:
+            status, body, headers = 415, {"error": "unsupported content encoding"}, {}
+        else:
+            status, body, headers = stub.respond(method, url.path, query, self.headers)
+        headers = dict(stub.headers, **headers)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        if stub.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _wait(self, seconds):
+        # Waits seconds, returning False early if the client closes the connection meanwhile.
+        end = time.monotonic() + seconds
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return True
+            readable, _, _ = select.select([self.connection], [], [], min(remaining, 0.05))
+            if readable:
+                try:
+                    if self.connection.recv(1, socket.MSG_PEEK) == b"":
+                        return False
+                except OSError:
+                    return False
+                time.sleep(min(remaining, 0.05))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+@pytest.fixture
+def server():
+    stub = StubServer([file_dict(i) for i in range(1, 1001)])
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def make_client(server):
+    clients = []
+
+    def make(**kwargs):
+        kwargs.setdefault("retry_policy", mcapi.RetryPolicy(backoff_factor=0.01, jitter=False))
+        clients.append(mcapi.Client("test-apikey", base_url=server.url, **kwargs))
+        return clients[-1]
+
+    yield make
+    for c in clients:
+        c.close()
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def run(server, test, **kwargs):
+    kwargs.setdefault("retry_policy", mcapi.RetryPolicy(backoff_factor=0.01, jitter=False))
+
+    async def main():
+        async with mcapi.AsyncClient("test-apikey", base_url=server.url, **kwargs) as c:
+            return await test(c)
+
+    return asyncio.run(main())
+
+
+def test_get_project(server):
+    async def test(c):
+        return await c.get_project(1)
+
+    assert run(server, test).name == "project"
+
+
+def test_paged_listing_in_order(server):
+    async def test(c):
+        return [f.id async for f in c.iter_files_changed_since(1, "1970-01-01 00:00:00", page_size=64)]
+
+    assert run(server, test) == list(range(1, 1001))
+
+
+def test_stopping_early_closes_the_pages(server):
+    async def test(c):
+        async for f in c.iter_files_changed_since(1, "1970-01-01 00:00:00", page_size=10):
+            if f.id == 5:
+                break
+
+    run(server, test, page_workers=1)
+    assert server.count("GET", "/api/projects/1/file-changes-since") <= 2
+
+
+def test_concurrent_calls_are_limited(server):
+    server.delay = 0.1
+
+    async def test(c):
+        return await asyncio.gather(*[c.get_project(1) for _ in range(8)])
+
+    async def timed(c):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        projects = await test(c)
+        return projects, loop.time() - start
+
+    projects, elapsed = run(server, timed, max_concurrency=2)
+    assert len(projects) == 8
+    assert elapsed >= 0.4
+
+
+def test_retries_429_and_resends_the_upload(server, tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"x" * 10000)
+    server.fail_status = 429
+    server.fail_next = 1
+
+    async def test(c):
+        return await c.upload_file(1, 2, str(path))
+
+    assert run(server, test).id == 1
+    sizes = [r[2] for r in server.requests]
+    assert len(sizes) == 2
+    assert sizes[0] == sizes[1] > 10000
+
+
+def test_gives_up_after_max_retries(server):
+    server.fail_next = 10
+
+    async def test(c):
+        return await c.get_project(1)
+
+    with pytest.raises(mcapi.MCAPIError):
+        run(server, test, retry_policy=mcapi.RetryPolicy(max_retries=1, backoff_factor=0.01, jitter=False))
+    assert server.count("GET", "/api/projects/1") == 2
@@ -0,0 +1,40 @@
+import materials_commons.api as mcapi
+
+
+def test_revalidation_cache_reuses_not_modified_payload(server, make_client):
+    cache = mcapi.RevalidationCache()
+    c = make_client(revalidation_cache=cache)
+    first = c.get_project(1)
+    second = c.get_project(1)
+    assert first.name == second.name == "project"
+    assert server.count("GET", "/api/projects/1") == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_response_cache_serves_repeated_gets_until_a_write(server, make_client, tmp_path):
+    cache = mcapi.ResponseCache(path=str(tmp_path / "responses.db"))
+    c = make_client(response_cache=cache)
+    c.get_project(1)
+    c.get_project(1)
+    assert server.count("GET", "/api/projects/1") == 1
+    assert cache.hits == 1
+
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"x" * 100)
+    c.upload_file(1, 2, str(path))
+    c.get_project(1)
+    assert server.count("GET", "/api/projects/1") == 2
+    cache.close()
+
+
+def test_response_cache_drops_project_listings_after_update_experiment(server, make_client, tmp_path):
+    cache = mcapi.ResponseCache(path=str(tmp_path / "responses.db"))
+    c = make_client(response_cache=cache)
+    assert [e.name for e in c.get_all_experiments(1)] == ["experiment"]
+    c.get_all_experiments(1)
+    assert server.count("GET", "/api/projects/1/experiments") == 1
+
+    c.update_experiment(5, mcapi.UpdateExperimentRequest(name="renamed"))
+    c.get_all_experiments(1)
+    assert server.count("GET", "/api/projects/1/experiments") == 2
+    cache.close()
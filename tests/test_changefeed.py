@@ -0,0 +1,64 @@
+import datetime
+
+import materials_commons.api as mcapi
+
+
+def changed_file(server, i, updated_at):
+    return dict(server.files[0], id=i, updated_at=updated_at)
+
+
+def test_poll_returns_each_change_once(server, make_client, tmp_path):
+    feed = mcapi.ProjectChangeFeed(make_client(), 1, path=str(tmp_path / "feed.json"))
+    assert [f.id for f in feed.poll()] == list(range(1, 1001))
+    assert feed.high_water_mark == datetime.datetime(2024, 1, 2, 3, 4, 5)
+    assert feed.poll() == []
+
+
+def test_overlap_returns_late_and_boundary_changes(server, make_client, tmp_path):
+    feed = mcapi.ProjectChangeFeed(make_client(), 1, path=str(tmp_path / "feed.json"), overlap=60)
+    feed.poll()
+    server.files.append(changed_file(server, 2001, "2024-01-02T03:04:05.000000Z"))
+    server.files.append(changed_file(server, 2002, "2024-01-02T03:03:30.000000Z"))
+    server.files.append(changed_file(server, 2003, "2024-01-02T03:00:00.000000Z"))
+    assert [f.id for f in feed.poll()] == [2002, 2001]
+    assert feed.poll() == []
+
+
+def test_changed_file_is_returned_again(server, make_client, tmp_path):
+    feed = mcapi.ProjectChangeFeed(make_client(), 1, path=str(tmp_path / "feed.json"))
+    feed.poll()
+    server.files[0]["updated_at"] = "2024-01-02T04:00:00.000000Z"
+    assert [f.id for f in feed.poll()] == [1]
+    assert feed.high_water_mark == datetime.datetime(2024, 1, 2, 4, 0, 0)
+
+
+def test_seen_files_are_pruned(server, make_client, tmp_path):
+    feed = mcapi.ProjectChangeFeed(make_client(), 1, path=str(tmp_path / "feed.json"), overlap=60)
+    server.files.append(changed_file(server, 3001, None))
+    server.files[-1]["created_at"] = None
+    feed.poll()
+    assert (3001, None) in feed._seen
+    server.files[:] = [changed_file(server, 1, "2024-01-02T05:00:00.000000Z")]
+    assert [f.id for f in feed.poll()] == [1]
+    assert feed._seen == {(1, datetime.datetime(2024, 1, 2, 5, 0, 0))}
+
+
+def test_position_is_saved_and_loaded(server, make_client, tmp_path):
+    path = str(tmp_path / "feed.json")
+    c = make_client()
+    feed = mcapi.ProjectChangeFeed(c, 1, path=path)
+    feed.poll()
+
+    restarted = mcapi.ProjectChangeFeed(c, 1, path=path)
+    assert restarted.high_water_mark == feed.high_water_mark
+    assert restarted._seen == feed._seen
+    assert restarted.poll() == []
+    server.files.append(changed_file(server, 2001, "2024-01-02T03:05:00.000000Z"))
+    assert [f.id for f in restarted.poll()] == [2001]
+
+
+def test_unsaved_poll_is_returned_again(server, make_client, tmp_path):
+    path = str(tmp_path / "feed.json")
+    c = make_client()
+    mcapi.ProjectChangeFeed(c, 1, path=path).poll(save=False)
+    assert len(mcapi.ProjectChangeFeed(c, 1, path=path).poll()) == 1000
@@ -0,0 +1,37 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_concurrent_paged_listings(server, make_client):
+    c = make_client(pool_maxsize=32)
+    page_sizes = [20, 50, 100, 128, 250, 333, 500, 1000] * 2
+
+    def list_files(page_size):
+        pages = list(c.iter_files_changed_since(1, "1970-01-01 00:00:00", page_size=page_size))
+        return page_size, pages
+
+    with ThreadPoolExecutor(max_workers=len(page_sizes)) as executor:
+        results = list(executor.map(list_files, page_sizes))
+
+    for page_size, files in results:
+        assert [f.id for f in files] == list(range(1, 1001))
+
+
+def test_concurrent_paged_metadata_is_per_call(server, make_client):
+    c = make_client(pool_maxsize=16)
+    barrier = threading.Barrier(8)
+
+    def pages(page_size):
+        barrier.wait()
+        return [(p.current_page, p.last_page, p.per_page, len(p.data))
+                for p in c.list_files_changed_since(1, "1970-01-01 00:00:00", page_size=page_size)]
+
+    sizes = [10, 30, 70, 110, 150, 190, 230, 270]
+    with ThreadPoolExecutor(max_workers=len(sizes)) as executor:
+        results = list(executor.map(pages, sizes))
+
+    for size, got in zip(sizes, results):
+        last_page = (1000 + size - 1) // size
+        assert [p[0] for p in got] == list(range(1, last_page + 1))
+        assert all(p[1] == last_page and p[2] == size for p in got)
+        assert sum(p[3] for p in got) == 1000
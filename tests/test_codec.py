@@ -0,0 +1,86 @@
+import datetime
+import json
+import math
+
+import pytest
+
+from materials_commons.api import JSONCodec
+from materials_commons.api import codec
+
+BACKENDS = ["json"] + [name for name in ("orjson", "msgspec") if getattr(codec, name) is not None]
+
+
+def stdlib(obj):
+    return json.dumps(obj, separators=(",", ":"), allow_nan=False)
+
+
+class Tag(str):
+    pass
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("obj", [
+    {"name": "a", "value": None, "values": [None, 1, 2.5, True, False]},
+    {"text": "null", "nested": {"list": [{"a": None}], "tuple": (1, "two")}},
+    {1: "int key", 2: [1, 2]},
+    {"big": 2 ** 70, "negative": -2 ** 65},
+    {"unicode": "café ✓", "float": 1e16, "small": 1e-7},
+    {"subclass": Tag("t"), "float subclass": type("F", (float,), {})(1.5)},
+    [],
+    None,
+])
+def test_encode_matches_json(backend, obj):
+    c = JSONCodec(backend)
+    assert json.loads(c.encode(obj)) == json.loads(stdlib(obj))
+    assert json.loads(c.dumps(obj)) == json.loads(stdlib(obj))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("obj", [
+    {"x": math.nan},
+    {"x": [1.0, math.inf]},
+    {"x": {"y": -math.inf}},
+    {"x": type("F", (float,), {})(math.nan)},
+])
+def test_non_finite_floats_raise_like_json(backend, obj):
+    with pytest.raises(ValueError):
+        stdlib(obj)
+    with pytest.raises(ValueError):
+        JSONCodec(backend).encode(obj)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("obj", [
+    {"at": datetime.datetime(2024, 1, 2, 3, 4, 5)},
+    {"on": datetime.date(2024, 1, 2)},
+    {"set": {1, 2}},
+    {"object": object()},
+])
+def test_unsupported_types_raise_like_json(backend, obj):
+    with pytest.raises(TypeError):
+        stdlib(obj)
+    with pytest.raises(TypeError):
+        JSONCodec(backend).encode(obj)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_numpy_values_match_json(backend):
+    numpy = pytest.importorskip("numpy")
+    c = JSONCodec(backend)
+    assert json.loads(c.encode({"x": numpy.float64(2.25)})) == {"x": 2.25}
+    with pytest.raises(ValueError):
+        c.encode({"x": numpy.float64("nan")})
+    with pytest.raises(TypeError):
+        c.encode({"x": numpy.arange(3)})
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_decode(backend):
+    assert JSONCodec(backend).decode(b'{"data": [1, "two", null, 2.5]}') == {"data": [1, "two", None, 2.5]}
+    with pytest.raises(ValueError):
+        JSONCodec(backend).decode(b'{"data": ')
+
+
+def test_unavailable_backend():
+    with pytest.raises(ValueError):
+        JSONCodec("simplejson")
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import materials_commons.api as mcapi
+
+
+def update(c, description):
+    return c.update_experiment(5, mcapi.UpdateExperimentRequest(name="renamed", description=description))
+
+
+def test_responses_requested_compressed(make_client, server):
+    server.compress = True
+    c = make_client()
+    entities = c.get_all_entities(1)
+    assert len(entities) == 1000
+    assert "gzip" in server.received[-1][0]["Accept-Encoding"]
+
+    t = c.transfer_stats.endpoints()["GET /projects/{id}/entities"]
+    assert t.requests == 1
+    assert t.received_bytes == len(json.dumps({"data": server.files}).encode("utf-8"))
+    assert t.received_wire_bytes < t.received_bytes / 5
+    assert t.bytes_saved == t.received_bytes - t.received_wire_bytes
+
+
+def test_uncompressed_responses_counted(make_client, server):
+    c = make_client()
+    c.get_all_entities(1)
+    c.get_all_entities(1)
+    t = c.transfer_stats.total()
+    assert t.requests == 2
+    assert t.received_wire_bytes == t.received_bytes
+    assert t.bytes_saved == 0
+
+
+def test_large_bodies_compressed(make_client, server):
+    c = make_client(compress_requests_over=1024)
+    assert update(c, "x" * 5000).name == "renamed"
+    headers, body = server.received[-1]
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body))["description"] == "x" * 5000
+
+    t = c.transfer_stats.endpoints()["PUT /experiments/{id}"]
+    assert t.sent_wire_bytes == len(body)
+    assert t.sent_bytes == len(gzip.decompress(body))
+
+
+def test_small_bodies_not_compressed(make_client, server):
+    c = make_client(compress_requests_over=1024)
+    update(c, "short")
+    headers, body = server.received[-1]
+    assert "Content-Encoding" not in headers
+    assert json.loads(body)["description"] == "short"
+
+
+def test_no_compression_by_default(make_client, server):
+    c = make_client()
+    update(c, "x" * 5000)
+    assert "Content-Encoding" not in server.received[-1][0]
+
+
+def test_rejected_compression_falls_back(make_client, server):
+    server.accepts_gzip = False
+    c = make_client(compress_requests_over=1024)
+    assert update(c, "x" * 5000).name == "renamed"
+    assert [h.get("Content-Encoding") for h, _ in server.received] == ["gzip", None]
+    assert json.loads(server.received[-1][1])["description"] == "x" * 5000
+
+    update(c, "y" * 5000)
+    assert server.count("PUT") == 3
+    assert "Content-Encoding" not in server.received[-1][0]
+    assert c.transfer_stats.endpoints()["PUT /experiments/{id}"].requests == 2
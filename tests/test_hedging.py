@@ -0,0 +1,69 @@
+import time
+import warnings
+
+import pytest
+
+import materials_commons.api as mcapi
+from materials_commons.api import client, hedging
+
+
+def test_endpoint_key_replaces_ids():
+    assert hedging.endpoint_key("GET", "/projects/12/directories/3/list?x=1") == \
+        "GET /projects/{id}/directories/{id}/list"
+
+
+def test_hedge_policy_waits_for_samples_and_limits_extra_load():
+    policy = mcapi.HedgePolicy(min_samples=3, max_extra_load=0.5, min_delay=0.01)
+    for seconds in (0.1, 0.2, 0.3):
+        assert policy.delay_for("GET /x") is None
+        policy.latencies.record("GET /x", seconds)
+    assert policy.delay_for("GET /x") == pytest.approx(0.3)
+    assert policy.requests == 4
+    assert policy.acquire_hedge() and policy.acquire_hedge()
+    assert not policy.acquire_hedge()
+    assert policy.hedged == 2
+
+
+def test_slow_read_is_answered_by_the_hedge_and_the_loser_is_closed(server, make_client):
+    policy = mcapi.HedgePolicy(min_samples=1, max_extra_load=1.0, min_delay=0.05)
+    c = make_client(hedge_policy=policy)
+    c.get_project(1)
+    server.delays = [5.0]
+    start = time.monotonic()
+    assert c.get_project(1).id == 1
+    assert time.monotonic() - start < 2.0
+    assert policy.hedged == 1
+    assert policy.hedge_wins == 1
+    deadline = time.monotonic() + 2.0
+    while server.abandoned == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.abandoned == 1
+    assert c.get_project(1).id == 1
+
+
+def test_fast_read_is_not_hedged(server, make_client):
+    policy = mcapi.HedgePolicy(min_samples=1, max_extra_load=1.0, min_delay=1.0)
+    c = make_client(hedge_policy=policy)
+    for _ in range(5):
+        c.get_project(1)
+    assert policy.hedged == 0
+    assert server.count("GET", "/api/projects/1") == 5
+
+
+def test_connection_tracking_requires_urllib3_2(monkeypatch):
+    assert hedging._connection_tracking_supported()
+    monkeypatch.setattr(hedging.urllib3, "__version__", "3.0.0")
+    assert not hedging._connection_tracking_supported()
+    monkeypatch.setattr(hedging.urllib3, "__version__", "1.26.18")
+    assert not hedging._connection_tracking_supported()
+
+
+def test_hedging_is_disabled_without_connection_tracking(server, monkeypatch):
+    monkeypatch.setattr(client, "_CONNECTION_TRACKING", False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        c = mcapi.Client("test-apikey", base_url=server.url, hedge_policy=mcapi.HedgePolicy())
+    assert c.hedge_policy is None
+    assert "hedge_policy is ignored" in str(caught[0].message)
+    assert c.get_project(1).id == 1
+    c.close()
@@ -0,0 +1,89 @@
+import gc
+import threading
+
+import materials_commons.api as mcapi
+
+
+def file_dict(i, directory_path="/d"):
+    return {"id": i, "name": "f" + str(i) + ".txt", "owner": {"id": 7, "name": "user"},
+            "directory": {"id": 3, "name": "d", "path": directory_path}}
+
+
+def test_related_objects_are_shared():
+    ids = mcapi.IdentityMap()
+    with ids.active():
+        files = mcapi.File.from_list([file_dict(i) for i in range(1, 101)])
+    assert len({id(f.owner) for f in files}) == 1
+    assert len({id(f.directory) for f in files}) == 1
+    assert (ids.misses, ids.hits) == (2, 198)
+
+
+def test_objects_not_shared_without_the_map():
+    ids = mcapi.IdentityMap()
+    with ids.active():
+        pass
+    a, b = mcapi.File(file_dict(1)), mcapi.File(file_dict(2))
+    assert a.owner is not b.owner
+    assert (ids.misses, ids.hits) == (0, 0)
+
+
+def test_changed_values_build_a_new_object():
+    ids = mcapi.IdentityMap()
+    with ids.active():
+        old = mcapi.File(file_dict(1, "/d"))
+        renamed = mcapi.File(file_dict(2, "/renamed"))
+        again = mcapi.File(file_dict(3, "/renamed"))
+    assert old.directory is not renamed.directory
+    assert renamed.directory is again.directory
+    assert old.directory.path == "/d"
+    assert (old.path, renamed.path) == ("/d/f1.txt", "/renamed/f2.txt")
+    assert old.owner is renamed.owner is again.owner
+
+
+def test_objects_without_an_id_are_not_shared():
+    data = file_dict(1)
+    data["owner"] = {"name": "user"}
+    ids = mcapi.IdentityMap()
+    with ids.active():
+        a, b = mcapi.File(data), mcapi.File(data)
+    assert a.owner is not b.owner
+
+
+def test_entries_dropped_after_gc():
+    ids = mcapi.IdentityMap()
+    with ids.active():
+        files = mcapi.File.from_list([file_dict(i) for i in range(1, 11)])
+    assert len(ids._objects) == 2
+    del files
+    gc.collect()
+    assert ids._objects == {}
+    with ids.active():
+        mcapi.File(file_dict(11))
+    assert ids.misses == 4
+
+
+def test_active_is_per_thread():
+    ids = mcapi.IdentityMap()
+    owners = []
+
+    def build():
+        owners.append(mcapi.File(file_dict(1)).owner)
+
+    with ids.active():
+        shared = mcapi.File(file_dict(2)).owner
+        t = threading.Thread(target=build)
+        t.start()
+        t.join()
+    assert owners[0] is not shared
+    assert ids.misses == 2
+
+
+def test_client_identity_map(server, make_client):
+    ids = mcapi.IdentityMap()
+    c = make_client(identity_map=ids)
+    files = [f for p in c.list_files_changed_since(1, "1970-01-01 00:00:00") for f in p.data]
+    assert len({id(f.owner) for f in files}) == 3
+    assert len({id(f.directory) for f in files}) == 7
+    assert all(f.path == f.directory.path + "/" + f.name for f in files)
+    assert ids.misses == 3 + 7
+    assert ids.hits == 2 * 1000 - ids.misses
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from materials_commons.api import JSONArrayStream
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 100000])
+def test_items_and_fields_across_chunks(size):
+    doc = {"current_page": 1, "data": [{"id": i, "name": "café " + str(i), "tags": [1, {"a": None}]}
+                                       for i in range(50)], "total": 50}
+    stream = JSONArrayStream(chunked(json.dumps(doc, ensure_ascii=False).encode("utf-8"), size))
+    assert list(stream) == doc["data"]
+    assert stream.fields == {"current_page": 1, "total": 50}
+
+
+def test_top_level_array():
+    assert list(JSONArrayStream([b'[1, ', b'"two", [3]', b']'])) == [1, "two", [3]]
+
+
+def test_empty_array():
+    stream = JSONArrayStream([b'{"data": [], "total": 0}'])
+    assert list(stream) == []
+    assert stream.fields == {"total": 0}
+
+
+def test_reading_stops_early_without_reading_the_rest():
+    read = []
+
+    def chunks():
+        for chunk in [b'{"data": [1, ', b'2, ', b'3]}']:
+            read.append(chunk)
+            yield chunk
+
+    items = iter(JSONArrayStream(chunks()))
+    assert next(items) == 1
+    assert len(read) == 1
+
+
+@pytest.mark.parametrize("doc", [b'{"data": [1, 2', b'{"data": [1 2]}', b'"text"', b'[1] extra'])
+def test_invalid_documents_raise(doc):
+    with pytest.raises(ValueError):
+        list(JSONArrayStream([doc]))
+
+
+def test_stream_decodes_listing_incrementally(server, make_client):
+    c = make_client()
+    entities = c.stream_all_entities(1)
+    assert [e.id for e in entities] == list(range(1, 1001))
@@ -0,0 +1,116 @@
+import datetime
+import threading
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def file_dict(i):
+    return {"id": i, "name": "f" + str(i) + ".txt", "size": 10, "created_at": "2024-01-02T03:04:05.000000Z",
+            "owner": {"id": 7, "name": "user"}, "directory": {"id": 3, "name": "d", "path": "/d"}}
+
+
+def test_models_have_no_instance_dict():
+    f = mcapi.File(file_dict(1))
+    assert not hasattr(f, "__dict__")
+    with pytest.raises(AttributeError):
+        f.not_an_attribute = 1
+    assert f.raw_data is None
+
+
+def test_keep_raw_data_is_scoped_to_the_with_block():
+    data = file_dict(1)
+    with mcapi.keep_raw_data():
+        kept = mcapi.File(data)
+    assert kept.raw_data == data
+    assert kept.raw_data is not data
+    assert mcapi.File(data).raw_data is None
+
+
+def test_keep_raw_data_is_per_thread():
+    built = []
+    started = threading.Event()
+    finish = threading.Event()
+
+    def keep():
+        with mcapi.keep_raw_data():
+            started.set()
+            finish.wait(5)
+
+    t = threading.Thread(target=keep)
+    t.start()
+    assert started.wait(5)
+    built.append(mcapi.File(file_dict(1)))
+    finish.set()
+    t.join()
+    assert built[0].raw_data is None
+
+
+def test_client_keep_raw_data_only_affects_its_own_listings(server, make_client):
+    keeping = make_client(keep_raw_data=True)
+    other = make_client()
+    kept = list(keeping.iter_files_changed_since(1, "1970-01-01 00:00:00"))
+    not_kept = list(other.iter_files_changed_since(1, "1970-01-01 00:00:00"))
+    assert kept[0].raw_data["id"] == 1
+    assert not_kept[0].raw_data is None
+    assert other.get_project(1).raw_data is None
+    with mcapi.keep_raw_data():
+        assert other.get_project(1).raw_data == {"id": 1, "name": "project"}
+
+
+def test_client_keep_raw_data_with_identity_map(server, make_client):
+    c = make_client(keep_raw_data=True, identity_map=mcapi.IdentityMap())
+    files = list(c.iter_files_changed_since(1, "1970-01-01 00:00:00"))
+    assert files[0].raw_data["name"] == "f1.txt"
+    assert files[0].owner is files[3].owner
+    assert files[0].owner.raw_data["id"] == 1
+
+
+def test_dates_are_parsed_on_first_read():
+    f = mcapi.File(file_dict(1))
+    assert mcapi.File.created_at._slot.__get__(f) == "2024-01-02T03:04:05.000000Z"
+    assert f.created_at == datetime.datetime(2024, 1, 2, 3, 4, 5)
+    assert type(mcapi.File.created_at._slot.__get__(f)) is datetime.datetime
+    assert f.updated_at is None
+
+
+def test_invalid_date_raises_when_read():
+    data = dict(file_dict(1), created_at="2024-01-02")
+    f = mcapi.File(data)
+    with pytest.raises(ValueError):
+        f.created_at
+
+
+def dataset_dict():
+    return {"id": 9, "name": "dataset", "files": [file_dict(i) for i in range(1, 4)],
+            "tags": [{"id": 1, "name": "Alloy", "slug": "alloy"}]}
+
+
+def test_relationship_lists_are_built_on_first_read():
+    from materials_commons.api.models import _Unbuilt
+    d = mcapi.Dataset(dataset_dict())
+    slot = mcapi.Dataset.__dict__["_files"]
+    assert type(slot.__get__(d)) is _Unbuilt
+    files = d.files
+    assert [f.name for f in files] == ["f1.txt", "f2.txt", "f3.txt"]
+    assert all(type(f) is mcapi.File for f in files)
+    assert slot.__get__(d) is files
+    assert d.files is files
+    assert [t.slug for t in d.tags] == ["alloy"]
+
+
+def test_missing_relationship_lists_are_empty():
+    d = mcapi.Dataset({"id": 9})
+    assert d.files == []
+    assert d.tags == []
+    assert mcapi.Activity({"id": 1, "files": []}).files == []
+
+
+def test_relationship_lists_can_be_assigned():
+    d = mcapi.Dataset(dataset_dict())
+    f = mcapi.File(file_dict(4))
+    d.files = [f]
+    assert d.files == [f]
+    d.files.append(mcapi.File(file_dict(5)))
+    assert [x.id for x in d.files] == [4, 5]
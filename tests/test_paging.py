@@ -0,0 +1,25 @@
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def ids(pages):
+    return [f.id for p in pages for f in p.data]
+
+
+@pytest.mark.parametrize("starting_page, page_size", [(3, 100), (3, 128), (5, 48), (2, None), (1, 100)])
+def test_adaptive_paging_starts_at_the_same_item(make_client, starting_page, page_size):
+    fixed = make_client()
+    adaptive = make_client(adaptive_page_size=mcapi.AdaptivePageSize(initial_size=16))
+    expected = ids(fixed.list_files_changed_since(1, "1970-01-01 00:00:00", starting_page, page_size))
+    got = ids(adaptive.list_files_changed_since(1, "1970-01-01 00:00:00", starting_page, page_size))
+    assert got == expected
+    assert got[-1] == 1000
+
+
+def test_adaptive_paging_grows_fast_pages(make_client):
+    c = make_client(adaptive_page_size=mcapi.AdaptivePageSize(initial_size=16, max_size=256))
+    pages = list(c.list_files_changed_since(1, "1970-01-01 00:00:00"))
+    sizes = [p.per_page for p in pages]
+    assert sizes[:6] == [16, 16, 32, 64, 128, 256]
+    assert ids(pages) == list(range(1, 1001))
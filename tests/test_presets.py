@@ -0,0 +1,44 @@
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def test_preset_fields_and_include():
+    params = mcapi.QueryParams.preset("files", "paths").to_params()
+    assert params["fields[files]"] == "id,uuid,name,path,mime_type,directory_id"
+    assert params["fields[directory]"] == "id,name,path"
+    assert params["include"] == "directory"
+    assert mcapi.QueryParams.preset("files", "sizes-and-checksums").to_params()["fields[files]"].endswith(
+        "size,checksum")
+    assert mcapi.QueryParams.preset("experiments", "ids-only").to_params() == {"fields[experiments]": "id,uuid"}
+
+
+def test_full_preset_sends_nothing():
+    assert mcapi.QueryParams.preset("files", "full").to_params() == {}
+
+
+@pytest.mark.parametrize("resource, name", [("files", "everything"), ("widgets", "ids-only")])
+def test_unknown_preset(resource, name):
+    with pytest.raises(ValueError):
+        mcapi.QueryParams.preset(resource, name)
+
+
+def test_listing_sends_preset(make_client, server):
+    c = make_client()
+    c.get_all_experiments(1, preset="ids-only")
+    assert server.queries[-1]["fields[experiments]"] == ["id,uuid"]
+
+
+def test_params_override_preset(make_client, server):
+    c = make_client()
+    fields = mcapi.QueryField("experiments", ["id", "name"])
+    c.get_all_experiments(1, params=mcapi.QueryParams(fields=[fields], sort_on=["name"]), preset="ids-only")
+    assert server.queries[-1]["fields[experiments]"] == ["id,name"]
+    assert server.queries[-1]["sort"] == ["name"]
+
+
+def test_unknown_preset_sends_nothing(make_client, server):
+    c = make_client()
+    with pytest.raises(ValueError):
+        c.get_all_experiments(1, preset="everything")
+    assert server.requests == []
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_no_pacing_before_the_first_headers():
+    limiter = mcapi.RateLimiter(clock=Clock())
+    assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+
+
+def test_bucket_is_seeded_from_the_headers_and_refills():
+    clock = Clock()
+    limiter = mcapi.RateLimiter(period=60, headroom=1, clock=clock)
+    limiter.update(limit="60", remaining="3")
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock.now += 10
+    assert limiter.tokens == pytest.approx(8.0)
+
+
+def test_reset_header_only_empties_an_exhausted_bucket():
+    clock = Clock()
+    limiter = mcapi.RateLimiter(period=60, clock=clock)
+    limiter.update(limit="600", remaining="500", reset="50")
+    assert limiter.reserve() == 0.0
+    limiter.update(limit="600", remaining="1", reset="50")
+    assert limiter.reserve() == pytest.approx(50.0 + 0.1)
+    clock.now += 50
+    assert limiter.tokens == pytest.approx(598.0)
+
+
+def test_retry_after_empties_the_bucket():
+    clock = Clock()
+    limiter = mcapi.RateLimiter(clock=clock)
+    limiter.update(limit="600", remaining="500", retry_after="5")
+    assert limiter.reserve() == pytest.approx(5.0 + 0.1)
+
+
+def test_concurrent_reservations_queue_up():
+    clock = Clock()
+    limiter = mcapi.RateLimiter(period=10, headroom=0, clock=clock)
+    limiter.update(limit="10", remaining="0")
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        wait = limiter.reserve()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(waits) == pytest.approx([float(i) for i in range(1, 21)])
+
+
+def test_client_paces_requests_from_response_headers(server, make_client):
+    limiter = mcapi.RateLimiter(clock=Clock())
+    c = make_client(rate_limiter=limiter)
+    server.headers = {"x-ratelimit-limit": "600", "x-ratelimit-remaining": "100"}
+    c.get_project(1)
+    assert limiter.limit == 600
+    assert c.get_rate_limit_status()["remaining"] == 100
@@ -0,0 +1,53 @@
+import pickle
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def test_raw_listing_returns_records(make_client, server):
+    c = make_client()
+    pages = list(c.list_files_changed_since(1, "1970-01-01 00:00:00", raw=True))
+    records = [r for p in pages for r in p.data]
+    assert len(records) == 1000
+    rec = records[0]
+    assert isinstance(rec, mcapi.Record)
+    assert rec["size"] == rec.size == 10
+    assert rec.updated_at == "2024-01-02T03:04:05.000000Z"
+    assert rec.directory == {"id": 1, "name": "d1", "path": "/d1", "mime_type": "directory"}
+    assert dict(rec) == server.files[0]
+
+
+def test_to_model(make_client):
+    c = make_client()
+    rec = c.get_all_experiments(1, raw=True)[0]
+    e = rec.to_model()
+    assert isinstance(e, mcapi.Experiment)
+    assert (e.id, e.name) == (5, "experiment")
+    assert rec.to_model() is e
+
+
+def test_record_is_read_only():
+    rec = mcapi.Record({"id": 1, "name": "f.txt"}, mcapi.File)
+    with pytest.raises(TypeError):
+        rec["name"] = "g.txt"
+    with pytest.raises(AttributeError):
+        rec.name = "g.txt"
+    assert rec.name == "f.txt"
+
+
+def test_missing_key():
+    rec = mcapi.Record({"id": 1}, mcapi.File)
+    with pytest.raises(KeyError):
+        rec["size"]
+    with pytest.raises(AttributeError):
+        rec.size
+    assert rec.get("size") is None
+    assert "id" in rec and len(rec) == 1
+
+
+def test_pickle():
+    rec = mcapi.Record({"id": 1, "name": "f.txt"}, mcapi.File)
+    copy = pickle.loads(pickle.dumps(rec))
+    assert dict(copy) == {"id": 1, "name": "f.txt"}
+    assert copy.to_model().name == "f.txt"
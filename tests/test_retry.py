@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+import materials_commons.api as mcapi
+
+
+def test_retries_429_honoring_retry_after(server, make_client):
+    c = make_client()
+    server.fail_status = 429
+    server.retry_after = "0"
+    server.fail_next = 2
+    project = c.get_project(1)
+    assert project.id == 1
+    assert server.count("GET", "/api/projects/1") == 3
+    assert c.retry_stats.retries == 2
+
+
+def test_gives_up_after_max_retries(server, make_client):
+    c = make_client(retry_policy=mcapi.RetryPolicy(max_retries=2, backoff_factor=0.01, jitter=False))
+    server.fail_status = 503
+    server.fail_next = 10
+    with pytest.raises(mcapi.MCAPIError):
+        c.get_project(1)
+    assert server.count("GET", "/api/projects/1") == 3
+
+
+def test_upload_retry_resends_whole_file(server, make_client, tmp_path):
+    c = make_client()
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"x" * 10000)
+    server.fail_status = 429
+    server.fail_next = 1
+    c.upload_file(1, 2, str(path))
+    sizes = [r[2] for r in server.requests]
+    assert len(sizes) == 2
+    assert sizes[0] == sizes[1] > 10000
+
+
+def test_unseekable_upload_is_not_retried(server, make_client):
+    class Unseekable(io.BytesIO):
+        def seekable(self):
+            return False
+
+    c = make_client()
+    server.fail_status = 429
+    server.fail_next = 1
+    with pytest.raises(mcapi.MCAPIError):
+        c.upload_bytes(1, 2, "name.txt", Unseekable(b"y" * 10000))
+    assert len(server.requests) == 1
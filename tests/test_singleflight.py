@@ -0,0 +1,18 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_single_flight_coalesces_concurrent_gets(server, make_client):
+    c = make_client(coalesce_gets=True)
+    server.delay = 0.3
+    barrier = threading.Barrier(10)
+
+    def get():
+        barrier.wait()
+        return c.get_project(1)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        projects = list(executor.map(lambda _: get(), range(10)))
+
+    assert all(p.id == 1 for p in projects)
+    assert server.count("GET", "/api/projects/1") == 1
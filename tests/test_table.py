@@ -0,0 +1,91 @@
+import pytest
+
+import materials_commons.api as mcapi
+from materials_commons.api.table import _path
+
+numpy = pytest.importorskip("numpy")
+
+
+def row(i, mime_type, owner_id, size):
+    return {"id": i, "uuid": "uuid-" + str(i), "name": "f" + str(i), "mime_type": mime_type, "owner_id": owner_id,
+            "directory_id": 1, "size": size, "created_at": "2024-01-02T03:04:05.000000Z",
+            "directory": {"id": 1, "path": "/data"}}
+
+
+ROWS = [row(1, "text/plain", 1, 10), row(2, "image/png", 2, 200), row(3, "text/plain", 2, 30),
+        row(4, "image/png", 2, 400), row(5, "text/csv", 1, 5)]
+
+
+def test_from_rows():
+    t = mcapi.FileTable.from_rows(ROWS)
+    assert len(t) == 5
+    assert list(t["id"]) == [1, 2, 3, 4, 5]
+    assert list(t["path"]) == ["/data/f1", "/data/f2", "/data/f3", "/data/f4", "/data/f5"]
+    assert t["size"].sum() == 645
+    assert t["created_at"][0] == numpy.datetime64("2024-01-02T03:04:05")
+
+
+def test_missing_values():
+    t = mcapi.FileTable.from_rows([{"name": "f"}, {"id": 2, "size": None, "checksum": None, "updated_at": None}])
+    assert list(t["id"]) == [-1, 2]
+    assert list(t["size"]) == [0, 0]
+    assert list(t["directory_id"]) == [-1, -1]
+    assert list(t["checksum"]) == ["", ""]
+    assert list(t["path"]) == ["", ""]
+    assert numpy.isnat(t["created_at"]).all() and numpy.isnat(t["updated_at"]).all()
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"name": "f", "directory": {"path": "/"}}, "/f"),
+    ({"name": "f", "directory": {"path": "/a/b"}}, "/a/b/f"),
+    ({"name": "f", "path": "/given/f"}, "/given/f"),
+    ({"name": "f", "directory": {"id": 1}, "path": "/given/f"}, "/given/f"),
+    ({"directory": {"path": "/a"}}, ""),
+])
+def test_path(data, expected):
+    assert _path(data) == expected
+    if "name" in data and "directory" in data and "path" in data["directory"]:
+        assert mcapi.File(data).path == expected
+
+
+def test_from_pages():
+    t = mcapi.FileTable.from_pages([ROWS[:2], ROWS[2:4], [], ROWS[4:]])
+    assert list(t["id"]) == [1, 2, 3, 4, 5]
+    assert len(mcapi.FileTable.from_pages([])) == 0
+
+
+def test_group_sum_and_count():
+    t = mcapi.FileTable.from_rows(ROWS)
+    keys, sums = t.group_sum("mime_type")
+    assert list(keys) == ["image/png", "text/csv", "text/plain"]
+    assert list(sums) == [600, 5, 40]
+    keys, counts = t.group_count("owner_id")
+    assert list(keys) == [1, 2]
+    assert list(counts) == [2, 3]
+
+
+def test_group_by_several_columns():
+    t = mcapi.FileTable.from_rows(ROWS)
+    keys, sums = t.group_sum(["owner_id", "mime_type"])
+    got = {(int(k["owner_id"]), k["mime_type"]): int(s) for k, s in zip(keys, sums)}
+    assert got == {(1, "text/plain"): 10, (1, "text/csv"): 5, (2, "image/png"): 600, (2, "text/plain"): 30}
+    keys, counts = t.group_count(["owner_id", "mime_type"])
+    assert sorted(counts) == [1, 1, 1, 2]
+    assert sum(counts) == 5
+
+
+def test_empty_table():
+    keys, sums = mcapi.FileTable.from_rows([]).group_sum("mime_type")
+    assert len(keys) == 0 and len(sums) == 0
+
+
+def test_client_table(make_client):
+    c = make_client()
+    t = c.get_files_changed_since_table(1, "1970-01-01 00:00:00")
+    assert len(t) == 1000
+    keys, counts = t.group_count("owner_id")
+    assert list(keys) == [0, 1, 2]
+    assert list(counts) == [333, 334, 333]
+    keys, sums = t.group_sum("directory_id")
+    assert sums.sum() == sum(i * 10 for i in range(1, 1001))
+    assert t["path"][0] == "/d1/f1.txt"
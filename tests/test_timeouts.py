@@ -0,0 +1,72 @@
+import time
+
+import pytest
+import requests
+
+import materials_commons.api as mcapi
+
+NO_RETRIES = mcapi.RetryPolicy(max_retries=0)
+
+
+def test_read_timeout(server, make_client):
+    c = make_client(read_timeout=0.2, retry_policy=NO_RETRIES)
+    server.delay = 2.0
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        c.get_project(1)
+    assert time.monotonic() - start < 1.0
+
+
+def test_deadline_covers_several_calls(server, make_client):
+    c = make_client(retry_policy=NO_RETRIES)
+    server.delay = 0.3
+    start = time.monotonic()
+    with pytest.raises(mcapi.DeadlineExceededError):
+        with c.deadline(0.5):
+            c.get_project(1)
+            c.get_project(1)
+    assert time.monotonic() - start < 1.0
+    server.delay = 0.0
+    assert c.get_project(1).id == 1
+
+
+def test_deadline_stops_retry_waits(server, make_client):
+    c = make_client(retry_policy=mcapi.RetryPolicy(max_retries=5, jitter=False))
+    server.fail_status = 503
+    server.retry_after = "5"
+    server.fail_next = 5
+    start = time.monotonic()
+    with pytest.raises(mcapi.DeadlineExceededError):
+        with c.deadline(1.0):
+            c.get_project(1)
+    assert time.monotonic() - start < 1.0
+    assert server.count("GET", "/api/projects/1") == 1
+
+
+def test_nested_deadlines_keep_the_earliest(make_client):
+    c = make_client()
+    with c.deadline(0.1):
+        outer = c._local.deadline
+        with c.deadline(10):
+            assert c._local.deadline == outer
+        with c.deadline(0.01):
+            assert c._local.deadline < outer
+    assert getattr(c._local, "deadline", None) is None
+
+
+def test_deadline_applies_to_page_workers(server, make_client):
+    c = make_client(retry_policy=NO_RETRIES)
+    server.delay = 0.2
+    start = time.monotonic()
+    with pytest.raises(mcapi.DeadlineExceededError):
+        with c.deadline(0.5):
+            list(c.iter_files_changed_since(1, "1970-01-01 00:00:00", page_size=10))
+    assert time.monotonic() - start < 1.5
+
+
+def test_get_apikey_times_out(server):
+    server.delay = 2.0
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        mcapi.Client.get_apikey("user@example.com", "password", base_url=server.url, timeout=(1.0, 0.2))
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,38 @@
+import datetime
+
+import pytest
+
+from materials_commons.api.util import to_datetime
+
+
+def strptime(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-02T03:04:05.123456Z",
+    "2024-01-02T03:04:05.123Z",
+    "2024-01-02T03:04:05.1Z",
+    "2024-12-31T23:59:59.000000Z",
+    "2024-1-2T3:4:5.5Z",
+    "２０２４-01-02T03:04:05.123Z",
+])
+def test_to_datetime_matches_strptime(value):
+    assert to_datetime(value) == strptime(value)
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-02",
+    "2024-01-02T03:04:05",
+    "2024-01-02T03:04:05Z",
+    "2024-01-02T03:04:05.123+00:00",
+    "2024-01-02T03:04:05.123+00:00Z",
+    "2024-01-02 03:04:05.123Z",
+    "2024-01-02T03:04:05.1234567Z",
+    "2024-02-30T03:04:05.123Z",
+])
+def test_to_datetime_rejects_what_strptime_rejects(value):
+    with pytest.raises(ValueError):
+        strptime(value)
+    with pytest.raises(ValueError):
+        to_datetime(value)